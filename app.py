@@ -9,7 +9,13 @@ from flask_migrate import Migrate
 from dotenv import load_dotenv
 
 from extensions.database import db
+from extensions.pool import METRICAS_POOL, opcoes_engine
+from extensions.provedor_json import cria_provedor_json
 from blocklist import BLOCKLIST
+from cache import CACHE_RESPOSTAS
+from compressao import COMPRESSAO_RESPOSTAS
+from senhas import SENHAS
+from comandos import banco_cli, ecoponto_cli, publicacao_cli
 
 
 from resources.usuario import blp as UsuarioBlueprint
@@ -20,6 +26,7 @@ from resources.categoria import blp as CategoriaBlueprint
 from resources.residuo import blp as ResiduoBlueprint
 from resources.publicacao import blp as PublicacaoBlueprint
 from resources.arte_publicitaria import blp as ArtePublicitariaBlueprint
+from resources.status import blp as StatusBlueprint
 
 
 def create_app(db_url=None):
@@ -35,6 +42,19 @@ def create_app(db_url=None):
     app.config["OPENAPI_SWAGGER_UI_URL"] = "https://cdn.jsdelivr.net/npm/swagger-ui-dist/"
     app.config["SQLALCHEMY_DATABASE_URI"] = db_url or os.getenv("DATABASE_URL", "sqlite:///data.db")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = opcoes_engine(app.config["SQLALCHEMY_DATABASE_URI"])
+    app.config["PAGINACAO_TAMANHO_MAXIMO"] = int(os.getenv("PAGINACAO_TAMANHO_MAXIMO", 100))
+    app.config["STREAM_TAMANHO_LOTE"] = int(os.getenv("STREAM_TAMANHO_LOTE", 500))
+    app.config["IMPORTACAO_TAMANHO_LOTE"] = int(os.getenv("IMPORTACAO_TAMANHO_LOTE", 200))
+    app.config["FUSO_HORARIO"] = os.getenv("FUSO_HORARIO", "America/Sao_Paulo")
+    app.config["CACHE_RESPOSTAS_ATIVO"] = os.getenv("CACHE_RESPOSTAS_ATIVO", "true").lower() != "false"
+    app.config["CACHE_RESPOSTAS_TAMANHO"] = int(os.getenv("CACHE_RESPOSTAS_TAMANHO", 256))
+    app.config["CACHE_RESPOSTAS_VALIDADE"] = int(os.getenv("CACHE_RESPOSTAS_VALIDADE", 60))
+    app.config["CACHE_REDIS_URL"] = os.getenv("CACHE_REDIS_URL")
+    app.config["SENHA_HASH_ROUNDS"] = int(os.getenv("SENHA_HASH_ROUNDS", 29000))
+    app.config["JSON_ORJSON"] = os.getenv("JSON_ORJSON", "true").lower() != "false"
+    app.config["COMPRESSAO_ATIVA"] = os.getenv("COMPRESSAO_ATIVA", "true").lower() != "false"
+    app.config["COMPRESSAO_TAMANHO_MINIMO"] = int(os.getenv("COMPRESSAO_TAMANHO_MINIMO", 500))
     app.config["API_SPEC_OPTIONS"] = {
         "components": {
             "securitySchemes": {
@@ -51,7 +71,13 @@ def create_app(db_url=None):
 
 
 
+    app.json = cria_provedor_json(app)
     db.init_app(app)
+    with app.app_context():
+        METRICAS_POOL.instrumentar(db.engine)
+    CACHE_RESPOSTAS.init_app(app)
+    COMPRESSAO_RESPOSTAS.init_app(app)
+    SENHAS.init_app(app)
     CORS(app, origins=[
         "http://127.0.0.1:4200", 
         "http://localhost:4200", 
@@ -66,14 +92,18 @@ def create_app(db_url=None):
 
     api = Api(app)
     app.config["JWT_SECRET_KEY"] = db_url or os.getenv("JWT_SECRET_KEY")
+    app.config["JWT_BLOCKLIST_BACKEND"] = os.getenv("JWT_BLOCKLIST_BACKEND", "banco")
+    # intervalo, em segundos, em que os outros workers passam a recusar um token revogado
+    app.config["JWT_BLOCKLIST_SINCRONIZACAO"] = int(os.getenv("JWT_BLOCKLIST_SINCRONIZACAO", 5))
     jwt = JWTManager(app)
+    BLOCKLIST.init_app(app)
 
 
 
 
     @jwt.token_in_blocklist_loader
     def check_if_token_in_blocklist(jwt_header, jwt_payload):
-        return jwt_payload["jti"] in BLOCKLIST
+        return BLOCKLIST.revogado(jwt_payload)
 
     @jwt.revoked_token_loader
     def revoked_token_callback(jwt_header, jwt_payload):
@@ -152,6 +182,11 @@ def create_app(db_url=None):
     api.register_blueprint(PublicacaoBlueprint)
     api.register_blueprint(ArtePublicitariaBlueprint)
     api.register_blueprint(TermoBlueprint)
+    api.register_blueprint(StatusBlueprint)
+
+    app.cli.add_command(ecoponto_cli)
+    app.cli.add_command(publicacao_cli)
+    app.cli.add_command(banco_cli)
     
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -0,0 +1,73 @@
+"""
+codificacao_json.py
+
+Microbenchmark da codificação JSON das respostas: custo de `app.json.response` para o
+envelope de uma listagem de ecopontos já serializada pelo EcopontoGetSchema, com o
+provedor padrão do Flask, o ProvedorJSON (biblioteca padrão) e o ProvedorOrjson.
+
+Não usa banco: os ecopontos são os mesmos objetos transientes de serializacao.py.
+
+Uso (na raiz do projeto):
+    python benchmarks/codificacao_json.py
+    python benchmarks/codificacao_json.py --registros 10000 --repeticoes 7
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from extensions.provedor_json import ProvedorJSON, ProvedorOrjson, orjson
+from serializacao import cria_ecopontos, serializa_atual
+
+
+def mede(provedor, envelope, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resposta = provedor.response(envelope)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) * 1000, len(resposta.get_data())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=5000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    envelope = {
+        "code": 200,
+        "status": "OK",
+        "message": "",
+        "values": serializa_atual(cria_ecopontos(args.registros)),
+    }
+
+    provedores = [("flask", DefaultJSONProvider(app)), ("json", ProvedorJSON(app))]
+    if orjson is not None:
+        provedores.append(("orjson", ProvedorOrjson(app)))
+    else:
+        print("orjson não está instalado; medindo apenas a biblioteca padrão.")
+
+    corpos = [provedor.response(envelope).get_data() for _, provedor in provedores]
+    if any(json.loads(corpo) != json.loads(corpos[0]) for corpo in corpos):
+        sys.exit("Os provedores produzem resultados diferentes.")
+
+    print(f"{args.registros} ecopontos, melhor de {args.repeticoes}")
+    base = None
+    for nome, provedor in provedores:
+        ms, tamanho = mede(provedor, envelope, args.repeticoes)
+        base = base or ms
+        print(f"{nome + ':':<8} {ms:8.1f} ms  {tamanho / 1024:8.0f} KiB  ({base / ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
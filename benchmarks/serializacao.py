@@ -0,0 +1,123 @@
+"""
+serializacao.py
+
+Microbenchmark da serialização de ecopontos com EcopontoGetSchema: custo por registro
+do caminho antigo (um schema novo por registro, enums serializados como texto
+"SituacaoEnum.aprovado" e corrigidos depois no dicionário) e do atual (schema do
+registro `serializador`, `many=True` e campos de enum).
+
+Não usa banco: os ecopontos são objetos transientes com as relações preenchidas.
+
+Uso (na raiz do projeto):
+    python benchmarks/serializacao.py
+    python benchmarks/serializacao.py --registros 2000 --repeticoes 7
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from marshmallow import fields
+
+from models import DiaFuncionamentoModel, EcopontoModel, EmpresaModel, LocalizacaoModel, ResiduoModel
+from models.enums.dia_semana import DiasSemanaEnum
+from models.enums.situacao_ecoponto import SituacaoEnum
+from schemas.empresa_ecoponto import EcopontoGetSchema, PainEcopontoDiaFuncionamento
+from schemas.registro import serializador
+
+
+# caminho antigo: campos de texto e correção dos enums depois do dump
+class DiaFuncionamentoLegado(PainEcopontoDiaFuncionamento):
+    dia_semana = fields.Str()
+
+
+class EcopontoLegado(EcopontoGetSchema):
+    situacao = fields.Str(dump_only=True)
+    dia_funcionamento = fields.List(fields.Nested(DiaFuncionamentoLegado), required=False)
+
+
+def retira_valor_enum(enum, valor):
+    membro = enum[str(valor).split('.')[-1]]
+    return membro.value, membro.name
+
+
+def serializa_legado(ecopontos):
+    result_lista = []
+    for ecoponto in ecopontos:
+        result = EcopontoLegado(exclude=("situacao_enum",)).dump(ecoponto)
+
+        for horario in result.get("dia_funcionamento") or []:
+            horario["dia_semana"] = retira_valor_enum(DiasSemanaEnum, horario["dia_semana"])[1]
+
+        situacao = result.get("situacao")
+        if situacao:
+            valor, nome = retira_valor_enum(SituacaoEnum, situacao)
+            result["situacao_enum"] = nome
+            result["situacao"] = valor
+
+        result_lista.append(result)
+    return result_lista
+
+
+def serializa_atual(ecopontos):
+    return serializador(EcopontoGetSchema, many=True).dump(ecopontos)
+
+
+def cria_ecopontos(quantidade):
+    residuos = [ResiduoModel(id=i, descricao=f"Resíduo {i}", recolhido_em_ecoponto=True, ativo=True) for i in range(8)]
+    empresa = EmpresaModel(id=1, nome_fantasia="Empresa", cnpj="11222333000181", telefone="4832220000",
+                           email="empresa@ecoponto.test", nome_contato_responsavel="Contato")
+    ecopontos = []
+    for i in range(quantidade):
+        ecoponto = EcopontoModel(
+            id=i, nome=f"Ecoponto {i}", ativo=True, aberto_publico=True,
+            situacao=list(SituacaoEnum)[i % 3], empresa=empresa, funcionamento="seg a sex das 08:00 às 17:00",
+            funcionamentos=["seg a sex das 08:00 às 17:00"],
+            residuo=[residuos[i % 8], residuos[(i + 3) % 8]],
+        )
+        ecoponto.localizacao = [LocalizacaoModel(
+            id=i, rua=f"Rua {i}", numero=str(i), bairro="Centro", cep="88000000", cidade="Florianópolis",
+            estado="SC", latitude="-27.59", longitude="-48.54",
+        )]
+        ecoponto.dia_funcionamento = [
+            DiaFuncionamentoModel(id=i * 5 + d, dia_semana=dia, hora_inicial=datetime.time(8), hora_final=datetime.time(17))
+            for d, dia in enumerate((DiasSemanaEnum.seg, DiasSemanaEnum.ter, DiasSemanaEnum.qua, DiasSemanaEnum.qui, DiasSemanaEnum.sex))
+        ]
+        ecopontos.append(ecoponto)
+    return ecopontos
+
+
+def mede(funcao, ecopontos, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(ecopontos)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) / len(ecopontos) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=1000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    ecopontos = cria_ecopontos(args.registros)
+    if serializa_legado(ecopontos[:50]) != serializa_atual(ecopontos[:50]):
+        sys.exit("Os dois caminhos produzem resultados diferentes.")
+
+    antes = mede(serializa_legado, ecopontos, args.repeticoes)
+    depois = mede(serializa_atual, ecopontos, args.repeticoes)
+
+    print(f"{args.registros} ecopontos, melhor de {args.repeticoes}")
+    print(f"antes:  {antes:8.1f} µs/registro")
+    print(f"depois: {depois:8.1f} µs/registro  ({antes / depois:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
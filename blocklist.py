@@ -1,9 +1,148 @@
 """
 blocklist.py
 
-This file just contains the blocklist of the JWT tokens. It will be imported by
+This file contains the blocklist of the JWT tokens. It will be imported by
 app and the logout resource so that tokens can be added to the blocklist when the
 user logs out.
+
+The revoked tokens are kept in the database (table token_revogado), shared by all
+the workers, until the token `exp`. Each worker keeps an in-memory copy that is
+synchronized incrementally, so the per-request check is a dict lookup and does not
+hit the database for tokens that were not revoked.
+
+A token revoked in one worker is rejected by the others after at most
+JWT_BLOCKLIST_SINCRONIZACAO seconds (the synchronization interval).
 """
 
-BLOCKLIST = set()
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from extensions.database import db
+from models.token_revogado import TokenRevogadoModel
+
+# tokens sem "exp" ficam revogados por um ano
+VALIDADE_PADRAO_SEGUNDOS = 365 * 24 * 60 * 60
+
+# Cada sincronização relê os tokens revogados nos últimos MARGEM_SINCRONIZACAO antes do
+# mais recente já lido: criado_em é gravado no início da transação, que pode ser
+# confirmada depois de outras mais novas. Deve ser maior que a transação mais longa de
+# um logout (limitada pelo timeout do gunicorn).
+MARGEM_SINCRONIZACAO = timedelta(minutes=2)
+
+
+class BlocklistMemoria:
+    """
+        Backend em memória (apenas no processo atual): jti -> timestamp de expiração.
+    """
+
+    def __init__(self):
+        self._revogados = {}
+
+    def revogar(self, jti, expira_em):
+        self._revogados[jti] = expira_em
+
+    def revogado(self, jti):
+        expira_em = self._revogados.get(jti)
+        if expira_em is None:
+            return False
+
+        if expira_em < time.time():
+            self._revogados.pop(jti, None)
+            return False
+
+        return True
+
+    def limpar_expirados(self):
+        agora = time.time()
+        for jti, expira_em in list(self._revogados.items()):
+            if expira_em < agora:
+                self._revogados.pop(jti, None)
+
+
+class BlocklistBancoDados(BlocklistMemoria):
+    """
+        Backend em banco de dados com cópia local por worker.
+
+        A cópia local é atualizada com os tokens revogados por outros workers a cada
+        `intervalo_sincronizacao` segundos (JWT_BLOCKLIST_SINCRONIZACAO): um token revogado
+        em outro worker continua aceito neste por até esse intervalo.
+
+        A sincronização lê os tokens com criado_em a partir do mais recente já lido, menos
+        MARGEM_SINCRONIZACAO. Um id sequencial não serve como marca: os ids são atribuídos
+        no INSERT, mas as transações podem ser confirmadas em outra ordem, e um token com
+        id menor confirmado depois nunca seria lido.
+    """
+
+    def __init__(self, intervalo_sincronizacao=5):
+        super().__init__()
+        self.intervalo_sincronizacao = intervalo_sincronizacao
+        self._ultimo_criado_em = None
+        self._sincronizado_em = None
+        self._lock = threading.Lock()
+
+    def revogar(self, jti, expira_em):
+        agora = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        # remove do banco os tokens que já expiraram
+        TokenRevogadoModel.query.filter(TokenRevogadoModel.expira_em < agora).delete()
+        db.session.add(TokenRevogadoModel(
+            jti=jti,
+            expira_em=datetime.fromtimestamp(expira_em, timezone.utc).replace(tzinfo=None)
+        ))
+        db.session.commit()
+
+        super().revogar(jti, expira_em)
+
+    def revogado(self, jti):
+        self.sincronizar()
+        return super().revogado(jti)
+
+    def sincronizar(self, forcar=False):
+        sincronizado_em = self._sincronizado_em
+        if not forcar and sincronizado_em and time.monotonic() - sincronizado_em < self.intervalo_sincronizacao:
+            return
+
+        if not self._lock.acquire(blocking=False):
+            # outra thread já está sincronizando
+            return
+
+        try:
+            query = db.session.query(TokenRevogadoModel.jti, TokenRevogadoModel.expira_em, TokenRevogadoModel.criado_em)
+            if self._ultimo_criado_em is not None:
+                query = query.filter(TokenRevogadoModel.criado_em >= self._ultimo_criado_em - MARGEM_SINCRONIZACAO)
+
+            for jti, expira_em, criado_em in query.all():
+                self._revogados[jti] = expira_em.replace(tzinfo=timezone.utc).timestamp()
+                if self._ultimo_criado_em is None or criado_em > self._ultimo_criado_em:
+                    self._ultimo_criado_em = criado_em
+
+            self.limpar_expirados()
+            self._sincronizado_em = time.monotonic()
+        finally:
+            self._lock.release()
+
+
+class Blocklist:
+    """
+        Blocklist de tokens JWT com backend configurável (JWT_BLOCKLIST_BACKEND).
+    """
+
+    def __init__(self):
+        self.backend = BlocklistMemoria()
+
+    def init_app(self, app):
+        if app.config.get("JWT_BLOCKLIST_BACKEND", "banco") == "memoria":
+            self.backend = BlocklistMemoria()
+        else:
+            self.backend = BlocklistBancoDados(app.config.get("JWT_BLOCKLIST_SINCRONIZACAO", 5))
+
+    def revogar(self, jwt_payload):
+        expira_em = jwt_payload.get("exp") or time.time() + VALIDADE_PADRAO_SEGUNDOS
+        self.backend.revogar(jwt_payload["jti"], expira_em)
+
+    def revogado(self, jwt_payload):
+        return self.backend.revogado(jwt_payload["jti"])
+
+
+BLOCKLIST = Blocklist()
@@ -0,0 +1,240 @@
+"""
+cache.py
+
+This file contains the response cache of the public catalogue endpoints (categoria,
+residuo, termo and the ecoponto situations). It will be imported by app and by the
+resources, which decorate their GET handlers with `cache_resposta` and call
+`CACHE_RESPOSTAS.invalidar` after writing.
+
+Each entry keeps the response body and a strong ETag (hash of the body), so a
+request with a matching `If-None-Match` is answered with 304 without running the
+view. By default the cache is an LRU in the memory of each worker, with TTL; when
+CACHE_REDIS_URL is set the entries are shared by all the workers in Redis.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, request
+
+
+class CacheMemoria:
+    """
+        Backend em memória (apenas no processo atual): LRU com validade.
+
+        Uma invalidação só alcança o worker que fez a escrita; nos demais a entrada
+        expira em no máximo `validade_segundos`.
+    """
+
+    def __init__(self, tamanho_maximo=256, validade_segundos=60):
+        self.tamanho_maximo = tamanho_maximo
+        self.validade_segundos = validade_segundos
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def buscar(self, grupo, chave):
+        with self._lock:
+            entrada = self._entradas.get((grupo, chave))
+            if entrada is None:
+                return None
+
+            expira_em, valor = entrada
+            if expira_em < time.monotonic():
+                del self._entradas[(grupo, chave)]
+                return None
+
+            self._entradas.move_to_end((grupo, chave))
+            return valor
+
+    def gravar(self, grupo, chave, valor):
+        with self._lock:
+            self._entradas[(grupo, chave)] = (time.monotonic() + self.validade_segundos, valor)
+            self._entradas.move_to_end((grupo, chave))
+            while len(self._entradas) > self.tamanho_maximo:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, grupo):
+        with self._lock:
+            for grupo_chave in [grupo_chave for grupo_chave in self._entradas if grupo_chave[0] == grupo]:
+                del self._entradas[grupo_chave]
+
+
+class CacheRedis:
+    """
+        Backend em Redis, compartilhado pelos workers.
+
+        Cada grupo tem um número de geração que faz parte das chaves; invalidar um grupo
+        incrementa a geração e as entradas antigas deixam de ser encontradas (e expiram).
+    """
+
+    def __init__(self, url, validade_segundos=60):
+        import redis
+
+        self.validade_segundos = validade_segundos
+        self._redis = redis.Redis.from_url(url)
+
+    def _chave(self, grupo, chave):
+        geracao = int(self._redis.get(f"cache_resposta:{grupo}:geracao") or 0)
+        return f"cache_resposta:{grupo}:{geracao}:{chave}"
+
+    def buscar(self, grupo, chave):
+        valor = self._redis.get(self._chave(grupo, chave))
+        if valor is None:
+            return None
+
+        valor = json.loads(valor)
+        valor["corpo"] = valor["corpo"].encode()
+        valor["comprimidos"] = {
+            codificacao: base64.b64decode(corpo) for codificacao, corpo in (valor.get("comprimidos") or {}).items()
+        }
+        return valor
+
+    def gravar(self, grupo, chave, valor):
+        valor = dict(
+            valor,
+            corpo=valor["corpo"].decode(),
+            comprimidos={
+                codificacao: base64.b64encode(corpo).decode() for codificacao, corpo in (valor.get("comprimidos") or {}).items()
+            },
+        )
+        self._redis.setex(self._chave(grupo, chave), self.validade_segundos, json.dumps(valor))
+
+    def invalidar(self, grupo):
+        self._redis.incr(f"cache_resposta:{grupo}:geracao")
+
+
+class CacheRespostas:
+    """
+        Cache de respostas com backend configurável (CACHE_REDIS_URL).
+    """
+
+    def __init__(self):
+        self.ativo = True
+        self.backend = CacheMemoria()
+
+    def init_app(self, app):
+        self.ativo = app.config.get("CACHE_RESPOSTAS_ATIVO", True)
+        validade = app.config.get("CACHE_RESPOSTAS_VALIDADE", 60)
+
+        if app.config.get("CACHE_REDIS_URL"):
+            self.backend = CacheRedis(app.config["CACHE_REDIS_URL"], validade)
+        else:
+            self.backend = CacheMemoria(app.config.get("CACHE_RESPOSTAS_TAMANHO", 256), validade)
+
+    def buscar(self, grupo, chave):
+        return self.backend.buscar(grupo, chave) if self.ativo else None
+
+    def gravar(self, grupo, chave, valor):
+        if self.ativo:
+            self.backend.gravar(grupo, chave, valor)
+
+    def invalidar(self, *grupos):
+        for grupo in grupos:
+            self.backend.invalidar(grupo)
+
+
+CACHE_RESPOSTAS = CacheRespostas()
+
+
+def comprime(corpo, tamanho_minimo=0):
+    """
+        Retorna as versões comprimidas do corpo, por codificação (gzip e, se o pacote
+        `brotli` estiver instalado, br); nenhuma se o corpo for menor que `tamanho_minimo`.
+    """
+
+    if len(corpo) < tamanho_minimo:
+        return {}
+
+    versoes = {"gzip": gzip.compress(corpo, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        return versoes
+
+    versoes["br"] = brotli.compress(corpo)
+    return versoes
+
+
+def escolhe_codificacao(disponiveis):
+    # melhor codificação aceita pelo cliente (Accept-Encoding) entre as disponíveis; None: sem compressão
+    aceitas = [
+        (request.accept_encodings[codificacao], codificacao)
+        for codificacao in ("br", "gzip")
+        if codificacao in disponiveis and request.accept_encodings[codificacao] > 0
+    ]
+    return max(aceitas, key=lambda aceita: aceita[0])[1] if aceitas else None
+
+
+def resposta_condicional(entrada):
+    """
+        Monta a resposta a partir de uma entrada do cache; 304 se o cliente já tem a mesma versão.
+
+        Se a entrada tiver versões comprimidas (`comprimidos`, ver `comprime`), envia a melhor
+        aceita pelo cliente, com um ETag próprio por codificação.
+    """
+
+    corpo = entrada["corpo"]
+    etag = entrada["etag"]
+    comprimidos = entrada.get("comprimidos") or {}
+    codificacao = escolhe_codificacao(comprimidos)
+    if codificacao:
+        corpo = comprimidos[codificacao]
+        etag = f"{etag}-{codificacao}"
+
+    resposta = current_app.response_class(corpo, status=200, mimetype=entrada["tipo"])
+    if comprimidos:
+        resposta.vary.add("Accept-Encoding")
+    if codificacao:
+        resposta.content_encoding = codificacao
+    resposta.set_etag(etag)
+    resposta.last_modified = datetime.fromtimestamp(entrada["gravado_em"], timezone.utc)
+    resposta.cache_control.public = True
+    resposta.cache_control.no_cache = True
+    return resposta.make_conditional(request)
+
+
+def cache_resposta(grupo):
+    """
+        Decorador dos GETs cujas respostas podem ser guardadas no cache.
+
+        **Parâmetros:**
+            grupo (str): grupo invalidado pelas escritas que alteram a resposta.
+    """
+
+    def decorador(view):
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            chave = request.full_path
+            entrada = CACHE_RESPOSTAS.buscar(grupo, chave)
+            if entrada is not None:
+                return resposta_condicional(entrada)
+
+            resposta = current_app.make_response(view(*args, **kwargs))
+            if resposta.status_code != 200 or resposta.direct_passthrough:
+                return resposta
+
+            corpo = resposta.get_data()
+            entrada = {
+                "corpo": corpo,
+                "tipo": resposta.mimetype,
+                "etag": hashlib.sha256(corpo).hexdigest()[:32],
+                "gravado_em": int(time.time()),
+            }
+            if current_app.config.get("COMPRESSAO_ATIVA", True):
+                # comprimido uma única vez; os acertos do cache só escolhem a versão
+                entrada["comprimidos"] = comprime(corpo, current_app.config.get("COMPRESSAO_TAMANHO_MINIMO", 500))
+            CACHE_RESPOSTAS.gravar(grupo, chave, entrada)
+
+            return resposta_condicional(entrada)
+
+        return wrapper
+
+    return decorador
@@ -0,0 +1,177 @@
+import click
+from flask.cli import AppGroup
+from sqlalchemy import PrimaryKeyConstraint, UniqueConstraint
+from sqlalchemy.orm import selectinload
+
+from extensions.database import db
+from models.ecoponto import EcopontoModel
+from models.localizacao import LocalizacaoModel
+from models.publicacao import PublicacaoModel
+from resources.publicacao import atualiza_busca
+from utilities.funcionamento import atualiza_funcionamento
+
+ecoponto_cli = AppGroup("ecoponto", help="Comandos de manutenção dos ecopontos.")
+publicacao_cli = AppGroup("publicacao", help="Comandos de manutenção das publicações.")
+banco_cli = AppGroup("banco", help="Verificações do esquema do banco de dados.")
+
+
+@ecoponto_cli.command("recalcula-funcionamento")
+@click.option("--lote", default=500, show_default=True, help="Ecopontos por commit.")
+@click.option("--todos", is_flag=True, help="Recalcula também os ecopontos que já têm o resumo.")
+def recalcula_funcionamento(lote, todos):
+    """
+        Recalcula o resumo do horário de funcionamento dos ecopontos.
+
+        Por padrão preenche apenas os ecopontos sem resumo (criados antes da coluna
+        `funcionamento` existir), então pode ser executado a cada deploy.
+    """
+
+    ultimo_id = 0
+    total = 0
+    while True:
+        query = EcopontoModel.query.options(selectinload(EcopontoModel.dia_funcionamento))
+        if not todos:
+            query = query.filter(EcopontoModel.funcionamento.is_(None))
+
+        ecopontos = (
+            query
+            .filter(EcopontoModel.id > ultimo_id)
+            .order_by(EcopontoModel.id)
+            .limit(lote)
+            .all()
+        )
+        if not ecopontos:
+            break
+
+        for ecoponto in ecopontos:
+            atualiza_funcionamento(ecoponto, ecoponto.dia_funcionamento)
+
+        db.session.commit()
+        ultimo_id = ecopontos[-1].id
+        total += len(ecopontos)
+
+    click.echo(f"{total} ecopontos atualizados.")
+
+
+@ecoponto_cli.command("recalcula-localizacao")
+@click.option("--lote", default=500, show_default=True, help="Localizações por commit.")
+@click.option("--todos", is_flag=True, help="Recalcula também as localizações que já têm os campos de busca.")
+def recalcula_localizacao(lote, todos):
+    """
+        Recalcula os campos de busca (endereço normalizado e CEP só com dígitos) das localizações.
+
+        Por padrão preenche apenas as localizações sem campos de busca, então pode ser
+        executado a cada deploy.
+    """
+
+    ultimo_id = 0
+    total = 0
+    while True:
+        query = LocalizacaoModel.query
+        if not todos:
+            query = query.filter(LocalizacaoModel.endereco_busca.is_(None))
+
+        localizacoes = (
+            query
+            .filter(LocalizacaoModel.id > ultimo_id)
+            .order_by(LocalizacaoModel.id)
+            .limit(lote)
+            .all()
+        )
+        if not localizacoes:
+            break
+
+        for localizacao in localizacoes:
+            localizacao.atualiza_busca()
+
+        db.session.commit()
+        ultimo_id = localizacoes[-1].id
+        total += len(localizacoes)
+
+    click.echo(f"{total} localizações atualizadas.")
+
+
+@publicacao_cli.command("recalcula-busca")
+@click.option("--lote", default=500, show_default=True, help="Publicações por commit.")
+@click.option("--todos", is_flag=True, help="Recalcula também as publicações que já têm o texto de busca.")
+def recalcula_busca(lote, todos):
+    """
+        Recalcula os textos de busca (título e texto normalizados) das publicações.
+
+        Por padrão preenche apenas as publicações sem texto de busca (criadas antes das
+        colunas existirem), então pode ser executado a cada deploy.
+    """
+
+    ultimo_id = 0
+    total = 0
+    while True:
+        query = PublicacaoModel.query
+        if not todos:
+            query = query.filter(PublicacaoModel.titulo_busca.is_(None))
+
+        publicacoes = (
+            query
+            .filter(PublicacaoModel.id > ultimo_id)
+            .order_by(PublicacaoModel.id)
+            .limit(lote)
+            .all()
+        )
+        if not publicacoes:
+            break
+
+        for publicacao in publicacoes:
+            atualiza_busca(publicacao, publicacao.secao_publicacao.all())
+
+        db.session.commit()
+        ultimo_id = publicacoes[-1].id
+        total += len(publicacoes)
+
+    click.echo(f"{total} publicações atualizadas.")
+
+
+def chaves_sem_indice(metadata):
+    """
+        Lista as chaves estrangeiras dos models que não são a primeira coluna de nenhum
+        índice, restrição de unicidade ou chave primária da tabela.
+
+        **Retorna:**
+            Lista de "tabela.coluna", em ordem alfabética.
+    """
+
+    faltantes = []
+    for tabela in metadata.sorted_tables:
+        indexadas = {indice.columns[0].name for indice in tabela.indexes if len(indice.columns)}
+        indexadas |= {
+            restricao.columns[0].name
+            for restricao in tabela.constraints
+            if isinstance(restricao, (UniqueConstraint, PrimaryKeyConstraint)) and len(restricao.columns)
+        }
+        indexadas |= {coluna.name for coluna in tabela.columns if coluna.unique}
+
+        faltantes.extend(
+            f"{tabela.name}.{chave.parent.name}"
+            for chave in tabela.foreign_keys
+            if chave.parent.name not in indexadas
+        )
+
+    return sorted(faltantes)
+
+
+@banco_cli.command("verifica-indices")
+def verifica_indices():
+    """
+        Falha (código de saída 1) se alguma chave estrangeira dos models não tiver índice.
+
+        Toda FK nova deve vir com `index=True` (ou ser a primeira coluna de um índice ou
+        restrição de unicidade), senão as junções e os deletes em cascata varrem a tabela.
+        Pode ser executado no CI, antes do deploy.
+    """
+
+    faltantes = chaves_sem_indice(db.metadata)
+    for faltante in faltantes:
+        click.echo(f"Chave estrangeira sem índice: {faltante}", err=True)
+
+    if faltantes:
+        raise SystemExit(1)
+
+    click.echo("Todas as chaves estrangeiras têm índice.")
@@ -0,0 +1,128 @@
+"""
+compressao.py
+
+This file contains the compression of the responses. It will be imported by app,
+which installs it with `COMPRESSAO_RESPOSTAS.init_app`.
+
+After each request, a JSON or text response is compressed with the best encoding
+accepted by the client (br, if the `brotli` package is installed, or gzip). Responses
+smaller than COMPRESSAO_TAMANHO_MINIMO bytes are sent as they are; streamed responses
+are compressed chunk by chunk, as they are generated. Responses that already have a
+Content-Encoding, like the ones from the response cache and the map snapshot, which
+keep their compressed versions (see `cache.comprime`), are not touched.
+"""
+
+import gzip
+import zlib
+
+from cache import escolhe_codificacao
+
+TIPOS_COMPRIMIVEIS = {
+    "application/json",
+    "application/geo+json",
+    "application/javascript",
+    "application/xml",
+}
+
+
+def _codificacoes_disponiveis():
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return ("gzip",)
+    return ("br", "gzip")
+
+
+class CompressaoRespostas:
+    """
+        Compressão das respostas, negociada pelo Accept-Encoding.
+
+        Os níveis são os de compressão em tempo de resposta (gzip 6, brotli 4); as versões
+        guardadas no cache usam os níveis máximos, já que são comprimidas uma única vez.
+    """
+
+    nivel_gzip = 6
+    qualidade_brotli = 4
+
+    def __init__(self):
+        self.ativo = True
+        self.tamanho_minimo = 500
+        self.codificacoes = _codificacoes_disponiveis()
+
+    def init_app(self, app):
+        self.ativo = app.config.get("COMPRESSAO_ATIVA", True)
+        self.tamanho_minimo = app.config.get("COMPRESSAO_TAMANHO_MINIMO", 500)
+
+        if self.ativo:
+            app.after_request(self.comprime_resposta)
+
+    def comprimivel(self, resposta):
+        if resposta.status_code < 200 or resposta.status_code in (204, 206, 304):
+            return False
+        if resposta.direct_passthrough or "Content-Encoding" in resposta.headers:
+            return False
+        if "no-transform" in resposta.headers.get("Cache-Control", ""):
+            return False
+
+        tipo = resposta.mimetype or ""
+        return tipo in TIPOS_COMPRIMIVEIS or tipo.startswith("text/")
+
+    def comprime_resposta(self, resposta):
+        if not self.comprimivel(resposta):
+            return resposta
+
+        # a resposta depende do Accept-Encoding mesmo quando não é comprimida
+        resposta.vary.add("Accept-Encoding")
+
+        codificacao = escolhe_codificacao(self.codificacoes)
+        if codificacao is None:
+            return resposta
+
+        if resposta.is_streamed:
+            original = resposta.response
+            resposta.response = self._comprime_stream(resposta.iter_encoded(), codificacao)
+            if hasattr(original, "close"):
+                resposta.call_on_close(original.close)
+            resposta.headers.pop("Content-Length", None)
+        else:
+            corpo = resposta.get_data()
+            if len(corpo) < self.tamanho_minimo:
+                return resposta
+
+            resposta.set_data(self._comprime(corpo, codificacao))
+
+        resposta.content_encoding = codificacao
+
+        # ETag próprio por codificação, como em `cache.resposta_condicional`
+        etag, fraco = resposta.get_etag()
+        if etag:
+            resposta.set_etag(f"{etag}-{codificacao}", weak=fraco)
+
+        return resposta
+
+    def _comprime(self, corpo, codificacao):
+        if codificacao == "br":
+            import brotli
+
+            return brotli.compress(corpo, quality=self.qualidade_brotli)
+
+        return gzip.compress(corpo, compresslevel=self.nivel_gzip, mtime=0)
+
+    def _comprime_stream(self, partes, codificacao):
+        # cada parte é enviada assim que gerada (flush), para o cliente não esperar o fim
+        if codificacao == "br":
+            import brotli
+
+            compressor = brotli.Compressor(quality=self.qualidade_brotli)
+            for parte in partes:
+                yield compressor.process(parte) + compressor.flush()
+            yield compressor.finish()
+            return
+
+        compressor = zlib.compressobj(self.nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for parte in partes:
+            yield compressor.compress(parte) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+COMPRESSAO_RESPOSTAS = CompressaoRespostas()
@@ -1,5 +1,9 @@
 #!/bin/sh
 
 flask db upgrade
+flask ecoponto recalcula-funcionamento
+flask ecoponto recalcula-localizacao
+flask publicacao recalcula-busca
 
-exec gunicorn --bind 0.0.0.0:80 "app:create_app()"
\ No newline at end of file
+# workers, threads e pool de conexões: ver gunicorn.conf.py
+exec gunicorn -c gunicorn.conf.py "app:create_app()"
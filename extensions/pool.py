@@ -0,0 +1,154 @@
+"""
+pool.py
+
+This file contains the configuration of the database connection pool. It will be
+imported by app, which builds SQLALCHEMY_ENGINE_OPTIONS with `opcoes_engine` and
+instruments the engine with `METRICAS_POOL`, and by the status resource.
+
+The options come from the environment (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+DB_POOL_RECYCLE, DB_POOL_PRE_PING and DB_STATEMENT_TIMEOUT_MS). With pre-ping, a
+connection left stale by a database failover is replaced when it is checked out,
+instead of failing the request. The metrics are kept per worker.
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+def _env_bool(nome, padrao):
+    return os.getenv(nome, str(padrao)).lower() not in ("false", "0", "no")
+
+
+def opcoes_engine(url):
+    """
+        Monta o SQLALCHEMY_ENGINE_OPTIONS a partir das variáveis de ambiente.
+
+        **Parâmetros:**
+            url (str): URI do banco; no SQLite (desenvolvimento) o pool padrão é mantido.
+
+        **Retorna:**
+            Um dicionário com as opções do `create_engine`.
+    """
+
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return {}
+
+    opcoes = {
+        "poolclass": PoolMedido,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+    # limite de tempo de cada instrução, em milissegundos (0: sem limite)
+    statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+    if statement_timeout and backend == "postgresql":
+        opcoes["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+
+    return opcoes
+
+
+class MetricasPool:
+    """
+        Métricas do pool de conexões do worker atual.
+
+        Além do estado do pool (conexões em uso, livres e em overflow), registra o tempo de
+        espera para obter uma conexão, os timeouts, as conexões abertas e as invalidadas
+        (por exemplo, descartadas pelo pre-ping depois de um failover).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.engine = None
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.checkouts = 0
+            self.espera_total = 0.0
+            self.espera_maxima = 0.0
+            self.timeouts = 0
+            self.conexoes_abertas = 0
+            self.conexoes_invalidadas = 0
+
+    def instrumentar(self, engine):
+        self.engine = engine
+        event.listen(engine, "connect", self._conectou)
+        event.listen(engine, "invalidate", self._invalidou)
+        event.listen(engine, "soft_invalidate", self._invalidou)
+
+    def _conectou(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.conexoes_abertas += 1
+
+    def _invalidou(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.conexoes_invalidadas += 1
+
+    def registrar_espera(self, segundos, timeout=False):
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+            if timeout:
+                self.timeouts += 1
+
+    def resumo(self):
+        """
+            **Retorna:**
+                Um dicionário com o estado atual do pool e as métricas acumuladas do worker.
+        """
+
+        pool = self.engine.pool if self.engine is not None else None
+        estado = {"classe": type(pool).__name__ if pool is not None else None}
+        if isinstance(pool, QueuePool):
+            estado.update({
+                "tamanho": pool.size(),
+                "em_uso": pool.checkedout(),
+                "livres": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            })
+
+        with self._lock:
+            estado.update({
+                "pid": os.getpid(),
+                "checkouts": self.checkouts,
+                "espera_media_ms": round(self.espera_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima * 1000, 3),
+                "timeouts": self.timeouts,
+                "conexoes_abertas": self.conexoes_abertas,
+                "conexoes_invalidadas": self.conexoes_invalidadas,
+            })
+
+        return estado
+
+
+METRICAS_POOL = MetricasPool()
+
+
+class PoolMedido(QueuePool):
+    """
+        QueuePool que registra em METRICAS_POOL quanto tempo cada checkout esperou por uma conexão.
+    """
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except PoolTimeoutError:
+            METRICAS_POOL.registrar_espera(time.perf_counter() - inicio, timeout=True)
+            raise
+
+        METRICAS_POOL.registrar_espera(time.perf_counter() - inicio)
+        return conexao
@@ -0,0 +1,111 @@
+"""
+provedor_json.py
+
+This file contains the JSON provider of the application (`app.json`), used by jsonify,
+by flask-smorest and by the streamed responses. It will be imported by app, which
+installs it with `cria_provedor_json`.
+
+When orjson is installed (and JSON_ORJSON is not false) the responses are encoded
+with it, straight to bytes; otherwise with the standard library. Both providers write
+the same output: compact, keys sorted, UTF-8 without escapes, dates and times in
+ISO 8601 and enums by their value.
+"""
+
+import dataclasses
+import datetime
+import decimal
+import uuid
+from enum import Enum
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _padrao(o):
+    # tipos que o json não serializa; o orjson já trata datas, horas, enums, uuid e dataclasses
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class ProvedorJSON(DefaultJSONProvider):
+    """
+        Provedor com o json da biblioteca padrão, com a mesma saída do ProvedorOrjson.
+    """
+
+    default = staticmethod(_padrao)
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.get("indent") is None and kwargs.get("separators") is None:
+            kwargs["separators"] = (",", ":")
+        return super().dumps(obj, **kwargs)
+
+
+class ProvedorOrjson(ProvedorJSON):
+    """
+        Provedor com o orjson.
+
+        A saída é sempre compacta (`separators` é ignorado). As opções que o orjson não
+        tem (ex.: `cls`, `indent` diferente de 2) e os valores que ele não serializa
+        (ex.: inteiros com mais de 64 bits, chaves que não são str) passam para o json
+        da biblioteca padrão.
+    """
+
+    def _codifica(self, obj, sort_keys=None, indent=None, default=None, separators=None, ensure_ascii=None, **kwargs):
+        sort_keys = self.sort_keys if sort_keys is None else sort_keys
+
+        if not kwargs and indent in (None, 2):
+            opcoes = 0
+            if sort_keys:
+                opcoes |= orjson.OPT_SORT_KEYS
+            if indent:
+                opcoes |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=default or self.default, option=opcoes)
+            except TypeError:
+                pass
+
+        return ProvedorJSON.dumps(
+            self, obj, sort_keys=sort_keys, indent=indent, separators=separators,
+            default=default or self.default, **kwargs,
+        ).encode()
+
+    def dumps(self, obj, **kwargs):
+        return self._codifica(obj, **kwargs).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # como o DefaultJSONProvider.response, mas sem passar o corpo por str
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        return self._app.response_class(self._codifica(obj, indent=indent) + b"\n", mimetype=self.mimetype)
+
+
+def cria_provedor_json(app):
+    """
+        **Retorna:**
+            O provedor JSON da aplicação: ProvedorOrjson se o orjson estiver instalado e
+            JSON_ORJSON não for false; senão ProvedorJSON.
+    """
+
+    if orjson is not None and app.config.get("JSON_ORJSON", True):
+        return ProvedorOrjson(app)
+    return ProvedorJSON(app)
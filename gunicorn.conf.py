@@ -0,0 +1,104 @@
+"""
+gunicorn.conf.py
+
+Configuração do gunicorn, lida pelo docker-entrypoint.sh (`gunicorn -c gunicorn.conf.py`).
+
+Todas as opções vêm de variáveis de ambiente:
+    GUNICORN_BIND              endereço (padrão 0.0.0.0:80)
+    GUNICORN_WORKER_CLASS      sync, gthread ou gevent (padrão gthread)
+    GUNICORN_WORKERS           processos (padrão 2 x CPUs + 1; no gevent, o número de CPUs)
+    GUNICORN_THREADS           threads por worker no gthread (padrão 4)
+    GUNICORN_WORKER_CONNECTIONS  requisições simultâneas por worker no gevent (padrão 100)
+    GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE
+    GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER
+    GUNICORN_PRELOAD           carrega a aplicação no master antes do fork (padrão true)
+
+O pool de conexões de cada worker (DB_POOL_SIZE e DB_MAX_OVERFLOW, ver extensions/pool.py)
+é dimensionado pelo número de requisições simultâneas do worker, se não for definido; com
+DB_MAX_CONEXOES, o overflow é reduzido para que o total dos workers não passe do limite.
+"""
+
+import logging
+import multiprocessing
+import os
+
+
+def _env_int(nome, padrao):
+    return int(os.getenv(nome, padrao))
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:80")
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class == "gevent":
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        logging.warning("gevent não está instalado; usando o worker gthread.")
+        worker_class = "gthread"
+
+if worker_class == "gevent":
+    # cada worker atende muitas requisições em greenlets; um processo por CPU basta
+    workers = _env_int("GUNICORN_WORKERS", multiprocessing.cpu_count())
+    worker_connections = _env_int("GUNICORN_WORKER_CONNECTIONS", 100)
+    simultaneas = worker_connections
+else:
+    workers = _env_int("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+    threads = _env_int("GUNICORN_THREADS", 4) if worker_class == "gthread" else 1
+    simultaneas = threads
+
+timeout = _env_int("GUNICORN_TIMEOUT", 60)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+# recicla os workers periodicamente; o jitter evita que todos reiniciem ao mesmo tempo
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 2000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 200)
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() != "false"
+
+# "-": stdout; vazio: sem log de acesso
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-") or None
+
+
+# Pool de conexões por worker: uma conexão por requisição simultânea (no gevent, no
+# máximo 10, as demais esperam no pool), mais um pequeno overflow.
+os.environ.setdefault("DB_POOL_SIZE", str(min(simultaneas, 10)))
+if "DB_MAX_OVERFLOW" not in os.environ:
+    max_overflow = 2
+    if os.getenv("DB_MAX_CONEXOES"):
+        disponivel = int(os.environ["DB_MAX_CONEXOES"]) // workers - int(os.environ["DB_POOL_SIZE"])
+        if disponivel < 0:
+            logging.warning(
+                f"{workers} workers x {os.environ['DB_POOL_SIZE']} conexões passa de DB_MAX_CONEXOES={os.environ['DB_MAX_CONEXOES']}"
+            )
+        max_overflow = max(min(disponivel, max_overflow), 0)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+
+
+def post_fork(server, worker):
+    # Com preload_app, o engine é criado no master: as conexões herdadas não podem ser
+    # usadas pelos workers, que abrem as suas. As métricas do pool também são por worker.
+    if not preload_app:
+        return
+
+    from extensions.database import db
+    from extensions.pool import METRICAS_POOL
+
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
+    METRICAS_POOL.zerar()
+
+
+def post_worker_init(worker):
+    # no gevent, o psycopg2 só coopera com os greenlets com o psycogreen (opcional)
+    if worker_class != "gevent":
+        return
+
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        logging.warning("psycogreen não está instalado; as consultas ao Postgres bloqueiam o worker gevent.")
+        return
+
+    patch_psycopg()
@@ -0,0 +1,79 @@
+"""localizacao: latitude/longitude numéricas
+
+Revision ID: 3f9a1c7d2b64
+Revises: ce037901eb00
+Create Date: 2026-10-17 09:12:41.512044
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c7d2b64'
+down_revision = 'ce037901eb00'
+branch_labels = None
+depends_on = None
+
+# número decimal com ponto, como ficam as coordenadas depois da normalização
+COORDENADA = r'[-+]?([0-9]+([.][0-9]*)?|[.][0-9]+)'
+
+
+def upgrade():
+    # as coordenadas eram texto livre: valores vazios ou não numéricos ficam nulos
+    # (ecoponto sem coordenadas) em vez de impedir a conversão da coluna
+    with op.batch_alter_table('localizacao', schema=None) as batch_op:
+        batch_op.alter_column('latitude', existing_type=sa.String(length=256), nullable=True)
+        batch_op.alter_column('longitude', existing_type=sa.String(length=256), nullable=True)
+
+    # normaliza separador decimal ("-27,59" -> "-27.59") antes da conversão
+    op.execute(
+        "UPDATE localizacao SET "
+        "latitude = NULLIF(REPLACE(TRIM(latitude), ',', '.'), ''), "
+        "longitude = NULLIF(REPLACE(TRIM(longitude), ',', '.'), '')"
+    )
+    for coluna in ('latitude', 'longitude'):
+        if op.get_context().dialect.name == 'postgresql':
+            op.execute(
+                f"UPDATE localizacao SET {coluna} = NULL "
+                f"WHERE {coluna} !~ '^{COORDENADA}$'"
+            )
+            continue
+
+        # SQLite (desenvolvimento): o CAST converteria texto não numérico em 0
+        conexao = op.get_bind()
+        for id, valor in conexao.execute(sa.text(f"SELECT id, {coluna} FROM localizacao WHERE {coluna} IS NOT NULL")).all():
+            if not re.fullmatch(COORDENADA, valor):
+                conexao.execute(sa.text(f"UPDATE localizacao SET {coluna} = NULL WHERE id = :id"), {"id": id})
+
+    with op.batch_alter_table('localizacao', schema=None) as batch_op:
+        batch_op.alter_column('latitude',
+               existing_type=sa.String(length=256),
+               type_=sa.Float(),
+               existing_nullable=True,
+               postgresql_using="NULLIF(latitude, '')::double precision")
+        batch_op.alter_column('longitude',
+               existing_type=sa.String(length=256),
+               type_=sa.Float(),
+               existing_nullable=True,
+               postgresql_using="NULLIF(longitude, '')::double precision")
+
+
+def downgrade():
+    with op.batch_alter_table('localizacao', schema=None) as batch_op:
+        batch_op.alter_column('longitude',
+               existing_type=sa.Float(),
+               type_=sa.String(length=256),
+               existing_nullable=True)
+        batch_op.alter_column('latitude',
+               existing_type=sa.Float(),
+               type_=sa.String(length=256),
+               existing_nullable=True)
+
+    op.execute("UPDATE localizacao SET latitude = COALESCE(latitude, ''), longitude = COALESCE(longitude, '')")
+
+    with op.batch_alter_table('localizacao', schema=None) as batch_op:
+        batch_op.alter_column('longitude', existing_type=sa.String(length=256), nullable=False)
+        batch_op.alter_column('latitude', existing_type=sa.String(length=256), nullable=False)
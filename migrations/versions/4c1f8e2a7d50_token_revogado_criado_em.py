@@ -0,0 +1,28 @@
+"""token_revogado.criado_em: marca de sincronização da blocklist
+
+Revision ID: 4c1f8e2a7d50
+Revises: b8e41d27c9f3
+Create Date: 2026-10-17 18:40:12.331904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1f8e2a7d50'
+down_revision = 'b8e41d27c9f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('token_revogado', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('criado_em', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+        batch_op.create_index(batch_op.f('ix_token_revogado_criado_em'), ['criado_em'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('token_revogado', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_revogado_criado_em'))
+        batch_op.drop_column('criado_em')
@@ -0,0 +1,29 @@
+"""ecoponto: resumo do horário de funcionamento gravado no ecoponto
+
+Revision ID: 5c7e9a2b4d18
+Revises: 8b2d4e6f1a93
+Create Date: 2026-10-17 11:20:44.512903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c7e9a2b4d18'
+down_revision = '8b2d4e6f1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # as linhas existentes são preenchidas com `flask ecoponto recalcula-funcionamento`
+    with op.batch_alter_table('ecoponto', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('funcionamento', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('funcionamentos', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('ecoponto', schema=None) as batch_op:
+        batch_op.drop_column('funcionamentos')
+        batch_op.drop_column('funcionamento')
@@ -0,0 +1,36 @@
+"""token_revogado: blocklist de tokens JWT compartilhada
+
+Revision ID: 8b2d4e6f1a93
+Revises: 3f9a1c7d2b64
+Create Date: 2026-10-17 10:03:27.208415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2d4e6f1a93'
+down_revision = '3f9a1c7d2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('token_revogado',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('jti', sa.String(length=36), nullable=False),
+    sa.Column('expira_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('token_revogado', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_token_revogado_expira_em'), ['expira_em'], unique=False)
+        batch_op.create_index(batch_op.f('ix_token_revogado_jti'), ['jti'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('token_revogado', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_revogado_jti'))
+        batch_op.drop_index(batch_op.f('ix_token_revogado_expira_em'))
+
+    op.drop_table('token_revogado')
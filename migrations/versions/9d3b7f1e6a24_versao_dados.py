@@ -0,0 +1,28 @@
+"""versao_dados: versão compartilhada dos snapshots em memória (índice espacial e mapa)
+
+Revision ID: 9d3b7f1e6a24
+Revises: 4c1f8e2a7d50
+Create Date: 2026-10-17 20:11:05.840317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3b7f1e6a24'
+down_revision = '4c1f8e2a7d50'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('versao_dados',
+    sa.Column('nome', sa.String(length=64), nullable=False),
+    sa.Column('versao', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('nome')
+    )
+
+
+def downgrade():
+    op.drop_table('versao_dados')
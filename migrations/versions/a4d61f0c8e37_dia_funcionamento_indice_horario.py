@@ -0,0 +1,26 @@
+"""dia_funcionamento: índice (dia_semana, hora_inicial, hora_final, ecoponto_id)
+
+Revision ID: a4d61f0c8e37
+Revises: 5c7e9a2b4d18
+Create Date: 2026-10-17 12:05:10.381264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d61f0c8e37'
+down_revision = '5c7e9a2b4d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('dia_funcionamento', schema=None) as batch_op:
+        batch_op.create_index('ix_dia_funcionamento_dia_horario', ['dia_semana', 'hora_inicial', 'hora_final', 'ecoponto_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('dia_funcionamento', schema=None) as batch_op:
+        batch_op.drop_index('ix_dia_funcionamento_dia_horario')
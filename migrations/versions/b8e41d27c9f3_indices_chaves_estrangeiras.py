@@ -0,0 +1,71 @@
+"""índices das chaves estrangeiras e filtros; unicidade nas tabelas de associação
+
+Revision ID: b8e41d27c9f3
+Revises: e7a15c93b0d4
+Create Date: 2026-10-17 16:02:41.507318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e41d27c9f3'
+down_revision = 'e7a15c93b0d4'
+branch_labels = None
+depends_on = None
+
+
+# índices de uma coluna: tabela -> colunas
+INDICES = {
+    'ecoponto': ['empresa_id'],
+    'dia_funcionamento': ['ecoponto_id'],
+    'ecoponto_residuo': ['residuo_id'],
+    'categoria_residuo': ['residuo_id'],
+    'publicacao': ['ativo', 'categoria_id', 'residuo_id'],
+    'arte_publicitaria': ['residuo_id'],
+    'secao_publicacao': ['publicacao_id'],
+    'aceite_termo': ['termo_id'],
+    'empresa': ['usuario_id'],
+}
+
+# unicidade das tabelas de associação: tabela -> (nome, colunas, manter)
+# linhas repetidas são removidas antes, mantendo a de menor id (ou a mais recente, no aceite)
+UNICOS = {
+    'ecoponto_residuo': ('uq_ecoponto_residuo', ['ecoponto_id', 'residuo_id'], 'MIN'),
+    'categoria_residuo': ('uq_categoria_residuo', ['categoria_id', 'residuo_id'], 'MIN'),
+    'aceite_termo': ('uq_aceite_termo', ['empresa_id', 'termo_id'], 'MAX'),
+}
+
+
+def upgrade():
+    for tabela, (nome, colunas, manter) in UNICOS.items():
+        op.execute(
+            f"DELETE FROM {tabela} WHERE id NOT IN "
+            f"(SELECT {manter}(id) FROM {tabela} GROUP BY {', '.join(colunas)})"
+        )
+
+    for tabela in INDICES.keys() | UNICOS.keys():
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            for coluna in INDICES.get(tabela, []):
+                batch_op.create_index(batch_op.f(f'ix_{tabela}_{coluna}'), [coluna], unique=False)
+
+            if tabela in UNICOS:
+                nome, colunas, _ = UNICOS[tabela]
+                batch_op.create_unique_constraint(nome, colunas)
+
+            if tabela == 'ecoponto':
+                batch_op.create_index('ix_ecoponto_situacao_ativo', ['situacao', 'ativo'], unique=False)
+
+
+def downgrade():
+    for tabela in INDICES.keys() | UNICOS.keys():
+        with op.batch_alter_table(tabela, schema=None) as batch_op:
+            if tabela == 'ecoponto':
+                batch_op.drop_index('ix_ecoponto_situacao_ativo')
+
+            if tabela in UNICOS:
+                batch_op.drop_constraint(UNICOS[tabela][0], type_='unique')
+
+            for coluna in INDICES.get(tabela, []):
+                batch_op.drop_index(batch_op.f(f'ix_{tabela}_{coluna}'))
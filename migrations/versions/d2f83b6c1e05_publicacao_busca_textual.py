@@ -0,0 +1,42 @@
+"""publicacao: textos normalizados e índice GIN para busca textual
+
+Revision ID: d2f83b6c1e05
+Revises: a4d61f0c8e37
+Create Date: 2026-10-17 13:02:51.774310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f83b6c1e05'
+down_revision = 'a4d61f0c8e37'
+branch_labels = None
+depends_on = None
+
+
+# mesma expressão de utilities.busca_textual.vetor_postgres
+VETOR_BUSCA = (
+    "(setweight(to_tsvector('portuguese'::regconfig, coalesce(titulo_busca, '')), 'A') || "
+    "setweight(to_tsvector('portuguese'::regconfig, coalesce(texto_busca, '')), 'B'))"
+)
+
+
+def upgrade():
+    # as linhas existentes são preenchidas com `flask publicacao recalcula-busca`
+    with op.batch_alter_table('publicacao', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('titulo_busca', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('texto_busca', sa.Text(), nullable=True))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"CREATE INDEX ix_publicacao_busca ON publicacao USING gin ({VETOR_BUSCA})")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_publicacao_busca")
+
+    with op.batch_alter_table('publicacao', schema=None) as batch_op:
+        batch_op.drop_column('texto_busca')
+        batch_op.drop_column('titulo_busca')
@@ -0,0 +1,38 @@
+"""localizacao: endereço normalizado (pg_trgm) e CEP só com dígitos
+
+Revision ID: e7a15c93b0d4
+Revises: d2f83b6c1e05
+Create Date: 2026-10-17 13:48:09.120557
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a15c93b0d4'
+down_revision = 'd2f83b6c1e05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # as linhas existentes são preenchidas com `flask ecoponto recalcula-localizacao`
+    with op.batch_alter_table('localizacao', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('endereco_busca', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('cep_digitos', sa.String(length=8), nullable=True))
+        batch_op.create_index(batch_op.f('ix_localizacao_cep_digitos'), ['cep_digitos'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX ix_localizacao_endereco_busca_trgm ON localizacao USING gin (endereco_busca gin_trgm_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_localizacao_endereco_busca_trgm")
+
+    with op.batch_alter_table('localizacao', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_localizacao_cep_digitos'))
+        batch_op.drop_column('cep_digitos')
+        batch_op.drop_column('endereco_busca')
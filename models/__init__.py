@@ -13,3 +13,5 @@ from models.publicacao import PublicacaoModel
 from models.secao_publicacao import SecaoPublicacaoModel
 from models.categoria_residuo import CategoriaResiduoModel
 from models.ecoponto_residuo import EcopontoResiduoModel
+from models.token_revogado import TokenRevogadoModel
+from models.versao_dados import VersaoDadosModel
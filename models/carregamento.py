@@ -0,0 +1,84 @@
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from models.ecoponto import EcopontoModel
+from models.empresa import EmpresaModel
+from utilities.campos import relacoes_selecionadas
+
+
+# Perfis de carregamento (eager loading) por endpoint.
+# Cada perfil é uma tupla de opções para `query.options(*PERFIL)` que carrega
+# as relações serializadas pelo schema do endpoint em um número fixo de consultas,
+# independente da quantidade de registros da página.
+
+
+# EcopontoGetSchema: localização, dias de funcionamento, resíduos e empresa (com aceite de termos)
+ECOPONTO_COMPLETO = (
+    selectinload(EcopontoModel.localizacao),
+    selectinload(EcopontoModel.dia_funcionamento),
+    selectinload(EcopontoModel.residuo),
+    joinedload(EcopontoModel.empresa).selectinload(EmpresaModel.aceite_termo),
+)
+
+# EcopontoLocalizacaoSchema: apenas localização
+ECOPONTO_LOCALIZACAO = (
+    selectinload(EcopontoModel.localizacao),
+)
+
+# Opções de carregamento de cada relação de EcopontoGetSchema, usadas quando o
+# endpoint recebe `fields` (apenas as relações pedidas são carregadas)
+ECOPONTO_RELACOES = {
+    "localizacao": (selectinload(EcopontoModel.localizacao),),
+    "dia_funcionamento": (selectinload(EcopontoModel.dia_funcionamento),),
+    "residuo": (selectinload(EcopontoModel.residuo),),
+    "empresa": (joinedload(EcopontoModel.empresa).selectinload(EmpresaModel.aceite_termo),),
+}
+
+
+def perfil_ecoponto(campos, perfil=ECOPONTO_COMPLETO):
+    """
+        Retorna as opções de carregamento para os campos selecionados de um ecoponto:
+        apenas as colunas (load_only) e as relações pedidas. Se `campos` for None,
+        retorna o perfil completo.
+    """
+
+    if campos is None:
+        return perfil
+
+    relacoes = relacoes_selecionadas(campos)
+    colunas = EcopontoModel.__table__.columns
+    selecionadas = [getattr(EcopontoModel, campo) for campo in relacoes if campo in colunas]
+    if "empresa" in relacoes:
+        selecionadas.append(EcopontoModel.empresa_id)
+
+    opcoes = [load_only(EcopontoModel.id, *selecionadas)]
+    for relacao in relacoes:
+        opcoes.extend(ECOPONTO_RELACOES.get(relacao, ()))
+
+    return tuple(opcoes)
+
+
+# EmpresaGetSchema: aceite de termos. A relação ecopontos é "dynamic" e não pode ser
+# carregada antecipadamente; os ecopontos das empresas são consultados à parte, de uma vez.
+EMPRESA_COMPLETO = (
+    selectinload(EmpresaModel.aceite_termo),
+)
+
+
+def perfil_empresa(campos, perfil=EMPRESA_COMPLETO):
+    """
+        Retorna as opções de carregamento para os campos selecionados de uma empresa.
+        Se `campos` for None, retorna o perfil completo.
+    """
+
+    if campos is None:
+        return perfil
+
+    relacoes = relacoes_selecionadas(campos)
+    colunas = EmpresaModel.__table__.columns
+    selecionadas = [getattr(EmpresaModel, campo) for campo in relacoes if campo in colunas]
+
+    opcoes = [load_only(EmpresaModel.id, *selecionadas)]
+    if "aceite_termo" in relacoes:
+        opcoes.extend(EMPRESA_COMPLETO)
+
+    return tuple(opcoes)
@@ -3,9 +3,13 @@ from extensions.database import db
 
 class CategoriaResiduoModel(db.Model):
     __tablename__ = "categoria_residuo"
+    __table_args__ = (
+        # também serve às buscas pela categoria_id (primeira coluna)
+        db.UniqueConstraint("categoria_id", "residuo_id", name="uq_categoria_residuo"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
-    residuo_id = db.Column(db.Integer, db.ForeignKey("residuo.id"), unique=False, nullable=False)    
+    residuo_id = db.Column(db.Integer, db.ForeignKey("residuo.id"), unique=False, index=True, nullable=False)    
     categoria_id = db.Column(db.Integer, db.ForeignKey("categoria.id"), unique=False, nullable=False)
     
\ No newline at end of file
@@ -6,6 +6,10 @@ from models.enums.dia_semana import DiasSemanaEnum
 
 class DiaFuncionamentoModel(db.Model):
     __tablename__ = "dia_funcionamento"
+    __table_args__ = (
+        # filtro "aberto agora": dia da semana + faixa de horário -> ecoponto
+        db.Index("ix_dia_funcionamento_dia_horario", "dia_semana", "hora_inicial", "hora_final", "ecoponto_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     dia_semana = db.Column(Enum(DiasSemanaEnum))
@@ -13,6 +17,6 @@ class DiaFuncionamentoModel(db.Model):
     hora_inicial = db.Column(db.Time)
     hora_final = db.Column(db.Time)
     
-    ecoponto_id = db.Column(db.Integer, db.ForeignKey("ecoponto.id"), unique=False, nullable=False)
+    ecoponto_id = db.Column(db.Integer, db.ForeignKey("ecoponto.id"), unique=False, index=True, nullable=False)
     ecoponto = db.relationship("EcopontoModel", back_populates="dia_funcionamento")
     
\ No newline at end of file
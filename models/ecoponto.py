@@ -6,6 +6,10 @@ from models.enums.situacao_ecoponto import SituacaoEnum
 
 class EcopontoModel(db.Model):
     __tablename__ = "ecoponto"
+    __table_args__ = (
+        # listagens públicas (ativo e aprovado) e totais por situação
+        db.Index("ix_ecoponto_situacao_ativo", "situacao", "ativo"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String, nullable=False)
@@ -14,11 +18,15 @@ class EcopontoModel(db.Model):
     data_inicio = db.Column(db.Date, default=datetime.now().date)
     data_final = db.Column(db.Date, default=lambda: (datetime.now() + timedelta(days=365*12)).date())
     ativo = db.Column(db.Boolean, default=True)
+
+    # resumo dos dias de funcionamento, recalculado quando eles são gravados
+    funcionamento = db.Column(db.String)
+    funcionamentos = db.Column(db.JSON)
     
-    empresa_id = db.Column(db.Integer, db.ForeignKey("empresa.id"), unique=False, nullable=False)
+    empresa_id = db.Column(db.Integer, db.ForeignKey("empresa.id"), unique=False, index=True, nullable=False)
     empresa = db.relationship("EmpresaModel", back_populates="ecopontos")
     
-    dia_funcionamento = db.relationship("DiaFuncionamentoModel", back_populates="ecoponto", lazy="dynamic")
+    dia_funcionamento = db.relationship("DiaFuncionamentoModel", back_populates="ecoponto")
     localizacao = db.relationship("LocalizacaoModel", back_populates="ecoponto")
     residuo = db.relationship("ResiduoModel", back_populates="ecoponto", secondary="ecoponto_residuo")
     
\ No newline at end of file
@@ -3,9 +3,13 @@ from extensions.database import db
 
 class EcopontoResiduoModel(db.Model):
     __tablename__ = "ecoponto_residuo"
+    __table_args__ = (
+        # também serve às buscas pelo ecoponto_id (primeira coluna)
+        db.UniqueConstraint("ecoponto_id", "residuo_id", name="uq_ecoponto_residuo"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
-    residuo_id = db.Column(db.Integer, db.ForeignKey("residuo.id"), unique=False, nullable=False)    
+    residuo_id = db.Column(db.Integer, db.ForeignKey("residuo.id"), unique=False, index=True, nullable=False)    
     ecoponto_id = db.Column(db.Integer, db.ForeignKey("ecoponto.id"), unique=False, nullable=False)
     
\ No newline at end of file
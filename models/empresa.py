@@ -15,8 +15,8 @@ class EmpresaModel(db.Model):
     descricao_outros_projetos = db.Column(db.String, nullable=True)
     nome_contato_responsavel = db.Column(db.String, nullable=False)
     
-    usuario_id = db.Column(db.Integer, db.ForeignKey("usuario.id"), unique=False, nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey("usuario.id"), unique=False, index=True, nullable=False)
     usuario = db.relationship("UsuarioModel", back_populates="empresa")
     
     ecopontos = db.relationship("EcopontoModel", back_populates="empresa", lazy="dynamic")
-    aceite_termo = db.relationship("TermoAceiteModel", back_populates="empresa", lazy="dynamic")
+    aceite_termo = db.relationship("TermoAceiteModel", back_populates="empresa")
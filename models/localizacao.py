@@ -1,4 +1,6 @@
 from extensions.database import db
+from utilities.apenas_digitos import apenas_digitos
+from utilities.busca_textual import normaliza
 
 class LocalizacaoModel(db.Model):
     __tablename__ = "localizacao"
@@ -11,10 +13,26 @@ class LocalizacaoModel(db.Model):
     cidade = db.Column(db.String(256), nullable=False)
     estado = db.Column(db.String(256), nullable=False)
     complemento = db.Column(db.String(256), nullable=True)
-    latitude = db.Column(db.String(256), nullable=False)
-    longitude = db.Column(db.String(256), nullable=False)
+    # nulas apenas nos endereços antigos cujas coordenadas (texto livre) não eram números
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
     url_localizacao = db.Column(db.String(256), nullable=True)
+
+    # campos de busca, recalculados a cada gravação (ver atualiza_busca):
+    # endereço completo em minúsculas e sem acentos (no Postgres, índice pg_trgm) e CEP só com dígitos
+    endereco_busca = db.Column(db.Text)
+    cep_digitos = db.Column(db.String(8), index=True)
     
     ecoponto_id = db.Column(db.Integer, db.ForeignKey("ecoponto.id"), unique=True, nullable=False)
     ecoponto = db.relationship("EcopontoModel", back_populates="localizacao")
-    
\ No newline at end of file
+
+    def atualiza_busca(self):
+        self.cep_digitos = apenas_digitos(self.cep or "")[:8]
+        campos = [self.rua, self.numero, self.bairro, self.cep, self.cep_digitos, self.cidade, self.estado, self.complemento]
+        self.endereco_busca = normaliza(" ".join(campo for campo in campos if campo))
+
+
+@db.event.listens_for(LocalizacaoModel, "before_insert")
+@db.event.listens_for(LocalizacaoModel, "before_update")
+def atualiza_busca_localizacao(mapper, connection, localizacao):
+    localizacao.atualiza_busca()
@@ -10,12 +10,17 @@ class PublicacaoModel(db.Model):
     url_media = db.Column(db.String, nullable=True)
     data_inicio = db.Column(db.Date, default=datetime.now().date())
     data_final = db.Column(db.Date, default=(datetime.now() + timedelta(days=12000)).date())
-    ativo = db.Column(db.Boolean, default=True)
+    ativo = db.Column(db.Boolean, default=True, index=True)
 
-    categoria_id = db.Column(db.Integer, db.ForeignKey("categoria.id"), unique=False, nullable=True)
+    # textos normalizados (minúsculas, sem acentos) da publicação e das seções ativas,
+    # usados na busca textual; no Postgres há um índice GIN sobre o tsvector destes campos
+    titulo_busca = db.Column(db.Text)
+    texto_busca = db.Column(db.Text)
+
+    categoria_id = db.Column(db.Integer, db.ForeignKey("categoria.id"), unique=False, index=True, nullable=True)
     categoria = db.relationship("CategoriaModel", back_populates="publicacao")
    
-    residuo_id = db.Column(db.Integer, db.ForeignKey("residuo.id"), unique=False, nullable=True)
+    residuo_id = db.Column(db.Integer, db.ForeignKey("residuo.id"), unique=False, index=True, nullable=True)
     residuo = db.relationship("ResiduoModel", back_populates="publicacao")
     
     secao_publicacao = db.relationship("SecaoPublicacaoModel", back_populates="publicacao", lazy="dynamic")
@@ -12,5 +12,5 @@ class SecaoPublicacaoModel(db.Model):
     data_final = db.Column(db.Date, default=(datetime.now() + timedelta(days=12000)).date())
     ativo = db.Column(db.Boolean, default=True)
     
-    publicacao_id = db.Column(db.Integer, db.ForeignKey("publicacao.id"), unique=False, nullable=False)
+    publicacao_id = db.Column(db.Integer, db.ForeignKey("publicacao.id"), unique=False, index=True, nullable=False)
     publicacao = db.relationship("PublicacaoModel", back_populates="secao_publicacao")
@@ -0,0 +1,11 @@
+from extensions.database import db
+
+
+class TokenRevogadoModel(db.Model):
+    __tablename__ = "token_revogado"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False, index=True)
+    expira_em = db.Column(db.DateTime, nullable=False, index=True)
+    # relógio do banco: a sincronização dos workers compara apenas valores desta coluna
+    criado_em = db.Column(db.DateTime, nullable=False, index=True, server_default=db.func.now())
@@ -0,0 +1,9 @@
+from extensions.database import db
+
+
+class VersaoDadosModel(db.Model):
+    __tablename__ = "versao_dados"
+
+    # contador de escritas por snapshot em memória (ver utilities/versao_dados.py)
+    nome = db.Column(db.String(64), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
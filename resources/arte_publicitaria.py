@@ -11,7 +11,9 @@ from extensions.database import db
 from models.arte_publicitaria import ArtePublicitariaModel
 from models.ecoponto import EcopontoModel
 from models.residuo import ResiduoModel
+from utilities.paginacao import paginar
 from schemas.arte_publicitaria import ArtePublicitariaSearchSchema, PlainArtePublicitariaGetListSchema, PlainArtePublicitariaGetSchema, PlainArtePublicitariaSchema
+from schemas.registro import serializador
 
 blp = Blueprint("Arte Publicitária", "arte publicitaria", description="Operações sobre arte publicitária")
 
@@ -56,7 +58,7 @@ class ArtePublicitaria(MethodView):
         """
 
         arte_publicitaria = ArtePublicitariaModel().query.get_or_404(artepublicitaria_id)
-        arte_publicitaria_schema = PlainArtePublicitariaSchema()
+        arte_publicitaria_schema = serializador(PlainArtePublicitariaSchema)
         result = arte_publicitaria_schema.dump(arte_publicitaria)
         context = {
             "code": 200,
@@ -165,7 +167,7 @@ class ArtePublicitaria(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        arte_publicitaria_schema = PlainArtePublicitariaSchema()
+        arte_publicitaria_schema = serializador(PlainArtePublicitariaSchema)
         result = arte_publicitaria_schema.dump(arte_publicitaria)
 
         context = {
@@ -212,20 +214,17 @@ class ArtesPublicitarias(MethodView):
                 - ecoponto_id (int): ID do ecoponto.
                 - page (int): Número da página.
                 - page_size (int): Número de registros por página.
+                - cursor (str): cursor da próxima página (next_cursor); vazio para a primeira página.
+                - include_total (bool): se falso, não calcula o total de registros.
 
             **Retorna**:
                 Um objeto JSON com a lista de artes publicitarias filtrados pelos critérios informados e informações 
                 de paginação.
         """
 
-        result_lista = []
-
         residuo_id = query_args.get("residuo_id")
         ecoponto_id = query_args.get("ecoponto_id")
 
-        pagina = int(query_args.get("page", 1))
-        limite = int(query_args.get("page_size", 0))
-
         query = ArtePublicitariaModel.query.filter(ArtePublicitariaModel.ativo, ArtePublicitariaModel.disponibilizar_ecoponto)
 
   
@@ -241,25 +240,9 @@ class ArtesPublicitarias(MethodView):
                 query = query.filter(ArtePublicitariaModel.residuo_id.in_(residuos_ecoponto_ids))
 
 
-        total_registros = query.count()
-
-        if limite < 1:
-            limite = total_registros
-        publicacoes = query.offset((pagina - 1) * limite).limit(limite).all()
+        publicacoes, paginacao = paginar(query, ArtePublicitariaModel.id, query_args)
 
-        for arte in publicacoes:
-            arte_publicitaria_schema = PlainArtePublicitariaSchema()
-            result = arte_publicitaria_schema.dump(arte)
-            
-            result_lista.append(result)
-
-        paginacao = {
-            "total": total_registros,
-            "page": pagina,
-            "page_size": limite,
-            "previous": pagina > 1,
-            "next": total_registros > pagina * limite
-        }
+        result_lista = serializador(PlainArtePublicitariaSchema, many=True).dump(publicacoes)
 
         context = {
             "code": 200,
@@ -343,7 +326,7 @@ class ArtesPublicitarias(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        arte_publicitaria_schema = PlainArtePublicitariaSchema()
+        arte_publicitaria_schema = serializador(PlainArtePublicitariaSchema)
         result = arte_publicitaria_schema.dump(arte_publicitaria)
         context = {
             "code": 201,
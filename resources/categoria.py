@@ -2,12 +2,15 @@ import logging.handlers
 from flask import jsonify
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
+from cache import CACHE_RESPOSTAS, cache_resposta
 from models.categoria import CategoriaModel
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from extensions.database import db
 from models.categoria_residuo import CategoriaResiduoModel
 from models.residuo import ResiduoModel
+from utilities.associacao import sincroniza_associacao, valida_ids
 from schemas.categoria_residuo import CategoriaSchema, PlainCategoriaSchema, RetornoCategoriaSchema, SearchSchema
+from schemas.registro import serializador
 
 blp = Blueprint("Categorias", "Categorias", description="Operações sobre categorias de resíduos")
 
@@ -16,11 +19,12 @@ blp = Blueprint("Categorias", "Categorias", description="Operações sobre categ
 @blp.route("/categoria/<int:categoria_id>")
 class Categoria(MethodView):
 
+    @cache_resposta("categoria_residuo")
     @blp.response(200, RetornoCategoriaSchema)
     def get(self, categoria_id):
         
         categoria = CategoriaModel().query.get_or_404(categoria_id)
-        categoria_schema = CategoriaSchema()
+        categoria_schema = serializador(CategoriaSchema)
         result = categoria_schema.dump(categoria)
 
         context = {
@@ -39,6 +43,7 @@ class Categoria(MethodView):
             categoria = CategoriaModel().query.get_or_404(categoria_id)
             db.session.delete(categoria)
             db.session.commit()
+            CACHE_RESPOSTAS.invalidar("categoria_residuo")
 
             message = f"Categoria excluído com sucesso"
             logging.debug(message)
@@ -86,6 +91,7 @@ class Categoria(MethodView):
         try:
             db.session.add(categoria)
             db.session.commit()
+            CACHE_RESPOSTAS.invalidar("categoria_residuo")
 
             message = f"Categoria editada com sucesso"
             logging.debug(message)
@@ -102,7 +108,7 @@ class Categoria(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        categoria_schema = CategoriaSchema()
+        categoria_schema = serializador(CategoriaSchema)
         result = categoria_schema.dump(categoria)
 
         context = {
@@ -118,6 +124,7 @@ class Categoria(MethodView):
 @blp.route("/categoria")
 class Categorias(MethodView):
 
+    @cache_resposta("categoria_residuo")
     @blp.arguments(SearchSchema, location="query")
     @blp.response(200, RetornoCategoriaSchema(many=True))
     def get(self, query_args):
@@ -135,8 +142,6 @@ class Categorias(MethodView):
                 Um objeto JSON com a lista de categorias filtrados pelos critérios informados.
         """
 
-        result_lista = []
-
         descricao = query_args.get("descricao")
 
         query = CategoriaModel.query.filter(CategoriaModel.ativo)
@@ -146,11 +151,7 @@ class Categorias(MethodView):
             query = query.filter(CategoriaModel.descricao.ilike(f'%{descricao}%'))
         
 
-        for categoria in query:
-            categoria_schema = CategoriaSchema()
-            result = categoria_schema.dump(categoria)
-            
-            result_lista.append(result)
+        result_lista = serializador(CategoriaSchema, many=True).dump(query)
 
         context = {
             "code": 200,
@@ -190,22 +191,21 @@ class Categorias(MethodView):
         )
 
        
+        residuos_list = valida_ids(ResiduoModel, [residuo.get('id') for residuo in residuos or []], "Resíduos")
+
         # Salva em BD
         try:
             db.session.add(categoria)
 
-            if residuos:
-                for residuo in residuos:
-                    id_residuo = residuo.get('id')
-                    residuo_object = ResiduoModel().query.get_or_404(id_residuo)
-                    
-                    categoria_residuo = CategoriaResiduoModel(
-                        residuo_id=residuo_object.id,
-                        categoria_id=categoria.id
-                    )
-                    db.session.add(categoria_residuo)
+            if residuos_list:
+                db.session.flush()
+                sincroniza_associacao(
+                    CategoriaResiduoModel.categoria_id, categoria.id, CategoriaResiduoModel.residuo_id, residuos_list,
+                    remover=False
+                )
 
             db.session.commit()
+            CACHE_RESPOSTAS.invalidar("categoria_residuo")
 
             message = f"Categoria criada com sucesso"
             logging.debug(message)
@@ -223,7 +223,7 @@ class Categorias(MethodView):
             abort(500, message="Server Error.")
 
 
-        categoria_schema = CategoriaSchema()
+        categoria_schema = serializador(CategoriaSchema)
         result = categoria_schema.dump(categoria)
 
         context = {
@@ -1,106 +1,323 @@
 import logging.handlers
-from flask import jsonify
+import re
+from datetime import timedelta
+from flask import current_app, jsonify
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
-from sqlalchemy import or_
+from marshmallow import ValidationError
+from sqlalchemy import and_, exists, func, insert, or_, select
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from collections import defaultdict
-import itertools
 
+from cache import cache_resposta, resposta_condicional
 from extensions.database import db
+from models.carregamento import ECOPONTO_COMPLETO, ECOPONTO_LOCALIZACAO, perfil_ecoponto
 from models.dia_funcionamento import DiaFuncionamentoModel
 from models.ecoponto import EcopontoModel
 from models.ecoponto_residuo import EcopontoResiduoModel
 from models.empresa import EmpresaModel
-from models.enums.dia_semana import DiasSemanaEnum
 from models.enums.situacao_ecoponto import SituacaoEnum
 from models.localizacao import LocalizacaoModel
 from models.residuo import ResiduoModel
+from utilities.apenas_digitos import apenas_digitos
+from utilities.associacao import sincroniza_associacao, valida_ids
+from utilities.busca_textual import normaliza
+from utilities.campos import seleciona_campos
+from utilities.funcionamento import atualiza_funcionamento, dia_semana_de, momento_local, resumo_funcionamento
+from utilities.importacao import linhas_importacao
+from utilities.indice_espacial import IndiceEspacial
+from utilities.mapa import MapaEcopontos
 from schemas.empresa_ecoponto import (
+    CamposSearchSchema,
+    EcopontoControleSearchSchema,
     EcopontoFuncionamentoSchema,
     EcopontoGetSchema,
     EcopontoListaSituacaoSchema,
     EcopontoLocalizacaoResiduoSchema,
     EcopontoLocalizacaoSchema,
+    EcopontoLoteSchema,
+    EcopontoMapaSearchSchema,
+    EcopontoProximoSearchSchema,
     EcopontoResiduoSchema,
     EcopontoSearchSchema,
     EcopontoSituacaoSchema,
     RetornoEcopontoFuncionamentoSchema,
+    RetornoEcopontoLoteSchema,
+    RetornoEcopontoMapaSchema,
     RetornoEcopontoSchema,
     RetornoEcopontoResiduoSchema,
     RetornoEcopontoSituacaoSchema,
     RetornoListaEcopontoLocalizacaoSchema,
+    RetornoListaEcopontoProximoSchema,
     RetornoListaEcopontoSchema,
 )
 from schemas.paginacao import PaginacaoSearchSchema
+from schemas.registro import serializador
+from utilities.paginacao import paginar
+from utilities.stream_json import VALORES, registros_em_lotes, resposta_stream
+from utilities.versao_dados import VersaoDados
 
 blp = Blueprint("Ecopontos", "ecopontos", description="Operações sobre ecopontos")
 
-def retira_valor_enumSituacao(valor):
-    enum = str(valor).split('.')
-    enum = enum[-1]
+CEP = re.compile(r"^\d{5}-?\d{0,3}$")
 
-    valor = SituacaoEnum[enum].value
-    nome = SituacaoEnum[enum].name
-    return valor, nome
+def ids_residuos(residuo_id):
+    # converte a string "[1, 3, 5]" / "1,3,5" em lista de ids, sem duplicatas e mantendo a ordem
+    numeros = residuo_id.strip("[]").replace(" ", "").split(',')
+    return [int(id) for id in dict.fromkeys(numeros) if id.isdigit()]
 
-def retira_valor_enumDiasSemana(valor):
-    enum = str(valor).split('.')
-    enum = enum[-1]
-    valor = DiasSemanaEnum[enum].value
-    nome = DiasSemanaEnum[enum].name
-    return valor, nome
 
-def transforma_dia_funcionamento(dias_funcionamento):
+def filtro_residuos(residuos_ids, match="any"):
+    """
+        Retorna o critério para filtrar ecopontos pelos resíduos recebidos.
 
-    for horario in dias_funcionamento:
-        enum, dia = retira_valor_enumDiasSemana(horario['dia_semana'])
-        horario['dia_semana'] = dia
-    return dias_funcionamento
+        **Parâmetros:**
+            residuos_ids (list): ids dos resíduos.
+            match (str): "any" - recebe ao menos um dos resíduos; 
+                "all" - recebe todos os resíduos.
+    """
 
-    
-def agrupar_horarios(dia_funcionamento):
-
-    # Passo 1: Organizar horários por dia da semana
-    horarios_por_dia = defaultdict(list)
-    for horario in dia_funcionamento:
-        dia = horario['dia_semana']
-        intervalo = f"{horario['hora_inicial']} às {horario['hora_final']}"
-        horarios_por_dia[dia].append(intervalo)
-
-    # Passo 2: Identificar horários iguais em dias consecutivos
-    dias_semana = ["seg", "ter", "qua", "qui", "sex", "sab", "dom"]
-    grupos = []
-    for key, group in itertools.groupby(enumerate(dias_semana), lambda x: horarios_por_dia.get(x[1])):
-        dias_grupo = list(group)
-        if key:  # Apenas adiciona se key não for None
-            grupos.append((key, [dias[1] for dias in dias_grupo]))
-
-    # Passo 3: Criar a string resumida
-    partes = []
-
-    for horarios, dias in grupos:
-        dias_str = dias[0] if len(dias) == 1 else f"{dias[0]} a {dias[-1]}"
-        horarios_str = " - ".join(horarios_por_dia[dias[0]])
-        partes.append(f"{dias_str} das {horarios_str}")
-
-
-    funcionamento_string = ""
-    len_partes = len(partes) - 1
-    for index, parte in enumerate(partes):
-        
-        # ultimo ou só tem um
-        if index == len_partes or len_partes == 0:
-            funcionamento_string += f"{parte} "
-        
-        # penúltimo
-        elif (len_partes - index) == 1:
-            funcionamento_string += f"{parte} e "
+    if match == "all":
+        ecopontos_com_todos = (
+            select(EcopontoResiduoModel.ecoponto_id)
+            .where(EcopontoResiduoModel.residuo_id.in_(residuos_ids))
+            .group_by(EcopontoResiduoModel.ecoponto_id)
+            .having(func.count(func.distinct(EcopontoResiduoModel.residuo_id)) == len(residuos_ids))
+        )
+        return EcopontoModel.id.in_(ecopontos_com_todos)
+
+    return exists().where(
+        EcopontoResiduoModel.ecoponto_id == EcopontoModel.id,
+        EcopontoResiduoModel.residuo_id.in_(residuos_ids),
+    )
+
+
+def filtro_localizacao(termo):
+    """
+        Retorna o critério para filtrar ecopontos pela localização.
+
+        **Descrição:** Se o termo for um CEP (5 a 8 dígitos, com ou sem hífen), busca pelo prefixo
+            em cep_digitos (índice b-tree). Senão, busca o termo, sem acentos e em minúsculas, em
+            endereco_busca (no Postgres, índice pg_trgm).
+
+        **Parâmetros:**
+            termo (str): termo informado na pesquisa.
+    """
+
+    termo = termo.strip()
+    if CEP.match(termo):
+        digitos = apenas_digitos(termo)
+        # intervalo [digitos, próximo prefixo) em vez de LIKE, para usar o índice em qualquer banco;
+        # um prefixo só de 9 não tem próximo com o mesmo número de dígitos ("99999" -> "100000")
+        if digitos == "9" * len(digitos):
+            return LocalizacaoModel.cep_digitos >= digitos
+
+        proximo = str(int(digitos) + 1).zfill(len(digitos))
+        return and_(LocalizacaoModel.cep_digitos >= digitos, LocalizacaoModel.cep_digitos < proximo)
+
+    return LocalizacaoModel.endereco_busca.contains(normaliza(termo), autoescape=True)
+
+
+def filtro_aberto(momento):
+    """
+        Retorna o critério para filtrar ecopontos abertos no momento recebido (horário local).
+
+        **Descrição:** Um horário vale de hora_inicial (inclusive) até hora_final (exclusive).
+            Se hora_final for menor que hora_inicial o horário passa da meia-noite e também
+            vale no início do dia seguinte. Usa o índice (dia_semana, hora_inicial, hora_final,
+            ecoponto_id) de dia_funcionamento.
+
+        **Parâmetros:**
+            momento (datetime): data e hora local, sem fuso.
+    """
+
+    hora = momento.time()
+    dia = dia_semana_de(momento)
+    dia_anterior = dia_semana_de(momento - timedelta(days=1))
+    passa_meia_noite = DiaFuncionamentoModel.hora_final < DiaFuncionamentoModel.hora_inicial
+
+    return exists().where(
+        DiaFuncionamentoModel.ecoponto_id == EcopontoModel.id,
+        or_(
+            and_(
+                DiaFuncionamentoModel.dia_semana == dia,
+                DiaFuncionamentoModel.hora_inicial <= hora,
+                or_(DiaFuncionamentoModel.hora_final > hora, passa_meia_noite),
+            ),
+            and_(
+                DiaFuncionamentoModel.dia_semana == dia_anterior,
+                passa_meia_noite,
+                DiaFuncionamentoModel.hora_final > hora,
+            ),
+        ),
+    )
+
+
+def carrega_coordenadas_ecopontos():
+    # coordenadas dos ecopontos visíveis ao público (ativos e aprovados)
+    return (
+        db.session.query(EcopontoModel.id, LocalizacaoModel.latitude, LocalizacaoModel.longitude)
+        .join(LocalizacaoModel, LocalizacaoModel.ecoponto_id == EcopontoModel.id)
+        .filter(EcopontoModel.ativo, EcopontoModel.situacao == "aprovado")
+        .filter(LocalizacaoModel.latitude.isnot(None), LocalizacaoModel.longitude.isnot(None))
+        .all()
+    )
+
+
+# índice espacial dos ecopontos: deve ser invalidado após escritas em ecoponto/localização
+# (a versão no banco faz os outros workers o reconstruírem na próxima busca)
+indice_ecopontos = IndiceEspacial(carrega_coordenadas_ecopontos, versao=VersaoDados("indice_ecopontos"))
+
+
+def carrega_mapa_ecopontos():
+    # pontos do mapa: ecopontos visíveis ao público, com a primeira localização e os resíduos ativos
+    pontos = {}
+    consulta = (
+        db.session.query(EcopontoModel.id, EcopontoModel.nome, LocalizacaoModel.latitude, LocalizacaoModel.longitude)
+        .join(LocalizacaoModel, LocalizacaoModel.ecoponto_id == EcopontoModel.id)
+        .filter(EcopontoModel.ativo, EcopontoModel.situacao == "aprovado")
+        .order_by(EcopontoModel.id, LocalizacaoModel.id)
+    )
+    for id, nome, lat, lng in consulta:
+        if id not in pontos and lat is not None and lng is not None:
+            pontos[id] = [id, nome, round(lat, 6), round(lng, 6), []]
+
+    residuos = (
+        db.session.query(EcopontoResiduoModel.ecoponto_id, EcopontoResiduoModel.residuo_id)
+        .join(EcopontoModel, EcopontoModel.id == EcopontoResiduoModel.ecoponto_id)
+        .join(ResiduoModel, ResiduoModel.id == EcopontoResiduoModel.residuo_id)
+        .filter(EcopontoModel.ativo, EcopontoModel.situacao == "aprovado", ResiduoModel.ativo == True)
+        .order_by(EcopontoResiduoModel.residuo_id)
+    )
+    for ecoponto_id, residuo_id in residuos:
+        if ecoponto_id in pontos:
+            pontos[ecoponto_id][4].append(residuo_id)
+
+    return list(pontos.values())
+
+
+# snapshot do mapa: deve ser invalidado após escritas em ecoponto/localização/resíduos do ecoponto
+# (a versão no banco faz os outros workers o reconstruírem na próxima requisição)
+mapa_ecopontos = MapaEcopontos(carrega_mapa_ecopontos, versao=VersaoDados("mapa_ecopontos"))
+
+
+def valida_linhas_importacao(linhas):
+    """
+        Valida as linhas da importação em lote com EcopontoLoteSchema e confere, com uma
+        consulta por tabela, se as empresas e os resíduos referenciados existem.
+
+        **Retorna:**
+            Tupla (validas, erros): validas é uma lista de (numero_linha, dados carregados);
+            erros é uma lista de {"linha", "erros"}.
+    """
+
+    schema = EcopontoLoteSchema()
+    validas = []
+    erros = []
+
+    for numero, dados, erro in linhas:
+        if erro:
+            erros.append({"linha": numero, "erros": erro})
+            continue
+        try:
+            validas.append((numero, schema.load(dados)))
+        except ValidationError as error:
+            erros.append({"linha": numero, "erros": error.messages})
 
+    empresas_ids = {dados["empresa_id"] for _, dados in validas}
+    residuos_ids = {residuo["id"] for _, dados in validas for residuo in dados["residuo"]}
+
+    empresas_existentes = set()
+    if empresas_ids:
+        empresas_existentes = set(db.session.scalars(select(EmpresaModel.id).where(EmpresaModel.id.in_(empresas_ids))))
+
+    residuos_existentes = set()
+    if residuos_ids:
+        residuos_existentes = set(db.session.scalars(select(ResiduoModel.id).where(ResiduoModel.id.in_(residuos_ids))))
+
+    referencias_validas = []
+    for numero, dados in validas:
+        erro = {}
+        if dados["empresa_id"] not in empresas_existentes:
+            erro["empresa_id"] = ["Empresa não encontrada."]
+
+        faltantes = sorted({residuo["id"] for residuo in dados["residuo"]} - residuos_existentes)
+        if faltantes:
+            erro["residuo"] = [f"Resíduos não encontrados: {', '.join(map(str, faltantes))}."]
+
+        if erro:
+            erros.append({"linha": numero, "erros": erro})
         else:
-            funcionamento_string += f"{parte}, "
-        
-    return funcionamento_string
+            referencias_validas.append((numero, dados))
+
+    return referencias_validas, erros
+
+
+def grava_lote_ecopontos(lote):
+    """
+        Insere um lote de ecopontos já validados, com inserts em massa (uma instrução por tabela)
+        e um commit. Retorna os ids criados, na ordem do lote.
+    """
+
+    ecopontos = []
+    dias_por_ecoponto = []
+    for _, dados in lote:
+        dias = [
+            DiaFuncionamentoModel(dia_semana=dia["dia_semana"], hora_inicial=dia["hora_inicial"], hora_final=dia["hora_final"])
+            for dia in dados.get("dia_funcionamento") or []
+        ]
+        funcionamento, funcionamentos = resumo_funcionamento(dias)
+
+        ecoponto = {
+            "nome": dados["nome"],
+            "ativo": dados.get("ativo"),
+            "aberto_publico": dados.get("aberto_publico"),
+            "situacao": SituacaoEnum.em_analise,
+            "empresa_id": dados["empresa_id"],
+            "funcionamento": funcionamento,
+            "funcionamentos": funcionamentos,
+        }
+        for data in ("data_inicio", "data_final"):
+            if dados.get(data):
+                ecoponto[data] = dados[data]
+
+        ecopontos.append(ecoponto)
+        dias_por_ecoponto.append(dias)
+
+    ids = db.session.scalars(
+        insert(EcopontoModel).returning(EcopontoModel.id, sort_by_parameter_order=True),
+        ecopontos,
+    ).all()
+
+    localizacoes = []
+    dias_funcionamento = []
+    ecopontos_residuos = []
+    for (_, dados), ecoponto_id, dias in zip(lote, ids, dias_por_ecoponto):
+        if dados.get("localizacao"):
+            localizacao = LocalizacaoModel(**dados["localizacao"][0])
+            localizacao.url_localizacao = f"https://maps.google.com/?q={localizacao.latitude},{localizacao.longitude}"
+            localizacao.atualiza_busca()
+            colunas = [coluna.key for coluna in LocalizacaoModel.__table__.columns if coluna.key != "id"]
+            localizacoes.append(dict({coluna: getattr(localizacao, coluna) for coluna in colunas}, ecoponto_id=ecoponto_id))
+
+        dias_funcionamento.extend(
+            {"dia_semana": dia.dia_semana, "hora_inicial": dia.hora_inicial, "hora_final": dia.hora_final, "ecoponto_id": ecoponto_id}
+            for dia in dias
+        )
+        ecopontos_residuos.extend(
+            {"ecoponto_id": ecoponto_id, "residuo_id": residuo_id}
+            for residuo_id in dict.fromkeys(residuo["id"] for residuo in dados["residuo"])
+        )
+
+    for model, registros in (
+        (LocalizacaoModel, localizacoes),
+        (DiaFuncionamentoModel, dias_funcionamento),
+        (EcopontoResiduoModel, ecopontos_residuos),
+    ):
+        if registros:
+            db.session.execute(insert(model), registros)
+
+    db.session.commit()
+    return ids
 
 
 @blp.route("/ecoponto/<int:ecoponto_id>")
@@ -122,8 +339,9 @@ class Ecoponto(MethodView):
             Atualiza um ecoponto pelo seu ID.
     """
 
+    @blp.arguments(CamposSearchSchema, location="query")
     @blp.response(200, RetornoEcopontoSchema)
-    def get(self, ecoponto_id):
+    def get(self, query_args, ecoponto_id):
         """
             Busca um ecoponto pelo seu ID.
 
@@ -131,31 +349,18 @@ class Ecoponto(MethodView):
             Se ocorrer um erro durante a operação de banco de dados, retorna um erro 400 ou 500.
 
             **Parâmetros:**
+                query_args (dict):
+                    - fields (str): campos retornados, separados por vírgula (ex.: "nome,localizacao"
+                        ou "nome,empresa.nome_fantasia"). Apenas esses campos são consultados no banco.
                 ecoponto_id (int): O ID do ecoponto a ser buscado.
 
             **Retorna:**
                 Um objeto JSON com as informações do ecoponto.
         """
-        ecoponto = EcopontoModel().query.get_or_404(ecoponto_id)
-        ecoponto_schema = EcopontoGetSchema()
+        campos = seleciona_campos(query_args.get("campos"), EcopontoGetSchema)
+        ecoponto = EcopontoModel.query.options(*perfil_ecoponto(campos)).get_or_404(ecoponto_id)
+        ecoponto_schema = serializador(EcopontoGetSchema, only=campos)
         result = ecoponto_schema.dump(ecoponto)
-        dias_funcionamento = result.get('dia_funcionamento')
-
-        # extrai valor do enum
-        if dias_funcionamento:
-            dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-            result["dia_funcionamento"] = dia_funcionamento
-
-            # agrupa horário de funcionamento em uma única string
-            result["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-        # extrai valor do enum
-        situacao = result.get("situacao")
-
-        if situacao:
-            valor, nome = retira_valor_enumSituacao(situacao)
-            result["situacao_enum"] = nome
-            result["situacao"] = valor
 
         context = {
             "code": 200,
@@ -195,6 +400,8 @@ class Ecoponto(MethodView):
             db.session.delete(ecoponto)
 
             db.session.commit()
+            indice_ecopontos.invalidar()
+            mapa_ecopontos.invalidar()
 
             message = f"Ecoponto excluída com sucesso"
             logging.debug(message)
@@ -259,20 +466,18 @@ class Ecoponto(MethodView):
             url_localizacao = f"https://maps.google.com/?q={latitude},{longitude}"
 
             localizacao_obj = LocalizacaoModel.query.filter(LocalizacaoModel.ecoponto == ecoponto).first()
-            localizacao_obj.rua=localizacao['rua'],
-            localizacao_obj.numero=localizacao['numero'],
-            localizacao_obj.bairro=localizacao['bairro'],
-            localizacao_obj.cep=localizacao['cep'],
-            localizacao_obj.cidade=localizacao['cidade'],
-            localizacao_obj.estado=localizacao['estado'],
-            localizacao_obj.complemento=localizacao.get('complemento'),
-            localizacao_obj.latitude=latitude,
-            localizacao_obj.longitude=longitude,
-            localizacao_obj.url_localizacao=url_localizacao,
+            localizacao_obj.rua=localizacao['rua']
+            localizacao_obj.numero=localizacao['numero']
+            localizacao_obj.bairro=localizacao['bairro']
+            localizacao_obj.cep=localizacao['cep']
+            localizacao_obj.cidade=localizacao['cidade']
+            localizacao_obj.estado=localizacao['estado']
+            localizacao_obj.complemento=localizacao.get('complemento')
+            localizacao_obj.latitude=latitude
+            localizacao_obj.longitude=longitude
+            localizacao_obj.url_localizacao=url_localizacao
         
-        residuos_list = []
-        residuos_relacionados = EcopontoResiduoModel.query.filter(
-            EcopontoResiduoModel.ecoponto_id == ecoponto_id)
+        residuos_list = valida_ids(ResiduoModel, [residuo.get('id') for residuo in residuos or []], "Resíduos")
 
         # Salva em BD
         try:
@@ -281,34 +486,13 @@ class Ecoponto(MethodView):
             if localizacao_obj:
                 db.session.add(localizacao_obj)
 
-            if residuos:
-                for residuo in residuos:
-                    
-                    id_residuo = residuo.get('id')
-                    residuos_list.append(id_residuo)
-
-                    residuo_object = ResiduoModel().query.get_or_404(id_residuo)
-
-                    residuo_ecoponto = EcopontoResiduoModel.query.filter(
-                        EcopontoResiduoModel.residuo_id == id_residuo,
-                        EcopontoResiduoModel.ecoponto_id == ecoponto_id,
-                    ).first()
-
-                    if not residuo_ecoponto:
-                        
-                        ecoponto_residuo = EcopontoResiduoModel(
-                            residuo_id=residuo_object.id,
-                            ecoponto_id=ecoponto_id
-                        )
-                        db.session.add(ecoponto_residuo)                
-
-            if residuos_relacionados:
-
-                for item in residuos_relacionados:
-                    if item.residuo_id not in residuos_list:
-                        db.session.delete(item)
+            sincroniza_associacao(
+                EcopontoResiduoModel.ecoponto_id, ecoponto_id, EcopontoResiduoModel.residuo_id, residuos_list
+            )
 
             db.session.commit()
+            indice_ecopontos.invalidar()
+            mapa_ecopontos.invalidar()
 
 
             message = f"Ecoponto editado com sucesso"
@@ -326,26 +510,9 @@ class Ecoponto(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        ecoponto_schema = EcopontoGetSchema()
+        ecoponto_schema = serializador(EcopontoGetSchema)
         result = ecoponto_schema.dump(ecoponto)
 
-        dias_funcionamento = result.get('dia_funcionamento')
-
-        # extrai valor do enum
-        if dias_funcionamento:
-            dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-            result["dia_funcionamento"] = dia_funcionamento
-
-            # agrupa horário de funcionamento em uma única string
-            result["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-        # extrai valor do enum
-        situacao = result.get("situacao")
-
-        if situacao:
-            valor, nome = retira_valor_enumSituacao(situacao)
-            result["situacao_enum"] = nome
-            result["situacao"] = valor
 
         context = {
             "code": 200,
@@ -389,99 +556,64 @@ class Ecopontos(MethodView):
             **Parâmetros**:
                 query_args (dict): Argumentos de consulta e para paginação.
                     - residuo_id (string): string com isd dos resíduos. Exemplo: "1, 3, 5, 9, 10".
-                    - localizacao (str): termo que corresponde a parte de uma localização.
+                    - match (str): "any" (padrão) - ecopontos que recebem ao menos um dos resíduos; 
+                        "all" - ecopontos que recebem todos os resíduos.
+                    - localizacao (str): termo que corresponde a parte de uma localização (ignora acentos e 
+                        maiúsculas). Um CEP, completo ou não, pesquisa pelo início do CEP.
+                    - aberto_agora (bool): apenas ecopontos abertos no momento atual.
+                    - aberto_em (datetime): apenas ecopontos abertos na data e hora ISO 8601 informada 
+                        (sem fuso: horário local). Tem precedência sobre aberto_agora.
                     - page (int): Número da página.
                     - page_size (int): Número de registros por página.
-                    - page_size (int): Número de registros por página.
+                    - cursor (str): cursor da próxima página (next_cursor); vazio para a primeira página.
+                    - include_total (bool): se falso, não calcula o total de registros.
+                    - fields (str): campos de cada ecoponto, separados por vírgula (ex.: "nome,localizacao").
+                        Apenas esses campos são consultados no banco.
+                    - stream (bool): retorna todos os ecopontos, sem paginação, transmitidos em partes
+                        (exportação); a memória usada não depende da quantidade de registros.
 
             **Retorna**:
                 Um objeto JSON com a lista de ecopontos filtrados pelos critérios informados e informações 
                 de paginação.
         """
 
-        result_lista = []
+        campos = seleciona_campos(query_args.get("campos"), EcopontoGetSchema)
         residuo_id = query_args.get("residuo_id")
+        match = query_args.get("match")
         localizacao = query_args.get("localizacao")
-
-        pagina = int(query_args.get("page", 1))
-        limite = int(query_args.get("page_size", 0))
+        aberto_agora = query_args.get("aberto_agora")
+        aberto_em = query_args.get("aberto_em")
 
         query = EcopontoModel.query.filter(EcopontoModel.ativo, EcopontoModel.situacao == "aprovado")
 
         if localizacao:
-            query = query.join(LocalizacaoModel).filter(
-                or_(
-                    LocalizacaoModel.rua.ilike(f'%{localizacao}%'),
-                    LocalizacaoModel.numero.ilike(f'%{localizacao}%'),
-                    LocalizacaoModel.bairro.ilike(f'%{localizacao}%'),
-                    LocalizacaoModel.cep.ilike(f'%{localizacao}%'),
-                    LocalizacaoModel.cidade.ilike(f'%{localizacao}%'),
-                    LocalizacaoModel.estado.ilike(f'%{localizacao}%'),
-                    LocalizacaoModel.complemento.ilike(f'%{localizacao}%'),
-                )
-            )
+            query = query.join(LocalizacaoModel).filter(filtro_localizacao(localizacao))
 
         if residuo_id:
-            try:
-                ecopontos_ids = []
-                # Sua string original
-                s = residuo_id
-
-                # Remover os colchetes
-                s = s.strip("[]")
-
-                # Remove os espaços em branco
-                s = s.replace(" ", "")
-
-                # Dividir a string em elementos individuais e converter para inteiros
-                numbers = s.split(',')
-
-                # Remover duplicatas mantendo a ordem
-                unique_numbers = list(dict.fromkeys(numbers))
-
-                for id in unique_numbers:
-                    if str(id).isdigit():
-                        residuo = ResiduoModel.query.filter(ResiduoModel.id == id).first()
-                        if residuo:
-                            ecopontos_ids += [ecoponto.id for ecoponto in residuo.ecoponto]
-                if ecopontos_ids:
-                    query = query.filter(EcopontoModel.id.in_(ecopontos_ids))
-
-            except Exception as e:
-                mensagem = f"Erro ao converter string em lista. {e}"
-                logging.error(mensagem)
-
-        total_registros = query.count()
-
-        if limite < 1:
-            limite = total_registros
-        ecopontos = query.offset((pagina - 1) * limite).limit(limite).all()
-
-        for ecoponto in ecopontos:
-            ecoponto_schema = EcopontoGetSchema()
-            result = ecoponto_schema.dump(ecoponto)
-            dias_funcionamento = result.get('dia_funcionamento')
-
-            if dias_funcionamento:
-                dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-                result["dia_funcionamento"] = dia_funcionamento
-                result["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-            situacao = result.get("situacao")
-            if situacao:
-                valor, nome = retira_valor_enumSituacao(situacao)
-                result["situacao_enum"] = nome
-                result["situacao"] = valor
-            
-            result_lista.append(result)
-
-        paginacao = {
-            "total": total_registros,
-            "page": pagina,
-            "page_size": limite,
-            "previous": pagina > 1,
-            "next": total_registros > pagina * limite
-        }
+            residuos_ids = ids_residuos(residuo_id)
+            if residuos_ids:
+                query = query.filter(filtro_residuos(residuos_ids, match))
+
+        if aberto_em:
+            query = query.filter(filtro_aberto(momento_local(aberto_em)))
+        elif aberto_agora:
+            query = query.filter(filtro_aberto(momento_local()))
+
+        query = query.options(*perfil_ecoponto(campos))
+        ecoponto_schema = serializador(EcopontoGetSchema, only=campos)
+
+        if query_args["stream"]:
+            context = {
+                "code": 200,
+                "status": "OK",
+                "message": "",
+                "values": VALORES,
+                "pagination": None
+            }
+            return resposta_stream(context, registros_em_lotes(query, EcopontoModel.id), ecoponto_schema.dump)
+
+        ecopontos, paginacao = paginar(query, EcopontoModel.id, query_args)
+        result_lista = serializador(EcopontoGetSchema, only=campos, many=True).dump(ecopontos)
 
         context = {
             "code": 200,
@@ -532,6 +664,7 @@ class Ecopontos(MethodView):
 
         # Cria objetos:
         emprsa = EmpresaModel().query.get_or_404(empresa_id)
+        residuos_list = valida_ids(ResiduoModel, [residuo.get('id') for residuo in residuos or []], "Resíduos")
 
         ecoponto = EcopontoModel(
             nome=nome,
@@ -558,6 +691,8 @@ class Ecopontos(MethodView):
                 )
                 dias_funcionamento_list.append(dia_funcionamento_obj)
 
+        atualiza_funcionamento(ecoponto, dias_funcionamento_list)
+
         localizacao_obj = None
         if localizacao:
             localizacao = localizacao[0]
@@ -588,18 +723,16 @@ class Ecopontos(MethodView):
             for funcionamento in dias_funcionamento_list:
                  db.session.add(funcionamento)
 
-            if residuos:
-                for residuo in residuos:
-                    id_residuo = residuo.get('id')
-                    residuo_object = ResiduoModel().query.get_or_404(id_residuo)
-                    
-                    categoria_residuo = EcopontoResiduoModel(
-                        residuo_id=residuo_object.id,
-                        ecoponto_id=ecoponto.id
-                    )
-                    db.session.add(categoria_residuo)
+            if residuos_list:
+                db.session.flush()
+                sincroniza_associacao(
+                    EcopontoResiduoModel.ecoponto_id, ecoponto.id, EcopontoResiduoModel.residuo_id, residuos_list,
+                    remover=False
+                )
 
             db.session.commit()
+            indice_ecopontos.invalidar()
+            mapa_ecopontos.invalidar()
 
 
             message = f"Ecoponto criado com sucesso"
@@ -617,7 +750,7 @@ class Ecopontos(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        ecoponto_schema = EcopontoGetSchema()
+        ecoponto_schema = serializador(EcopontoGetSchema)
         result = ecoponto_schema.dump(ecoponto)
         context = {
             "code": 201,
@@ -656,6 +789,8 @@ class Ecopontos(MethodView):
                 db.session.delete(ecoponto)
 
             db.session.commit()
+            indice_ecopontos.invalidar()
+            mapa_ecopontos.invalidar()
 
             message = f"Ecopontos deletadas com sucesso"
             logging.debug(message)
@@ -676,6 +811,184 @@ class Ecopontos(MethodView):
         return {"message": "Todos registros deletados."}
       
 
+@blp.route("/ecoponto/lote")
+class EcopontosLote(MethodView):
+    """
+        Endpoint para importar ecopontos em lote.
+
+        Métodos:
+        --------
+        post():
+            Cria os ecopontos enviados em JSON, NDJSON ou CSV.
+    """
+
+    @blp.response(201, RetornoEcopontoLoteSchema)
+    def post(self):
+        """
+            Cria vários ecopontos de uma vez.
+
+            **Descrição**: Aceita uma lista JSON (mesmo formato do POST /ecoponto, com
+                `dia_funcionamento`), NDJSON (um ecoponto por linha) ou CSV com cabeçalho, no corpo da
+                requisição ou como arquivo no campo "arquivo". No CSV, as colunas de endereço formam a
+                localização, `residuos` tem os ids separados por ";" e `funcionamento` os horários no
+                formato "seg 08:00-12:00; sab 09:00-11:00".
+                Todas as linhas são validadas antes da gravação, com uma consulta por tabela referenciada
+                (empresas e resíduos). As linhas válidas são inseridas em massa, com um commit a cada
+                IMPORTACAO_TAMANHO_LOTE linhas; as linhas com erro não impedem a gravação das demais.
+                Os ecopontos são criados com a situação "Em análise".
+
+            **Retorna**:
+                Um objeto JSON com os ecopontos criados (linha e id) e os erros de cada linha inválida.
+                Se nenhum ecoponto foi criado, o código é 400.
+        """
+
+        validas, erros = valida_linhas_importacao(linhas_importacao())
+        tamanho_lote = current_app.config.get("IMPORTACAO_TAMANHO_LOTE", 200)
+        criados = []
+
+        for inicio in range(0, len(validas), tamanho_lote):
+            lote = validas[inicio:inicio + tamanho_lote]
+            try:
+                ids = grava_lote_ecopontos(lote)
+                criados.extend({"linha": numero, "id": id} for (numero, _), id in zip(lote, ids))
+
+            except SQLAlchemyError as error:
+                db.session.rollback()
+                message = f"Error import ecopontos: {error}"
+                logging.warning(message)
+                erros.extend({"linha": numero, "erros": {"_lote": ["Erro ao gravar o lote."]}} for numero, _ in lote)
+
+        if criados:
+            indice_ecopontos.invalidar()
+            mapa_ecopontos.invalidar()
+
+        erros.sort(key=lambda erro: erro["linha"])
+        message = f"{len(criados)} ecopontos criados, {len(erros)} linhas com erro."
+        logging.debug(message)
+
+        context = {
+            "code": 201 if criados else 400,
+            "status": "Created" if criados else "Bad Request",
+            "message": message,
+            "value": {"criados": criados, "erros": erros}
+        }
+
+        resposta = jsonify(context)
+        resposta.status_code = context["code"]
+        return resposta
+
+
+@blp.route("/ecoponto/proximos")
+class EcopontosProximos(MethodView):
+    """
+        Endpoint para buscar os ecopontos mais próximos de uma coordenada.
+
+        Métodos:
+        --------
+        get(query_args):
+            Busca os ecopontos dentro de um raio, ordenados pela distância.
+    """
+
+    @blp.arguments(EcopontoProximoSearchSchema, location="query")
+    @blp.response(200, RetornoListaEcopontoProximoSchema)
+    def get(self, query_args):
+        """
+            Retorna os ecopontos mais próximos de uma coordenada.
+
+            **Descrição**: Busca no índice espacial os ecopontos ativos e aprovados dentro do raio 
+                informado e os ordena pela distância (haversine). Se informado o resíduo, retorna apenas 
+                os ecopontos que recebem esse resíduo.
+
+            **Parâmetros**:
+                query_args (dict): Argumentos de consulta.
+                    - lat (float): latitude do ponto de referência.
+                    - lng (float): longitude do ponto de referência.
+                    - raio_km (float): raio de busca em km (padrão 10, máximo 100).
+                    - limit (int): quantidade máxima de ecopontos (padrão 10, máximo 50).
+                    - residuo_id (int): ID do resíduo.
+
+            **Retorna**:
+                Um objeto JSON com a lista de ecopontos, cada um com o campo distancia_km.
+        """
+
+        residuo_id = query_args.get("residuo_id")
+        limite = query_args["limit"]
+
+        proximos = indice_ecopontos.proximos(query_args["lat"], query_args["lng"], query_args["raio_km"])
+
+        if residuo_id and proximos:
+            ecopontos_residuo = {
+                ecoponto_id for (ecoponto_id,) in db.session.query(EcopontoResiduoModel.ecoponto_id).filter(
+                    EcopontoResiduoModel.residuo_id == residuo_id)
+            }
+            proximos = [item for item in proximos if item[0] in ecopontos_residuo]
+
+        distancias = dict(proximos[:limite])
+
+        ecopontos = []
+        if distancias:
+            ecopontos = EcopontoModel.query.options(*ECOPONTO_COMPLETO).filter(
+                EcopontoModel.id.in_(distancias),
+                EcopontoModel.ativo,
+                EcopontoModel.situacao == "aprovado",
+            ).all()
+            ecopontos.sort(key=lambda ecoponto: distancias[ecoponto.id])
+
+        result_lista = serializador(EcopontoGetSchema, many=True).dump(ecopontos)
+        for ecoponto, result in zip(ecopontos, result_lista):
+            result["distancia_km"] = round(distancias[ecoponto.id], 3)
+
+        context = {
+            "code": 200,
+            "status": "OK",
+            "message": "",
+            "values": result_lista
+        }
+        
+        return jsonify(context)
+
+
+@blp.route("/ecoponto/mapa")
+class EcopontosMapa(MethodView):
+    """
+        Endpoint com todos os ecopontos visíveis ao público em formato compacto, para o mapa.
+
+        Métodos:
+        --------
+        get(query_args):
+            Retorna o snapshot do mapa no formato pedido.
+    """
+
+    @blp.arguments(EcopontoMapaSearchSchema, location="query")
+    @blp.response(200, RetornoEcopontoMapaSchema)
+    def get(self, query_args):
+        """
+            Retorna todos os ecopontos ativos e aprovados em formato compacto.
+
+            **Descrição**: Cada ecoponto é uma lista [id, nome, lat, lng, [ids dos resíduos]], na ordem 
+                de `campos`. A resposta vem de um snapshot em memória, regenerado após as escritas em 
+                ecopontos, já serializado e comprimido (gzip, ou br se disponível, conforme o 
+                Accept-Encoding), com ETag: se o cliente enviar If-None-Match com o ETag atual, retorna 304.
+
+            **Parâmetros**:
+                query_args (dict): Argumentos de consulta.
+                    - formato (str): "json" (padrão), "geojson" (FeatureCollection de pontos) ou 
+                        "msgpack" (binário, application/x-msgpack).
+
+            **Retorna**:
+                O snapshot do mapa no formato pedido.
+        """
+
+        formato = query_args["formato"]
+
+        try:
+            entrada = mapa_ecopontos.entrada(formato)
+        except ImportError:
+            abort(501, message=f"Formato {formato} indisponível no servidor.")
+
+        return resposta_condicional(entrada)
+
+
 @blp.route("/ecoponto/funcionamento")
 class EcopontoFuncionamento(MethodView):
     """
@@ -719,7 +1032,7 @@ class EcopontoFuncionamento(MethodView):
         # Cria objetos:
         ecoponto = EcopontoModel().query.get_or_404(ecoponto_id)
 
-        dias_funcionamento_anterior = ecoponto.dia_funcionamento
+        dias_funcionamento_anterior = list(ecoponto.dia_funcionamento)
 
         if dias_funcionamento:
 
@@ -737,6 +1050,8 @@ class EcopontoFuncionamento(MethodView):
 
                 dias_funcionamento_list.append(dia_funcionamento_obj)
 
+        atualiza_funcionamento(ecoponto, dias_funcionamento_list)
+
         # Salva em BD
         try:
            
@@ -764,18 +1079,8 @@ class EcopontoFuncionamento(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        ecoponto_schema = EcopontoFuncionamentoSchema()
-        result = ecoponto_schema.dump(ecoponto)
-
-        dias_funcionamento = result.get('dia_funcionamento')
-
-        # extrai valor do enum
-        dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-        result["dia_funcionamento"] = dia_funcionamento
-
-
-        # agrupa horário de funcionamento em uma única string
-        result["funcionamento"] = agrupar_horarios(dias_funcionamento)
+        result = serializador(EcopontoFuncionamentoSchema).dump(ecoponto)
+        result["funcionamento"] = ecoponto.funcionamento
 
         context = {
             "code": 200,
@@ -839,6 +1144,9 @@ class EcopontoFuncionamento(MethodView):
             for funcionamento in dias_funcionamento_list:
                  db.session.add(funcionamento)
 
+            # a relação já inclui os novos dias (back_populates)
+            atualiza_funcionamento(ecoponto, ecoponto.dia_funcionamento)
+
             db.session.commit()
 
             message = f"Dias de funcionamento do Ecoponto criados com sucesso"
@@ -856,24 +1164,8 @@ class EcopontoFuncionamento(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        ecoponto_schema = EcopontoFuncionamentoSchema()
-        result = ecoponto_schema.dump(ecoponto)
-
-        dias_funcionamento = result.get('dia_funcionamento')
-
-        # extrai valor do enum
-        dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-        result["dia_funcionamento"] = dia_funcionamento
-
-        # agrupa horário de funcionamento em uma única string
-        result["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-        # extrai valor do enum
-        situacao = result.get("situacao")
-        if situacao:
-            valor, nome = retira_valor_enumSituacao(situacao)
-            result["situacao_enum"] = nome
-            result["situacao"] = valor
+        result = serializador(EcopontoFuncionamentoSchema).dump(ecoponto)
+        result["funcionamento"] = ecoponto.funcionamento
 
         context = {
             "code": 201,
@@ -923,43 +1215,20 @@ class EcopontoResiduo(MethodView):
         ecoponto_id = ecoponto_data['ecoponto_id']
         # descricao_outros_projetos = ecoponto_data.get('descricao_outros_projetos')
         residuos = ecoponto_data.get('residuo')
-        residuos_list = []
 
         ecoponto = EcopontoModel().query.get_or_404(ecoponto_id)
-        residuos_relacionados = EcopontoResiduoModel.query.filter(EcopontoResiduoModel.ecoponto_id == ecoponto_id)
+        residuos_list = valida_ids(ResiduoModel, [residuo.get('id') for residuo in residuos or []], "Resíduos")
 
 
         # # Salva em BD
 
         try:
-            if residuos:
-                for residuo in residuos:
-                    
-                    id_residuo = residuo.get('id')
-                    residuos_list.append(id_residuo)
-
-                    residuo_object = ResiduoModel().query.get_or_404(id_residuo)
-
-                    residuo_ecoponto = EcopontoResiduoModel.query.filter(
-                        EcopontoResiduoModel.residuo_id == id_residuo,
-                        EcopontoResiduoModel.ecoponto_id == ecoponto_id,
-                    ).first()
-
-                    if not residuo_ecoponto:
-                        
-                        ecoponto_residuo = EcopontoResiduoModel(
-                            residuo_id=residuo_object.id,
-                            ecoponto_id=ecoponto_id
-                        )
-                        db.session.add(ecoponto_residuo)                
-
-            if residuos_relacionados:
-
-                for item in residuos_relacionados:
-                    if item.residuo_id not in residuos_list:
-                        db.session.delete(item)
+            sincroniza_associacao(
+                EcopontoResiduoModel.ecoponto_id, ecoponto_id, EcopontoResiduoModel.residuo_id, residuos_list
+            )
 
             db.session.commit()
+            mapa_ecopontos.invalidar()
 
             message = f"Relação deresíduos do ecoponto criados com sucesso"
             logging.debug(message)
@@ -977,26 +1246,9 @@ class EcopontoResiduo(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        ecoponto_schema = EcopontoResiduoSchema()
+        ecoponto_schema = serializador(EcopontoResiduoSchema)
         result = ecoponto_schema.dump(ecoponto)
 
-        dias_funcionamento = result.get('dia_funcionamento')
-
-        # extrai valor do enum
-        if dias_funcionamento:
-            dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-            result["dia_funcionamento"] = dia_funcionamento
-
-            # agrupa horário de funcionamento em uma única string
-            result["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-        # extrai valor do enum
-        situacao = result.get("situacao")
-
-        if situacao:
-            valor, nome = retira_valor_enumSituacao(situacao)
-            result["situacao_enum"] = nome
-            result["situacao"] = valor
 
         context = {
             "code": 200,
@@ -1034,22 +1286,19 @@ class EcopontoResiduo(MethodView):
         
         # Cria objetos:
         ecoponto = EcopontoModel().query.get_or_404(ecoponto_id)
+        residuos_list = valida_ids(ResiduoModel, [residuo.get('id') for residuo in residuos or []], "Resíduos")
 
         # # Salva em BD
         try:
 
-            if residuos:
-                for residuo in residuos:
-                    id_residuo = residuo.get('id')
-                    residuo_object = ResiduoModel().query.get_or_404(id_residuo)
-                    
-                    categoria_residuo = EcopontoResiduoModel(
-                        residuo_id=residuo_object.id,
-                        ecoponto_id=ecoponto.id
-                    )
-                    db.session.add(categoria_residuo)
+            if residuos_list:
+                sincroniza_associacao(
+                    EcopontoResiduoModel.ecoponto_id, ecoponto.id, EcopontoResiduoModel.residuo_id, residuos_list,
+                    remover=False
+                )
 
                 db.session.commit()
+                mapa_ecopontos.invalidar()
 
 
             message = f"Relação deresíduos do ecoponto criados com sucesso"
@@ -1067,26 +1316,9 @@ class EcopontoResiduo(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        ecoponto_schema = EcopontoResiduoSchema()
+        ecoponto_schema = serializador(EcopontoResiduoSchema)
         result = ecoponto_schema.dump(ecoponto)
 
-        dias_funcionamento = result.get('dia_funcionamento')
-
-        # extrai valor do enum
-        if dias_funcionamento:
-            dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-            result["dia_funcionamento"] = dia_funcionamento
-
-            # agrupa horário de funcionamento em uma única string
-            result["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-        # extrai valor do enum
-        situacao = result.get("situacao")
-
-        if situacao:
-            valor, nome = retira_valor_enumSituacao(situacao)
-            result["situacao_enum"] = nome
-            result["situacao"] = valor
 
         context = {
             "code": 201,
@@ -1154,6 +1386,8 @@ class EcopontoAtiva(MethodView):
                 ecoponto.ativo = True
                 db.session.add(ecoponto)
             db.session.commit()
+            indice_ecopontos.invalidar()
+            mapa_ecopontos.invalidar()
 
             message = f"Ecoponto ativado com sucesso"
             logging.debug(message)
@@ -1170,25 +1404,8 @@ class EcopontoAtiva(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        ecoponto_schema = EcopontoGetSchema()
+        ecoponto_schema = serializador(EcopontoGetSchema)
         result = ecoponto_schema.dump(ecoponto)
-        dias_funcionamento = result.get('dia_funcionamento')
-
-        # extrai valor do enum
-        if dias_funcionamento:
-            dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-            result["dia_funcionamento"] = dia_funcionamento
-
-            # agrupa horário de funcionamento em uma única string
-            result["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-        # extrai valor do enum
-        situacao = result.get("situacao")
-
-        if situacao:
-            valor, nome = retira_valor_enumSituacao(situacao)
-            result["situacao_enum"] = nome
-            result["situacao"] = valor
 
         context = {
             "code": 200,
@@ -1256,6 +1473,8 @@ class EcopontoDesativa(MethodView):
                 ecoponto.ativo = False
                 db.session.add(ecoponto)
             db.session.commit()
+            indice_ecopontos.invalidar()
+            mapa_ecopontos.invalidar()
 
             message = f"Ecoponto desativado com sucesso"
             logging.debug(message)
@@ -1273,25 +1492,8 @@ class EcopontoDesativa(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        ecoponto_schema = EcopontoGetSchema()
+        ecoponto_schema = serializador(EcopontoGetSchema)
         result = ecoponto_schema.dump(ecoponto)
-        dias_funcionamento = result.get('dia_funcionamento')
-
-        # extrai valor do enum
-        if dias_funcionamento:
-            dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-            result["dia_funcionamento"] = dia_funcionamento
-
-            # agrupa horário de funcionamento em uma única string
-            result["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-        # extrai valor do enum
-        situacao = result.get("situacao")
-
-        if situacao:
-            valor, nome = retira_valor_enumSituacao(situacao)
-            result["situacao_enum"] = nome
-            result["situacao"] = valor
 
         context = {
             "code": 200,
@@ -1368,6 +1570,8 @@ class EcopontoPutSituacao(MethodView):
                 ecoponto.situacao = situacao
                 db.session.add(ecoponto)
             db.session.commit()
+            indice_ecopontos.invalidar()
+            mapa_ecopontos.invalidar()
 
             message = f"situação do Ecoponto alterado com sucesso"
             logging.debug(message)
@@ -1384,26 +1588,9 @@ class EcopontoPutSituacao(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        ecoponto_schema = EcopontoGetSchema()
+        ecoponto_schema = serializador(EcopontoGetSchema)
         result = ecoponto_schema.dump(ecoponto)
 
-        dias_funcionamento = result.get('dia_funcionamento')
-
-        # extrai valor do enum
-        if dias_funcionamento:
-            dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-            result["dia_funcionamento"] = dia_funcionamento
-
-            # agrupa horário de funcionamento em uma única string
-            result["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-        # extrai valor do enum
-        situacao = result.get("situacao")
-
-        if situacao:
-            valor, nome = retira_valor_enumSituacao(situacao)
-            result["situacao_enum"] = nome
-            result["situacao"] = valor
 
         context = {
             "code": 200,
@@ -1440,7 +1627,9 @@ class EcopontoGetSituacao(MethodView):
         query_args : dict
             Dicionário de argumentos de consulta contendo:
             - page: Número da página (padrão é 1).
-            - page_size: Número de registros por página (padrão é 0, que retorna todos).
+            - page_size: Número de registros por página (padrão e máximo: PAGINACAO_TAMANHO_MAXIMO).
+            - cursor: cursor da próxima página (paginação por chave).
+            - include_total: se falso, não calcula o total de registros.
 
         Retorno:
         --------
@@ -1460,6 +1649,7 @@ class EcopontoGetSituacao(MethodView):
                 - page_size: Tamanho da página.
                 - previous: Indicador se há página anterior.
                 - next: Indicador se há próxima página.
+                - next_cursor: Cursor da próxima página.
     """
 
     @blp.arguments(PaginacaoSearchSchema, location="query")
@@ -1475,6 +1665,8 @@ class EcopontoGetSituacao(MethodView):
                 query_args (dict): Argumentos de consulta para paginação.
                     - page (int): Número da página.
                     - page_size (int): Número de registros por página.
+                    - cursor (str): cursor da próxima página (next_cursor); vazio para a primeira página.
+                    - include_total (bool): se falso, não calcula o total de registros.
                 situacao (str): A situação dos ecopontos a serem filtrados ["em_analise", "aprovado", "rejeitado"].
 
             **Retorna**:
@@ -1487,51 +1679,13 @@ class EcopontoGetSituacao(MethodView):
                 400,
                 message="status inválido. Status deve ser 'em_analise', 'aprovado' ou 'rejeitado'",)
 
-        
-        result_lista = []
-
-        pagina = int(query_args.get("page", 1))
-        limite = int(query_args.get("page_size", 0))
 
         query = EcopontoModel.query.filter(EcopontoModel.situacao == situacao)
 
-        total_registros = query.count()
-
-        if limite < 1:
-            limite = total_registros
-        ecopontos = query.offset((pagina - 1) * limite).limit(limite).all()
-
-        for ecoponto in ecopontos:
-            ecoponto_schema = EcopontoLocalizacaoSchema()
-            result = ecoponto_schema.dump(ecoponto)
-            dias_funcionamento = result.get('dia_funcionamento')
-
-            # extrai valor do enum
-            if dias_funcionamento:
-                dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-                result["dia_funcionamento"] = dia_funcionamento
+        ecopontos, paginacao = paginar(query.options(*ECOPONTO_LOCALIZACAO), EcopontoModel.id, query_args)
 
-                # agrupa horário de funcionamento em uma única string
-                result["funcionamento"] = agrupar_horarios(dias_funcionamento)
+        result_lista = serializador(EcopontoLocalizacaoSchema, many=True).dump(ecopontos)
 
-            # extrai valor do enum
-            situacao = result.get("situacao")
-
-            if situacao:
-                valor, nome = retira_valor_enumSituacao(situacao)
-                result["situacao_enum"] = nome
-                result["situacao"] = valor
-            
-            result_lista.append(result)
-
-
-        paginacao = {
-            "total": total_registros,
-            "page": pagina,
-            "page_size": limite,
-            "previous": pagina > 1,
-            "next": total_registros > pagina * limite
-        }
         context = {
             "code": 200,
             "status": "OK",
@@ -1568,6 +1722,7 @@ class EcopontoSituacao(MethodView):
                 - situacao: Valor da situação.
     """
 
+    @cache_resposta("ecoponto_situacao")
     @blp.response(200, RetornoEcopontoSituacaoSchema)
     def get(self):
         """
@@ -1581,17 +1736,8 @@ class EcopontoSituacao(MethodView):
                 valor do enumerador e o valor para apresentar ao usuário
         """
 
-        result_list = []
-
-        situacoes = SituacaoEnum
-        for e in situacoes:
-            
-            result = {}
-            result["situacao_enum"] = e.name
-            result["situacao"] = e.value
-            situacao_schema = EcopontoSituacaoSchema()
-            result = situacao_schema.dump(result)
-            result_list.append(result)
+        situacao_schema = serializador(EcopontoSituacaoSchema, many=True)
+        result_list = situacao_schema.dump([{"situacao": situacao} for situacao in SituacaoEnum])
 
         context = {
             "code": 200,
@@ -1618,67 +1764,86 @@ class EcopontoControle(MethodView):
 
     """
 
+    @blp.arguments(EcopontoControleSearchSchema, location="query")
     @blp.response(200, EcopontoListaSituacaoSchema)
-    def get(self):
+    def get(self, query_args):
 
         """
-            Retorna uma lista de todos os ecopontos, agrupados por situação.
+            Retorna o total de ecopontos por situação e, sob demanda, a lista paginada de uma situação.
 
-            **Descrição:** Recupera todos os ecopontos do banco de dados, organiza-os por suas situações
-             e retorna um resumo contendo o total
-            de ecopontos em cada situação e uma lista detalhada dos ecopontos.
+            **Descrição:** Os totais de cada situação são calculados com um GROUP BY. A lista de 
+                ecopontos é retornada apenas para a situação informada em `situacao`, paginada; 
+                nas demais situações `ecopontos` vem vazia.
+
+            **Parâmetros:**
+                query_args (dict): Argumentos de consulta e para paginação.
+                    - situacao (str): situação cuja lista será retornada ("em_analise", "aprovado" ou "rejeitado").
+                    - fields (str): campos de cada ecoponto, separados por vírgula 
+                        (ex.: "nome,situacao,localizacao"). Se não informado, retorna todos.
+                    - page (int): Número da página.
+                    - page_size (int): Número de registros por página.
+                    - cursor (str): cursor da próxima página (next_cursor); vazio para a primeira página.
+                    - include_total (bool): se falso, não calcula o total de registros.
+                    - stream (bool): retorna todos os ecopontos da situação, sem paginação, transmitidos 
+                        em partes (exportação).
 
             **Retorna:**
                 Um objeto JSON contendo o código de status, a mensagem, e os dados agrupados 
-                por situação, incluindo o total de ecopontos e detalhes de cada ecoponto.
+                por situação, incluindo o total de ecopontos e, para a situação informada, 
+                a lista de ecopontos e as informações de paginação.
 
             
         """
 
-        result_list = []
         result_dict = {}
-        ecopontos = EcopontoModel.query.all()
+        situacao_lista = query_args.get("situacao")
+        campos = seleciona_campos(query_args.get("campos"), EcopontoGetSchema)
+
+        totais = dict(
+            db.session.query(EcopontoModel.situacao, func.count(EcopontoModel.id))
+            .group_by(EcopontoModel.situacao)
+            .all()
+        )
 
+        situacao_schema = serializador(EcopontoSituacaoSchema)
         for situacao in SituacaoEnum:
-            result_dict[situacao.name] = {"total": 0, "situacao":situacao.value, "situacao_enum": situacao.name, "ecopontos": []}
-   
-        for ecoponto in ecopontos:
-            ecoponto_schema = EcopontoGetSchema()
-            result = ecoponto_schema.dump(ecoponto)
-            dias_funcionamento = result.get('dia_funcionamento')
-            result["funcionamento"] = ""
-
-            if dias_funcionamento:
-                dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-                result["dia_funcionamento"] = dia_funcionamento
-                
-                # funcionamento como string
-                funcionamento = agrupar_horarios(dias_funcionamento)
-                result["funcionamento"] = funcionamento
-
-                # Funcionamentos como lista
-                funcionamentos = funcionamento.replace(' e ', ', ')
-                lista = [item.strip() for item in funcionamentos.split(',')]
-                result["funcionamentos"] = lista
-
-            situacao = result.get("situacao")
-            if situacao:
-                valor, nome = retira_valor_enumSituacao(situacao)
-                result["situacao_enum"] = nome
-                result["situacao"] = valor
-
-                result_dict[nome]['total'] += 1
-                result_dict[nome]['ecopontos'].append(result)
-
-        for result in result_dict:
-            result_list.append(result_dict[result])
-            
+            result_dict[situacao] = dict(situacao_schema.dump({"situacao": situacao}), total=totais.get(situacao, 0), ecopontos=[])
+
+        paginacao = None
+        if situacao_lista:
+            query = EcopontoModel.query.filter(EcopontoModel.situacao == situacao_lista)
+            query = query.options(*perfil_ecoponto(campos))
+            ecoponto_schema = serializador(EcopontoGetSchema, only=campos)
+
+            def serializa(ecoponto):
+                result = ecoponto_schema.dump(ecoponto)
+
+                if "funcionamento" in result:
+                    result["funcionamento"] = result["funcionamento"] or ""
+
+                return result
+
+            if query_args["stream"]:
+                result_dict[situacao_lista]['ecopontos'] = VALORES
+            else:
+                ecopontos, paginacao = paginar(query, EcopontoModel.id, query_args)
+                result_dict[situacao_lista]['ecopontos'] = [serializa(ecoponto) for ecoponto in ecopontos]
+
+        result_list = list(result_dict.values())
+
         context = {
             "code": 200,
             "status": "OK",
             "message": "",
             "values": result_list,
         }
+
+        if situacao_lista and query_args["stream"]:
+            context["pagination"] = None
+            return resposta_stream(context, registros_em_lotes(query, EcopontoModel.id), serializa)
+
+        if paginacao:
+            context["pagination"] = paginacao
         
         return jsonify(context)
         
\ No newline at end of file
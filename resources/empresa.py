@@ -2,33 +2,43 @@ from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from flask import jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt_identity, jwt_required, get_jwt
-from passlib.hash import pbkdf2_sha256
+from senhas import SENHAS
 from models.aceite_termo import TermoAceiteModel
 from models.dia_funcionamento import DiaFuncionamentoModel
 from models.ecoponto import EcopontoModel
 from models.ecoponto_residuo import EcopontoResiduoModel
 from models.empresa import EmpresaModel
-from models.enums.dia_semana import DiasSemanaEnum
 from models.enums.situacao_ecoponto import SituacaoEnum
 from models.localizacao import LocalizacaoModel
 from models.perfil_usuario import PerfilUsuarioModel
 from models.residuo import ResiduoModel
 from models.termo import TermoModel
 from models.usuario import UsuarioModel
-from resources.ecoponto import agrupar_horarios, retira_valor_enumSituacao, transforma_dia_funcionamento
+from models.carregamento import perfil_ecoponto, perfil_empresa
+from resources.ecoponto import indice_ecopontos, mapa_ecopontos
 from security import jwt_required_with_doc
 from schemas.empresa_ecoponto import (
+    CamposSearchSchema,
+    EcopontoGetSchema,
+    EmpresaSearchSchema,
     EmpresaGetSchema, EmpresaSchema, 
     PlainEmpresaSchema, 
     PlainEmpresaUpdateSchema, 
     RetornoEmpresaGetSchema, RetornoEmpresaSchema, 
     RetornoListaEmpresaSchema, RetornoPlainEmpresaSchema)
+from schemas.registro import serializador
+from sqlalchemy import or_
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from extensions.database import db
 
 import logging.handlers
 
 from utilities.apenas_digitos import apenas_digitos
+from utilities.associacao import sincroniza_associacao, valida_ids
+from utilities.campos import campos_relacao, seleciona_campos, sem_relacao
+from utilities.funcionamento import atualiza_funcionamento
+from utilities.paginacao import paginar
+from utilities.stream_json import VALORES, registros_em_lotes, resposta_stream, tamanho_lote
 from utilities.valida_email import validar_email
 from utilities.valida_cnpj import validar_cnpj
 from utilities.valida_telefone import validar_telefone
@@ -36,42 +46,92 @@ from utilities.valida_telefone import validar_telefone
 blp = Blueprint("Empresas", "empresas", description="Operações sobre empresas")
 
 
+def serializa_empresas(empresas, campos, incluir_ecopontos=True):
+    """
+        Serializa as empresas com EmpresaGetSchema, apenas com os campos selecionados.
+
+        **Descrição:** A relação ecopontos é "dynamic" (uma consulta por empresa ao serializar);
+            os ecopontos de todas as empresas são carregados em uma única consulta, com o perfil
+            dos campos selecionados, e não são consultados se não foram pedidos.
+
+        **Parâmetros:**
+            empresas (list): empresas carregadas com `perfil_empresa(campos)`.
+            campos (tuple): campos selecionados (seleciona_campos), ou None para todos.
+            incluir_ecopontos (bool): se False, os ecopontos não são carregados nem serializados.
+
+        **Retorna:**
+            Lista de dicionários, na ordem das empresas.
+    """
+
+    empresa_schema = serializador(EmpresaGetSchema, only=sem_relacao(campos, "ecopontos"), exclude=("ecopontos",), many=True)
+    result_lista = empresa_schema.dump(empresas)
+
+    campos_ecoponto = campos_relacao(campos, "ecopontos")
+    if not incluir_ecopontos or campos_ecoponto == () or not empresas:
+        return result_lista
+
+    ecopontos_por_empresa = {empresa.id: [] for empresa in empresas}
+    consulta = (
+        EcopontoModel.query
+        .options(*perfil_ecoponto(campos_ecoponto))
+        .add_columns(EcopontoModel.empresa_id)
+        .filter(EcopontoModel.empresa_id.in_(list(ecopontos_por_empresa)))
+        .order_by(EcopontoModel.id)
+    )
+    for ecoponto, empresa_id in consulta:
+        ecopontos_por_empresa[empresa_id].append(ecoponto)
+
+    ecoponto_schema = serializador(EcopontoGetSchema, only=campos_ecoponto, many=True)
+    for empresa, result in zip(empresas, result_lista):
+        result["ecopontos"] = ecoponto_schema.dump(ecopontos_por_empresa[empresa.id])
+
+    return result_lista
+
+
+def serializa_empresas_em_lotes(query, campos, incluir_ecopontos=True):
+    # serializa as empresas da consulta lote a lote (ecopontos carregados por lote), para o stream
+    lote = []
+    for empresa in registros_em_lotes(query, EmpresaModel.id):
+        lote.append(empresa)
+        if len(lote) >= tamanho_lote():
+            yield from serializa_empresas(lote, campos, incluir_ecopontos)
+            lote = []
+
+    yield from serializa_empresas(lote, campos, incluir_ecopontos)
+
+
+def filtra_busca_empresa(query, busca):
+    # busca por parte do nome fantasia, da razão social ou do CNPJ (com ou sem pontuação);
+    # autoescape: "%" e "_" digitados são buscados como texto, não como curingas
+    termo = busca.strip()
+    condicoes = [
+        EmpresaModel.nome_fantasia.icontains(termo, autoescape=True),
+        EmpresaModel.razao_social.icontains(termo, autoescape=True),
+    ]
+
+    digitos = apenas_digitos(busca)
+    if digitos:
+        condicoes.append(EmpresaModel.cnpj.contains(digitos))
+
+    return query.filter(or_(*condicoes))
+
+
 @blp.route("/empresa/<int:empresa_id>")
 class Empresa(MethodView):
 
     # @jwt_required_with_doc()
+    @blp.arguments(CamposSearchSchema, location="query")
     @blp.response(200, RetornoEmpresaGetSchema)
-    def get(self, empresa_id):
+    def get(self, query_args, empresa_id):
         # jwt = get_jwt()
         # current_user = get_jwt_identity()
 
         # print(jwt)
         # print(current_user)
 
-        empresa = EmpresaModel().query.get_or_404(empresa_id)
-        empresa_schema = EmpresaGetSchema()
-        result = empresa_schema.dump(empresa)
-
-        ecopontos = result.get('ecopontos')
-        if ecopontos:
-            for eco in ecopontos:
-                dias_funcionamento = eco.get('dia_funcionamento')
-
-                # extrai valor do enum
-                if dias_funcionamento:
-                    dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-                    eco["dia_funcionamento"] = dia_funcionamento
-
-                    # agrupa horário de funcionamento em uma única string
-                    eco["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-                # extrai valor do enum
-                situacao = eco.get("situacao")
-
-                if situacao:
-                    valor, nome = retira_valor_enumSituacao(situacao)
-                    eco["situacao_enum"] = nome
-                    eco["situacao"] = valor
+        campos = seleciona_campos(query_args.get("campos"), EmpresaGetSchema)
+        empresa = EmpresaModel().query.options(*perfil_empresa(campos)).get_or_404(empresa_id)
+        result = serializa_empresas([empresa], campos)[0]
 
         context = {
             "code": 200,
@@ -87,7 +147,7 @@ class Empresa(MethodView):
         
         try:
             empresa = EmpresaModel().query.get_or_404(empresa_id)
-            termos_aceite = empresa.aceite_termo.all()
+            termos_aceite = list(empresa.aceite_termo)
             usuario = empresa.usuario
             perfil = PerfilUsuarioModel.query.filter(PerfilUsuarioModel.usuario == usuario).first()
             
@@ -152,8 +212,6 @@ class Empresa(MethodView):
 
         aceite_termo=empresa_data.get('aceite_termo')
 
-        termos_list = []
-
         # validações:
 
     
@@ -179,36 +237,21 @@ class Empresa(MethodView):
                 abort(409, message="E-mail já cadastrado")
             usuario.email = email
 
+        # só refaz o hash se a senha mudou (ou se o hash guardado está desatualizado)
         if senha:
-            if usuario.senha != pbkdf2_sha256.hash(senha):
-                usuario.senha = pbkdf2_sha256.hash(senha)
+            senha_igual, novo_hash = SENHAS.verificar(senha, usuario.senha)
+            if not senha_igual:
+                usuario.senha = SENHAS.gerar(senha)
+            elif novo_hash:
+                usuario.senha = novo_hash
         
         perfil_usuario = PerfilUsuarioModel.query.filter(PerfilUsuarioModel.usuario == usuario).first()
         perfil_usuario.nome=nome_contato_responsavel
         perfil_usuario.telefone=telefone_contato
         perfil_usuario.email=email
         
-        if aceite_termo:
-            for termo in aceite_termo:
-                
-                aceite=termo.get('aceite')
-                termo_id=termo.get('termo_id')
-
-                termo_object = TermoModel().query.get_or_404(termo_id)
-
-                aceite_termo = TermoAceiteModel.query.filter(
-                    TermoAceiteModel.empresa_id == empresa_id,
-                    TermoAceiteModel.termo_id == termo_id,).first()
-                
-                if aceite_termo:
-                    aceite_termo.aceite = aceite
-                else:
-                    aceite_termo = TermoAceiteModel(
-                        aceite=aceite,
-                        termo=termo_object,
-                        empresa=empresa
-                    )
-                termos_list.append(aceite_termo)
+        termos_ids = valida_ids(TermoModel, [termo.get('termo_id') for termo in aceite_termo or []], "Termos")
+        aceites = {termo.get('termo_id'): {"aceite": termo.get('aceite')} for termo in aceite_termo or []}
 
 
         # Salva em BD
@@ -217,8 +260,10 @@ class Empresa(MethodView):
             db.session.add(perfil_usuario)
             db.session.add(empresa)
 
-            for aceite in termos_list:
-                db.session.add(aceite)
+            sincroniza_associacao(
+                TermoAceiteModel.empresa_id, empresa_id, TermoAceiteModel.termo_id, termos_ids,
+                remover=False, valores=aceites
+            )
 
             db.session.commit()
 
@@ -237,30 +282,9 @@ class Empresa(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        empresa_schema = EmpresaSchema()
+        empresa_schema = serializador(EmpresaSchema)
         result = empresa_schema.dump(empresa)
 
-        ecopontos = result.get('ecopontos')
-        if ecopontos:
-            for eco in ecopontos:
-                dias_funcionamento = eco.get('dia_funcionamento')
-
-                # extrai valor do enum
-                if dias_funcionamento:
-                    dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-                    eco["dia_funcionamento"] = dia_funcionamento
-
-                    # agrupa horário de funcionamento em uma única string
-                    eco["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-                # extrai valor do enum
-                situacao = eco.get("situacao")
-
-                if situacao:
-                    valor, nome = retira_valor_enumSituacao(situacao)
-                    eco["situacao_enum"] = nome
-                    eco["situacao"] = valor
-
         context = {
             "code": 200,
             "status": "OK",
@@ -274,41 +298,50 @@ class Empresa(MethodView):
 @blp.route("/empresa")
 class Empresas(MethodView):
 
+    @blp.arguments(EmpresaSearchSchema, location="query")
     @blp.response(200, RetornoListaEmpresaSchema)
-    def get(self):
-        result_lista = []
-        empresas = EmpresaModel().query.all()
-        for empresa in empresas:
-            empresa_schema = EmpresaGetSchema()
-            result = empresa_schema.dump(empresa)
-            result_lista.append(result)
-
-            ecopontos = result.get('ecopontos')
-            if ecopontos:
-                for eco in ecopontos:
-                    dias_funcionamento = eco.get('dia_funcionamento')
-
-                    # extrai valor do enum
-                    if dias_funcionamento:
-                        dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-                        eco["dia_funcionamento"] = dia_funcionamento
-
-                        # agrupa horário de funcionamento em uma única string
-                        eco["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-                    # extrai valor do enum
-                    situacao = eco.get("situacao")
-
-                    if situacao:
-                        valor, nome = retira_valor_enumSituacao(situacao)
-                        eco["situacao_enum"] = nome
-                        eco["situacao"] = valor
+    def get(self, query_args):
+        """
+            Lista as empresas, paginadas.
+
+            **Descrição**: Aceita page/page_size ou cursor (ver paginação dos ecopontos) e
+                `busca` por parte do nome fantasia, da razão social ou do CNPJ.
+                Os ecopontos de cada empresa só são incluídos com `incluir=ecopontos` (ou se
+                forem selecionados em `fields`); nesse caso são carregados em uma consulta por
+                página, então o número de consultas não depende do número de empresas.
+
+            **Retorna**:
+                Um objeto JSON com as empresas da página e os dados de paginação.
+        """
+
+        campos = seleciona_campos(query_args.get("campos"), EmpresaGetSchema)
+        incluir_ecopontos = query_args.get("incluir") == "ecopontos" or (
+            campos is not None and campos_relacao(campos, "ecopontos") != ()
+        )
+
+        query = EmpresaModel().query.options(*perfil_empresa(campos))
+        if query_args.get("busca"):
+            query = filtra_busca_empresa(query, query_args["busca"])
+
+        if query_args["stream"]:
+            context = {
+                "code": 200,
+                "status": "OK",
+                "message": "",
+                "values": VALORES,
+                "pagination": None
+            }
+            return resposta_stream(context, serializa_empresas_em_lotes(query, campos, incluir_ecopontos))
+
+        empresas, paginacao = paginar(query, EmpresaModel.id, query_args)
+        result_lista = serializa_empresas(empresas, campos, incluir_ecopontos)
 
         context = {
             "code": 200,
             "status": "OK",
             "message": "",
-            "values": result_lista
+            "values": result_lista,
+            "pagination": paginacao
         }
         
         return jsonify(context)
@@ -360,7 +393,7 @@ class Empresas(MethodView):
 
         usuario = UsuarioModel(
             email=email,
-            senha=pbkdf2_sha256.hash(senha)
+            senha=SENHAS.gerar(senha)
         )
 
         perfil_usuario = PerfilUsuarioModel(
@@ -385,16 +418,16 @@ class Empresas(MethodView):
         )
 
         if aceite_termo:
+            valida_ids(TermoModel, [termo.get('termo_id') for termo in aceite_termo], "Termos")
+
             for termo in aceite_termo:
                 
                 aceite=termo.get('aceite')
                 termo_id=termo.get('termo_id')
-
-                termo_object = TermoModel().query.get_or_404(termo_id)
                 
                 aceite_termo = TermoAceiteModel(
                     aceite=aceite,
-                    termo=termo_object,
+                    termo_id=termo_id,
                     empresa=empresa
                 )
                 termos_list.append(aceite_termo)
@@ -426,30 +459,9 @@ class Empresas(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        empresa_schema = EmpresaSchema()
+        empresa_schema = serializador(EmpresaSchema)
         result = empresa_schema.dump(empresa)
 
-        ecopontos = result.get('ecopontos')
-        if ecopontos:
-            for eco in ecopontos:
-                dias_funcionamento = eco.get('dia_funcionamento')
-
-                # extrai valor do enum
-                if dias_funcionamento:
-                    dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-                    eco["dia_funcionamento"] = dia_funcionamento
-
-                    # agrupa horário de funcionamento em uma única string
-                    eco["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-                # extrai valor do enum
-                situacao = eco.get("situacao")
-
-                if situacao:
-                    valor, nome = retira_valor_enumSituacao(situacao)
-                    eco["situacao_enum"] = nome
-                    eco["situacao"] = valor
-
         context = {
             "code": 201,
             "status": "Created",
@@ -553,7 +565,7 @@ class EmpresasEcoponto(MethodView):
 
         usuario = UsuarioModel(
             email=email,
-            senha=pbkdf2_sha256.hash(senha)
+            senha=SENHAS.gerar(senha)
         )
 
         perfil_usuario = PerfilUsuarioModel(
@@ -578,16 +590,16 @@ class EmpresasEcoponto(MethodView):
         )
 
         if aceite_termo:
+            valida_ids(TermoModel, [termo.get('termo_id') for termo in aceite_termo], "Termos")
+
             for termo in aceite_termo:
                 
                 aceite=termo.get('aceite')
                 termo_id=termo.get('termo_id')
-
-                termo_object = TermoModel().query.get_or_404(termo_id)
                 
                 aceite_termo = TermoAceiteModel(
                     aceite=aceite,
-                    termo=termo_object,
+                    termo_id=termo_id,
                     empresa=empresa
                 )
                 termos_list.append(aceite_termo)
@@ -612,6 +624,7 @@ class EmpresasEcoponto(MethodView):
             dias_funcionamento = ecoponto_data.get('dia_funcionamento')
 
             residuos = ecoponto_data.get('residuo')
+            residuos_list = valida_ids(ResiduoModel, [residuo.get('id') for residuo in residuos or []], "Resíduos")
             
             dias_funcionamento_list = []
 
@@ -636,13 +649,15 @@ class EmpresasEcoponto(MethodView):
                     hora_final = funcionamento.get('hora_final')
 
                     dia_funcionamento_obj = DiaFuncionamentoModel(
-                        dia_semana=DiasSemanaEnum[dia_semana],
+                        dia_semana=dia_semana,
                         hora_inicial=hora_inicial,
                         hora_final=hora_final,
                         ecoponto=ecoponto
                     )
                     dias_funcionamento_list.append(dia_funcionamento_obj)
 
+            atualiza_funcionamento(ecoponto, dias_funcionamento_list)
+
             localizacao_obj = None
             if localizacao:
                 localizacao = localizacao[0]
@@ -681,18 +696,16 @@ class EmpresasEcoponto(MethodView):
                 for funcionamento in dias_funcionamento_list:
                     db.session.add(funcionamento)
 
-                if residuos:
-                    for residuo in residuos:
-                        id_residuo = residuo.get('id')
-                        residuo_object = ResiduoModel().query.get_or_404(id_residuo)
-                        
-                        categoria_residuo = EcopontoResiduoModel(
-                            residuo_id=residuo_object.id,
-                            ecoponto_id=ecoponto.id
-                        )
-                        db.session.add(categoria_residuo)
+                if residuos_list:
+                    db.session.flush()
+                    sincroniza_associacao(
+                        EcopontoResiduoModel.ecoponto_id, ecoponto.id, EcopontoResiduoModel.residuo_id, residuos_list,
+                        remover=False
+                    )
 
             db.session.commit()
+            indice_ecopontos.invalidar()
+            mapa_ecopontos.invalidar()
 
             message = f"Empresa criada com sucesso"
             logging.debug(message)
@@ -709,30 +722,9 @@ class EmpresasEcoponto(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        empresa_schema = EmpresaSchema()
+        empresa_schema = serializador(EmpresaSchema)
         result = empresa_schema.dump(empresa)
 
-        ecopontos = result.get('ecopontos')
-        if ecopontos:
-            for eco in ecopontos:
-                dias_funcionamento = eco.get('dia_funcionamento')
-
-                # extrai valor do enum
-                if dias_funcionamento:
-                    dia_funcionamento = transforma_dia_funcionamento(dias_funcionamento)
-                    eco["dia_funcionamento"] = dia_funcionamento
-
-                    # agrupa horário de funcionamento em uma única string
-                    eco["funcionamento"] = agrupar_horarios(dias_funcionamento)
-
-                # extrai valor do enum
-                situacao = eco.get("situacao")
-
-                if situacao:
-                    valor, nome = retira_valor_enumSituacao(situacao)
-                    eco["situacao_enum"] = nome
-                    eco["situacao"] = valor
-
         context = {
             "code": 201,
             "status": "Created",
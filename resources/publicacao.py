@@ -3,7 +3,7 @@ import logging.handlers
 from flask import jsonify
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
-from sqlalchemy import or_
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from extensions.database import db
@@ -13,11 +13,121 @@ from models.ecoponto import EcopontoModel
 from models.publicacao import PublicacaoModel
 from models.residuo import ResiduoModel
 from models.secao_publicacao import SecaoPublicacaoModel
+from utilities.busca_textual import IndiceInvertido, consulta_postgres, normaliza, trecho, vetor_postgres
+from utilities.paginacao import paginar, paginar_lista
+from utilities.stream_json import VALORES, registros_em_lotes, resposta_stream, tamanho_lote
 from schemas.publicacao import PlainPublicacaoSchema, PlainSecaoPublicacaoSchema, PublicacaoGetListSchema, PublicacaoGetSchema, PublicacaoPostSchema, PublicacaoSchema, PublicacaoSearchSchema, SecaoPublicacaoGetSchema
+from schemas.registro import serializador
 
 blp = Blueprint("Publicações", "publicacoes", description="Operações sobre publicações")
 
 
+def atualiza_busca(publicacao, secoes):
+    """
+        Atualiza os textos normalizados usados na busca textual da publicação.
+
+        **Descrição:** Deve ser chamada, antes do commit, sempre que a publicação ou suas
+            seções forem gravadas. Apenas as seções ativas entram na busca.
+
+        **Parâmetros:**
+            publicacao (PublicacaoModel): publicação a ser atualizada.
+            secoes (list): SecaoPublicacaoModel atuais da publicação.
+    """
+
+    textos = [publicacao.descricao] + [
+        f"{secao.titulo} {secao.descricao}" for secao in secoes if secao.ativo is not False
+    ]
+    publicacao.titulo_busca = normaliza(publicacao.titulo)
+    publicacao.texto_busca = normaliza("\n".join(textos))
+
+
+def carrega_textos_publicacoes():
+    return (
+        db.session.query(PublicacaoModel.id, PublicacaoModel.titulo_busca, PublicacaoModel.texto_busca)
+        .filter(PublicacaoModel.ativo)
+        .all()
+    )
+
+
+# busca textual em memória, usada quando o banco não é Postgres (ex.: SQLite)
+indice_publicacoes = IndiceInvertido(carrega_textos_publicacoes)
+
+
+def busca_publicacoes(query, palavra_chave, query_args):
+    """
+        Pesquisa a palavra-chave nas publicações da consulta e retorna a página de resultados,
+        ordenada pela relevância.
+
+        **Descrição:** No Postgres usa o tsvector (configuração "portuguese", com stemming)
+            e o índice GIN; nos demais bancos usa o índice invertido em memória.
+
+        **Retorna:**
+            Tupla ([(publicacao, relevancia)], paginacao).
+    """
+
+    if db.engine.dialect.name == "postgresql":
+        vetor = vetor_postgres(PublicacaoModel.titulo_busca, PublicacaoModel.texto_busca)
+        consulta = consulta_postgres(palavra_chave)
+        relevancia = func.ts_rank(vetor, consulta)
+
+        query = query.filter(vetor.op("@@")(consulta)).add_columns(relevancia)
+        registros, paginacao = paginar(query, PublicacaoModel.id, query_args, ordem=(relevancia.desc(),))
+        return [tuple(registro) for registro in registros], paginacao
+
+    pagina, paginacao = paginar_lista(encontrados_em_memoria(query, palavra_chave), query_args)
+
+    publicacoes = {}
+    if pagina:
+        publicacoes = {
+            publicacao.id: publicacao
+            for publicacao in PublicacaoModel.query.filter(PublicacaoModel.id.in_([id for id, _ in pagina]))
+        }
+
+    return [(publicacoes[id], relevancia) for id, relevancia in pagina if id in publicacoes], paginacao
+
+
+def encontrados_em_memoria(query, palavra_chave):
+    # busca no índice invertido e aplica os demais filtros da consulta aos ids encontrados
+    encontrados = indice_publicacoes.buscar(palavra_chave)
+    if encontrados:
+        permitidos = {
+            id for (id,) in query.with_entities(PublicacaoModel.id)
+            .filter(PublicacaoModel.id.in_([id for id, _ in encontrados]))
+        }
+        encontrados = [(id, relevancia) for id, relevancia in encontrados if id in permitidos]
+
+    return encontrados
+
+
+def busca_publicacoes_em_lotes(query, palavra_chave):
+    """
+        Como `busca_publicacoes`, mas gera todos os resultados (publicacao, relevancia), sem
+        paginação, carregados em lotes para a resposta em stream.
+    """
+
+    if db.engine.dialect.name == "postgresql":
+        vetor = vetor_postgres(PublicacaoModel.titulo_busca, PublicacaoModel.texto_busca)
+        consulta = consulta_postgres(palavra_chave)
+        relevancia = func.ts_rank(vetor, consulta)
+
+        query = query.filter(vetor.op("@@")(consulta)).add_columns(relevancia).order_by(relevancia.desc())
+        for publicacao, relevancia_publicacao in registros_em_lotes(query, PublicacaoModel.id):
+            yield publicacao, relevancia_publicacao
+        return
+
+    encontrados = encontrados_em_memoria(query, palavra_chave)
+    lote = tamanho_lote()
+    for inicio in range(0, len(encontrados), lote):
+        pagina = encontrados[inicio:inicio + lote]
+        publicacoes = {
+            publicacao.id: publicacao
+            for publicacao in PublicacaoModel.query.filter(PublicacaoModel.id.in_([id for id, _ in pagina]))
+        }
+        for id, relevancia in pagina:
+            if id in publicacoes:
+                yield publicacoes[id], relevancia
+
+
 
 @blp.route("/publicacao/<int:publicacao_id>")
 class Publicacao(MethodView):
@@ -58,7 +168,7 @@ class Publicacao(MethodView):
         """
 
         publicacao = PublicacaoModel().query.get_or_404(publicacao_id)
-        publicacao_schema = PublicacaoSchema()
+        publicacao_schema = serializador(PublicacaoSchema)
         result = publicacao_schema.dump(publicacao)
         context = {
             "code": 200,
@@ -96,6 +206,7 @@ class Publicacao(MethodView):
             db.session.delete(publicacao)
 
             db.session.commit()
+            indice_publicacoes.invalidar()
 
             message = f"Publicação excluída com sucesso"
             logging.debug(message)
@@ -157,7 +268,9 @@ class Publicacao(MethodView):
         # Salva em BD
         try:
             db.session.add(publicacao)
+            atualiza_busca(publicacao, publicacao.secao_publicacao.all())
             db.session.commit()
+            indice_publicacoes.invalidar()
 
             message = f"Publicação editada com sucesso"
             logging.debug(message)
@@ -174,7 +287,7 @@ class Publicacao(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        publicacao_schema = PublicacaoSchema()
+        publicacao_schema = serializador(PublicacaoSchema)
         result = publicacao_schema.dump(publicacao)
 
         context = {
@@ -219,25 +332,25 @@ class Publicacoes(MethodView):
                 - residuo_id (int): ID do resíduo.
                 - categoria_id (int): ID da categoria.
                 - ecoponto_id (int): ID do ecoponto.
-                - palavra_chave (str): Termo de pesquisa para buscar no texto da publicação e seção.
+                - palavra_chave (str): Termo de pesquisa para buscar no texto da publicação e seção. 
+                    Ignora acentos e plurais; os resultados são ordenados pela relevância e trazem 
+                    `relevancia` e `trecho` (texto em volta do termo, destacado com <mark>).
                 - page (int): Número da página.
                 - page_size (int): Número de registros por página.
+                - cursor (str): cursor da próxima página (next_cursor); vazio para a primeira página.
+                - include_total (bool): se falso, não calcula o total de registros.
+                - stream (bool): retorna todas as publicações, sem paginação, transmitidas em partes.
 
             **Retorna**:
                 Um objeto JSON com a lista de publicações filtrados pelos critérios informados e informações 
                 de paginação.
         """
 
-        result_lista = []
-
         residuo_id = query_args.get("residuo_id")
         categoria_id = query_args.get("categoria_id")
         ecoponto_id = query_args.get("ecoponto_id")
         palavra_chave = query_args.get("palavra_chave")
 
-        pagina = int(query_args.get("page", 1))
-        limite = int(query_args.get("page_size", 0))
-
         query = PublicacaoModel.query.filter(PublicacaoModel.ativo)
 
         if categoria_id:
@@ -254,34 +367,44 @@ class Publicacoes(MethodView):
 
                 query = query.filter(PublicacaoModel.residuo_id.in_(residuos_ecoponto_ids))
 
-        if palavra_chave:
-            query =  query.outerjoin(SecaoPublicacaoModel, PublicacaoModel.id == SecaoPublicacaoModel.publicacao_id).filter(or_(
-                    PublicacaoModel.titulo.ilike(f'%{palavra_chave}%'), 
-                    PublicacaoModel.descricao.ilike(f'%{palavra_chave}%'), 
-                    SecaoPublicacaoModel.titulo.ilike(f'%{palavra_chave}%'), 
-                    SecaoPublicacaoModel.descricao.ilike(f'%{palavra_chave}%'),
-                )
-            )
-
-        total_registros = query.count()
+        publicacao_schema = serializador(PublicacaoSchema)
 
-        if limite < 1:
-            limite = total_registros
-        publicacoes = query.offset((pagina - 1) * limite).limit(limite).all()
+        def serializa(publicacao):
+            relevancia = None
+            if palavra_chave:
+                publicacao, relevancia = publicacao
 
-        for publicacao in publicacoes:
-            publicacao_schema = PublicacaoSchema()
             result = publicacao_schema.dump(publicacao)
-            
-            result_lista.append(result)
-
-        paginacao = {
-            "total": total_registros,
-            "page": pagina,
-            "page_size": limite,
-            "previous": pagina > 1,
-            "next": total_registros > pagina * limite
-        }
+
+            if palavra_chave:
+                textos = [result["descricao"]] + [
+                    f"{secao['titulo']} {secao['descricao']}" for secao in result["secao_publicacao"] if secao["ativo"]
+                ]
+                result["relevancia"] = round(float(relevancia), 6)
+                result["trecho"] = trecho("\n".join(textos), palavra_chave)
+
+            return result
+
+        if query_args["stream"]:
+            context = {
+                "code": 200,
+                "status": "OK",
+                "message": "",
+                "values": VALORES,
+                "pagination": None
+            }
+            if palavra_chave:
+                publicacoes = busca_publicacoes_em_lotes(query, palavra_chave)
+            else:
+                publicacoes = registros_em_lotes(query, PublicacaoModel.id)
+            return resposta_stream(context, publicacoes, serializa)
+
+        if palavra_chave:
+            publicacoes, paginacao = busca_publicacoes(query, palavra_chave, query_args)
+        else:
+            publicacoes, paginacao = paginar(query, PublicacaoModel.id, query_args)
+
+        result_lista = [serializa(publicacao) for publicacao in publicacoes]
 
         context = {
             "code": 200,
@@ -381,7 +504,9 @@ class Publicacoes(MethodView):
             for secao in secao_list:
                  db.session.add(secao)
 
+            atualiza_busca(publicacao, secao_list)
             db.session.commit()
+            indice_publicacoes.invalidar()
 
 
             message = f"Publicação criada com sucesso"
@@ -399,7 +524,7 @@ class Publicacoes(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        publicacao_schema = PublicacaoSchema()
+        publicacao_schema = serializador(PublicacaoSchema)
         result = publicacao_schema.dump(publicacao)
         context = {
             "code": 201,
@@ -471,7 +596,9 @@ class PublicacaoSecao(MethodView):
         # Salva em BD
         try:
             db.session.add(secao)
+            atualiza_busca(publicacao, publicacao.secao_publicacao.all())
             db.session.commit()
+            indice_publicacoes.invalidar()
 
 
             message = f"Seção da publicação criada com sucesso"
@@ -489,7 +616,7 @@ class PublicacaoSecao(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        secao_schema = PlainSecaoPublicacaoSchema()
+        secao_schema = serializador(PlainSecaoPublicacaoSchema)
         result = secao_schema.dump(secao)
         context = {
             "code": 201,
@@ -537,8 +664,11 @@ class PublicacaoSecaoUpdate(MethodView):
         
         try:
             secao = SecaoPublicacaoModel().query.get_or_404(secao_id)
+            publicacao = secao.publicacao
             db.session.delete(secao)
+            atualiza_busca(publicacao, publicacao.secao_publicacao.all())
             db.session.commit()
+            indice_publicacoes.invalidar()
 
             message = f"Seção da publicação excluída com sucesso"
             logging.debug(message)
@@ -602,7 +732,9 @@ class PublicacaoSecaoUpdate(MethodView):
         # Salva em BD
         try:
             db.session.add(secao)
+            atualiza_busca(secao.publicacao, secao.publicacao.secao_publicacao.all())
             db.session.commit()
+            indice_publicacoes.invalidar()
 
 
             message = f"Seção da publicação editada com sucesso"
@@ -620,7 +752,7 @@ class PublicacaoSecaoUpdate(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        secao_schema = PlainSecaoPublicacaoSchema()
+        secao_schema = serializador(PlainSecaoPublicacaoSchema)
         result = secao_schema.dump(secao)
         context = {
             "code": 201,
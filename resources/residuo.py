@@ -2,13 +2,16 @@ import logging.handlers
 from flask import jsonify
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
+from cache import CACHE_RESPOSTAS, cache_resposta
 from models.categoria import CategoriaModel
 from models.categoria_residuo import CategoriaResiduoModel
 from models.residuo import ResiduoModel
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from extensions.database import db
+from utilities.associacao import sincroniza_associacao, valida_ids
 from models.residuo import ResiduoModel
 from schemas.categoria_residuo import ResiduoPostSchema, ResiduoSchema, ResiduoSearchSchema, RetornoResiduoSchema
+from schemas.registro import serializador
 
 blp = Blueprint("Resíduos", "resíduos", description="Operações sobre resíduos")
 
@@ -16,11 +19,12 @@ blp = Blueprint("Resíduos", "resíduos", description="Operações sobre resídu
 @blp.route("/residuo/<int:residuo_id>")
 class Residuo(MethodView):
 
+    @cache_resposta("categoria_residuo")
     @blp.response(200, RetornoResiduoSchema)
     def get(self, residuo_id):
         
         residuo = ResiduoModel().query.get_or_404(residuo_id)
-        residuo_schema = ResiduoSchema()
+        residuo_schema = serializador(ResiduoSchema)
         result = residuo_schema.dump(residuo)
 
         context = {
@@ -40,6 +44,7 @@ class Residuo(MethodView):
             residuo = ResiduoModel().query.get_or_404(residuo_id)
             db.session.delete(residuo)
             db.session.commit()
+            CACHE_RESPOSTAS.invalidar("categoria_residuo")
 
             message = f"Resíduo excluído com sucesso"
             logging.debug(message)
@@ -83,34 +88,18 @@ class Residuo(MethodView):
         if residuo_descricao.id != residuo.id:
             abort(409, message="Resíduo com essa descrição já existe")
 
+        categorias_list = valida_ids(CategoriaModel, [categoria.get('id') for categoria in categorias or []], "Categorias")
+
         # Salva em BD
         try:
-            categorias_anteriores = residuo.categoria
             db.session.add(residuo)
 
-            for ca in categorias_anteriores:
-                if ca not in categorias:
-
-                    cat_res = CategoriaResiduoModel.query.filter(
-                        CategoriaResiduoModel.categoria_id == ca.id, 
-                        CategoriaResiduoModel.residuo_id == residuo.id
-                    ).first()
-
-                    db.session.delete(cat_res)
-                    
-
-            if categorias:
-                for categoria in categorias:
-                    categoria_id = categoria.get('id')
-                    categoriao_object = CategoriaModel().query.get_or_404(categoria_id)
-
-                    categoria_residuo = CategoriaResiduoModel(
-                        residuo_id=residuo.id,
-                        categoria_id=categoriao_object.id
-                    )
-                    db.session.add(categoria_residuo)
+            sincroniza_associacao(
+                CategoriaResiduoModel.residuo_id, residuo.id, CategoriaResiduoModel.categoria_id, categorias_list
+            )
 
             db.session.commit()
+            CACHE_RESPOSTAS.invalidar("categoria_residuo")
 
 
 
@@ -129,7 +118,7 @@ class Residuo(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        residuo_schema = ResiduoSchema()
+        residuo_schema = serializador(ResiduoSchema)
         result = residuo_schema.dump(residuo)
 
         context = {
@@ -145,6 +134,7 @@ class Residuo(MethodView):
 @blp.route("/residuo")
 class Residuos(MethodView):
 
+    @cache_resposta("categoria_residuo")
     @blp.arguments(ResiduoSearchSchema, location="query")
     @blp.response(200, RetornoResiduoSchema)
     def get(self, query_args):
@@ -175,10 +165,7 @@ class Residuos(MethodView):
                 intersecao_ids = set_ids_lista.intersection(set_ids_lista1)
                 set_ids_lista = set_ids_lista1
 
-            for residuo in intersecao_ids:
-                residuo_schema = ResiduoSchema()
-                result = residuo_schema.dump(residuo)
-                result_lista.append(result)
+            result_lista = serializador(ResiduoSchema, many=True).dump(sorted(intersecao_ids, key=lambda residuo: residuo.id))
             
         except IntegrityError as error:
             logging.warning(message)
@@ -227,22 +214,21 @@ class Residuos(MethodView):
             recolhido_em_ecoponto=recolhido_em_ecoponto
         )
 
+        categorias_list = valida_ids(CategoriaModel, [categoria.get('id') for categoria in categorias or []], "Categorias")
+
         # Salva em BD
         try:
             db.session.add(residuo)
 
-            if categorias:
-                for categoria in categorias:
-                    categoria_id = categoria.get('id')
-                    categoriao_object = CategoriaModel().query.get_or_404(categoria_id)
-
-                    categoria_residuo = CategoriaResiduoModel(
-                        residuo_id=residuo.id,
-                        categoria_id=categoriao_object.id
-                    )
-                    db.session.add(categoria_residuo)
+            if categorias_list:
+                db.session.flush()
+                sincroniza_associacao(
+                    CategoriaResiduoModel.residuo_id, residuo.id, CategoriaResiduoModel.categoria_id, categorias_list,
+                    remover=False
+                )
 
             db.session.commit()
+            CACHE_RESPOSTAS.invalidar("categoria_residuo")
 
             message = f"Resíduo criado com sucesso"
             logging.debug(message)
@@ -260,7 +246,7 @@ class Residuos(MethodView):
             abort(500, message="Server Error.")
     
 
-        residuo_schema = ResiduoSchema()
+        residuo_schema = serializador(ResiduoSchema)
         result = residuo_schema.dump(residuo)
 
         context = {
@@ -0,0 +1,54 @@
+import logging.handlers
+
+from flask import jsonify
+from flask.views import MethodView
+from flask_jwt_extended import get_jwt
+from flask_smorest import Blueprint, abort
+
+from extensions.pool import METRICAS_POOL
+from schemas.status import RetornoPoolStatusSchema
+from security import jwt_required_with_doc
+
+blp = Blueprint("Status", "status", description="Estado interno da API")
+
+
+@blp.route("/status/pool")
+class StatusPool(MethodView):
+    """
+        Endpoint com as métricas do pool de conexões com o banco de dados.
+
+        Métodos:
+        --------
+        get():
+            Retorna o estado do pool e as métricas acumuladas do worker que atendeu a requisição.
+    """
+
+    @jwt_required_with_doc()
+    @blp.response(200, RetornoPoolStatusSchema)
+    def get(self):
+        """
+            Retorna as métricas do pool de conexões.
+
+            **Descrição**: Conexões em uso, livres e em overflow, tempo de espera por uma
+                conexão (médio e máximo), timeouts e conexões abertas/invalidadas. Os valores
+                são do worker que respondeu; com vários workers, cada um tem o seu pool.
+                Apenas administradores.
+
+            **Retorna**:
+                Um objeto JSON com o estado do pool.
+        """
+
+        if not get_jwt().get("admin"):
+            abort(403, message="Apenas administradores.")
+
+        resumo = METRICAS_POOL.resumo()
+        logging.debug(f"Pool: {resumo}")
+
+        context = {
+            "code": 200,
+            "status": "OK",
+            "message": "",
+            "value": resumo
+        }
+
+        return jsonify(context)
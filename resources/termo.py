@@ -1,6 +1,7 @@
 from flask import jsonify
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
+from cache import CACHE_RESPOSTAS, cache_resposta
 from models.aceite_termo import TermoAceiteModel
 from models.termo import TermoModel
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
@@ -9,6 +10,7 @@ from extensions.database import db
 import logging.handlers
 
 from schemas.termo import AceiteTermoSchema, PlainTermoSchema, RetornoTermoListaSchema, RetornoTermoSchema, SearchSchema
+from schemas.registro import serializador
 
 blp = Blueprint("Termos", "termos", description="Operações sobre termos")
 
@@ -17,11 +19,12 @@ blp = Blueprint("Termos", "termos", description="Operações sobre termos")
 class Termo(MethodView):
 
 
+    @cache_resposta("termo")
     @blp.response(200, RetornoTermoSchema)
     def get(self, termo_id):
         
         termo = TermoModel().query.get_or_404(termo_id)
-        termo_schema = PlainTermoSchema()
+        termo_schema = serializador(PlainTermoSchema)
         result = termo_schema.dump(termo)
 
         context = {
@@ -40,6 +43,7 @@ class Termo(MethodView):
             termo = TermoModel().query.get_or_404(termo_id)
             db.session.delete(termo)
             db.session.commit()
+            CACHE_RESPOSTAS.invalidar("termo")
 
             message = f"Termo excluído com sucesso"
             logging.debug(message)
@@ -85,6 +89,7 @@ class Termo(MethodView):
         try:
             db.session.add(termo)
             db.session.commit()
+            CACHE_RESPOSTAS.invalidar("termo")
             message = f"Termo editado com sucesso"
             logging.debug(message)
     
@@ -100,7 +105,7 @@ class Termo(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        termo_schema = PlainTermoSchema()
+        termo_schema = serializador(PlainTermoSchema)
         result = termo_schema.dump(termo)
 
         context = {
@@ -117,6 +122,7 @@ class Termo(MethodView):
 class Termos(MethodView):
 
 
+    @cache_resposta("termo")
     @blp.arguments(SearchSchema, location="query")
     @blp.response(200, RetornoTermoListaSchema)
     def get(self, query_args):
@@ -130,10 +136,7 @@ class Termos(MethodView):
             if descricao:
                 termos = termos.filter(TermoModel.descricao.like(f'%{descricao}%'))
 
-            for termo in termos:
-                termo_schema = PlainTermoSchema()
-                result = termo_schema.dump(termo)
-                result_lista.append(result)
+            result_lista = serializador(PlainTermoSchema, many=True).dump(termos)
             
         except IntegrityError as error:
             logging.warning(message)
@@ -184,6 +187,7 @@ class Termos(MethodView):
         try:
             db.session.add(termo)
             db.session.commit()
+            CACHE_RESPOSTAS.invalidar("termo")
 
 
             message = f"Termo criado com sucesso"
@@ -201,7 +205,7 @@ class Termos(MethodView):
             logging.warning(message)
             abort(500, message="Server Error.")
 
-        termo_schema = PlainTermoSchema()
+        termo_schema = serializador(PlainTermoSchema)
         result = termo_schema.dump(termo)
 
         context = {
@@ -1,11 +1,12 @@
 from flask import jsonify
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
-from passlib.hash import pbkdf2_sha256
+from senhas import SENHAS
 from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt_identity, jwt_required, get_jwt
 import logging.handlers
 
 from blocklist import BLOCKLIST
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from extensions.database import db
 
@@ -14,6 +15,7 @@ from models import UsuarioModel
 from models.empresa import EmpresaModel
 from models.perfil_usuario import PerfilUsuarioModel
 from schemas.usuario import PlainUsuarioLoginSchema, UsuarioReturnSchema, UsuarioReturnTokenSchema, UsuarioSchema
+from schemas.registro import serializador
 from security import jwt_required_with_doc
 from utilities.apenas_digitos import apenas_digitos
 from utilities.valida_telefone import validar_telefone
@@ -48,7 +50,7 @@ class RegistrarUsuario(MethodView):
         
         usuario = UsuarioModel(
             email=email,
-            senha=pbkdf2_sha256.hash(senha),
+            senha=SENHAS.gerar(senha),
             equipe=equipe,
             admin=admin,
             sistema=usuario_sistema
@@ -86,7 +88,7 @@ class RegistrarUsuario(MethodView):
 
         # return {"message": "Usuário criado com sucesso."}, 201
 
-        usuario_schema = UsuarioSchema()
+        usuario_schema = serializador(UsuarioSchema)
         result = usuario_schema.dump(usuario)
         result["nome"] = nome
         result["telefone"] = telefone
@@ -130,7 +132,7 @@ class RegistrarUsuario(MethodView):
         
         usuario = UsuarioModel(
             email=email,
-            senha=pbkdf2_sha256.hash(senha),
+            senha=SENHAS.gerar(senha),
             equipe=equipe,
             admin=admin,
             sistema=usuario_sistema
@@ -168,7 +170,7 @@ class RegistrarUsuario(MethodView):
 
         # return {"message": "Usuário criado com sucesso."}, 201
 
-        usuario_schema = UsuarioSchema()
+        usuario_schema = serializador(UsuarioSchema)
         result = usuario_schema.dump(usuario)
         result["nome"] = nome
         result["telefone"] = telefone
@@ -212,7 +214,7 @@ class RegistrarUsuario(MethodView):
         
         usuario = UsuarioModel(
             email=email,
-            senha=pbkdf2_sha256.hash(senha),
+            senha=SENHAS.gerar(senha),
             equipe=equipe,
             admin=admin,
             sistema=usuario_sistema
@@ -250,7 +252,7 @@ class RegistrarUsuario(MethodView):
 
         # return {"message": "Usuário criado com sucesso."}, 201
 
-        usuario_schema = UsuarioSchema()
+        usuario_schema = serializador(UsuarioSchema)
         result = usuario_schema.dump(usuario)
         result["nome"] = nome
         result["telefone"] = telefone
@@ -276,23 +278,29 @@ class UsuarioLogin(MethodView):
         email = usuario_data["email"]
         senha = usuario_data["senha"]
     
-        usuario = UsuarioModel.query.filter(
-            UsuarioModel.email == email
+        # usuário, perfil e empresa em uma consulta
+        linha = db.session.execute(
+            select(UsuarioModel, PerfilUsuarioModel.nome, EmpresaModel.id, EmpresaModel.nome_fantasia)
+            .outerjoin(PerfilUsuarioModel, PerfilUsuarioModel.usuario_id == UsuarioModel.id)
+            .outerjoin(EmpresaModel, EmpresaModel.usuario_id == UsuarioModel.id)
+            .where(UsuarioModel.email == email)
+            .limit(1)
         ).first()
 
-        if usuario and pbkdf2_sha256.verify(senha, usuario.senha):
+        usuario, nome, empresa_id, nome_fantasia = linha or (None, None, None, None)
+        senha_valida, novo_hash = SENHAS.verificar(senha, usuario.senha) if usuario else (False, None)
 
-            perfil_usuario = PerfilUsuarioModel.query.filter(
-                PerfilUsuarioModel.usuario == usuario
-            ).first()
+        if senha_valida:
+
+            # hash feito com menos rounds que o configurado: substitui pelo atual
+            if novo_hash:
+                try:
+                    usuario.senha = novo_hash
+                    db.session.commit()
+                except SQLAlchemyError as error:
+                    db.session.rollback()
+                    logging.warning(f"Error rehash senha: {error}")
 
-            empresa_id = None
-            nome_fantasia = None
-            empresa = EmpresaModel.query.filter(EmpresaModel.usuario == usuario).first()
-            if empresa:
-                empresa_id = empresa.id
-                nome_fantasia = empresa.nome_fantasia
-            
             dados_usuario = {
                 "sistema": usuario.sistema,
                 "equipe": usuario.equipe,
@@ -309,9 +317,9 @@ class UsuarioLogin(MethodView):
             refresh_token = create_refresh_token(identity=usuario.id)
 
 
-            usuario_schema = UsuarioSchema()
+            usuario_schema = serializador(UsuarioSchema)
             result = usuario_schema.dump(usuario)
-            result["nome"] = perfil_usuario.nome
+            result["nome"] = nome
             result["equipe"] = usuario.equipe
             result["admin"] = usuario.admin
             result["sistema"] = usuario.sistema
@@ -343,8 +351,7 @@ class TokenRefresh(MethodView):
 class usuarioLogout(MethodView):
     @jwt_required_with_doc()
     def post(self):
-        jti = get_jwt()["jti"]
-        BLOCKLIST.add(jti)
+        BLOCKLIST.revogar(get_jwt())
         return {"message": "Logout realizado com sucesso."}
 
 
@@ -0,0 +1,40 @@
+from marshmallow import fields
+
+
+class ValorEnum(fields.Enum):
+    """
+        Campo de enum pelo valor: SituacaoEnum.em_analise <-> "Em análise".
+
+        No dump, o texto vem de uma tabela montada na criação do campo (um acesso a dict por
+        registro); aceita também o nome do membro, como fica o atributo de um model antes do
+        commit. No load, retorna o membro do enum e rejeita valores fora dele.
+    """
+
+    def __init__(self, enum, **kwargs):
+        super().__init__(enum, by_value=True, **kwargs)
+        self.tabela = {membro: membro.value for membro in enum}
+        self.tabela.update({membro.name: membro.value for membro in enum})
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        return self.tabela[value]
+
+
+class NomeEnum(fields.Enum):
+    """
+        Campo de enum pelo nome: SituacaoEnum.em_analise <-> "em_analise".
+
+        Serializa a partir de uma tabela montada na criação do campo; com `attribute=` emite o
+        nome ao lado do campo do valor (ex.: situacao_enum, de situacao).
+    """
+
+    def __init__(self, enum, **kwargs):
+        super().__init__(enum, **kwargs)
+        self.tabela = {membro: membro.name for membro in enum}
+        self.tabela.update({membro.name: membro.name for membro in enum})
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        return self.tabela[value]
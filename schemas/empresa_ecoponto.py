@@ -1,8 +1,9 @@
 from marshmallow import Schema, fields, validate
 from models.enums.dia_semana import DiasSemanaEnum
 from models.enums.situacao_ecoponto import SituacaoEnum
+from schemas.campos_enum import NomeEnum, ValorEnum
 from schemas.categoria_residuo import ItemResiduoSchema, PlainResiduoSchema, RetornoSchema
-from schemas.paginacao import PaginacaoSchema, PaginacaoSearchSchema
+from schemas.paginacao import PaginacaoSchema, PaginacaoSearchSchema, StreamSearchSchema
 from schemas.termo import AceiteTermoSchema
 
 
@@ -54,8 +55,8 @@ class PlainLocalizacaoSchema(Schema):
     cidade = fields.Str(required=True)
     estado = fields.Str(required=True)
     complemento = fields.Str(required=False)
-    latitude = fields.Str(required=True)
-    longitude = fields.Str(required=True)
+    latitude = fields.Float(required=True, validate=validate.Range(min=-90, max=90))
+    longitude = fields.Float(required=True, validate=validate.Range(min=-180, max=180))
     url_localizacao = fields.Str(required=False, dump_only=True)    
 
 class PlainLocalizacaoUpdateSchema(Schema):
@@ -66,15 +67,15 @@ class PlainLocalizacaoUpdateSchema(Schema):
     cidade = fields.Str(required=False)
     estado = fields.Str(required=False)
     complemento = fields.Str(required=False)
-    latitude = fields.Str(required=False)
-    longitude = fields.Str(required=False)
+    latitude = fields.Float(required=False, validate=validate.Range(min=-90, max=90))
+    longitude = fields.Float(required=False, validate=validate.Range(min=-180, max=180))
     url_localizacao = fields.Str(required=False, dump_only=True)    
 
 
 # Dia funcionamento
 class PainEcopontoDiaFuncionamento(Schema):
     id = fields.Int(dump_only=True)
-    dia_semana = fields.Str(validate=validate.OneOf([s.value for s in DiasSemanaEnum]))
+    dia_semana = ValorEnum(DiasSemanaEnum)
     hora_inicial = fields.Time(format='%H:%M', required=True)
     hora_final = fields.Time(format='%H:%M', required=True)
 
@@ -82,7 +83,8 @@ class PainEcopontoDiaFuncionamento(Schema):
 # Ecoponto + localizacao + dia funcionamento + residuo - empresa_id
 class PlainEcopontoSchema(Schema):
     id = fields.Int(dump_only=True)
-    situacao = fields.Str(validate=validate.OneOf([s.value for s in SituacaoEnum]), dump_only=True)
+    situacao = ValorEnum(SituacaoEnum, dump_only=True)
+    situacao_enum = NomeEnum(SituacaoEnum, attribute="situacao", dump_only=True)
     nome = fields.Str(required=True)
     ativo = fields.Boolean(missing=True)
     aberto_publico = fields.Boolean(missing=True)
@@ -90,7 +92,7 @@ class PlainEcopontoSchema(Schema):
     data_final = fields.Date(format='2050-12-31T23:59:59.019077+00:00', required=False)
 
 class PlainEcopontoUpdateSchema(Schema):
-    situacao = fields.Str(validate=validate.OneOf([s.value for s in SituacaoEnum]), required=False, dump_only=True)
+    situacao = ValorEnum(SituacaoEnum, required=False, dump_only=True)
     nome = fields.Str(required=False)
     ativo = fields.Boolean(missing=True)
     aberto_publico = fields.Boolean(missing=True)
@@ -103,6 +105,8 @@ class EcopontoSchema(PlainEcopontoSchema):
     localizacao = fields.List(fields.Nested(PlainLocalizacaoSchema), required=True)
     dia_funcionamento = fields.List(fields.Nested(PainEcopontoDiaFuncionamento), required=False)
     residuo = fields.List(fields.Nested(ItemResiduoSchema), required=False)
+    funcionamento = fields.Str(dump_only=True)
+    funcionamentos = fields.List(fields.Str(), dump_only=True)
 
 
 # Ecoponto update + localizacao + dia funcionamento + residuo
@@ -111,6 +115,7 @@ class EcopontoGetSchema(PlainEcopontoSchema):
     dia_funcionamento = fields.List(fields.Nested(PainEcopontoDiaFuncionamento), required=False)
     residuo = fields.List(fields.Nested(PlainResiduoSchema), required=False)
     funcionamento = fields.Str(required=False)
+    funcionamentos = fields.List(fields.Str(), dump_only=True)
     empresa = fields.Nested(PlainEmpresaSchema)
 
 # Empresa + ecoponto
@@ -144,12 +149,37 @@ class RetornoPlainEmpresaSchema(RetornoSchema):
 # empresa lista: classe com a representação padronizada de saída
 class RetornoListaEmpresaSchema(RetornoSchema):
     Values = fields.List(fields.Nested(EmpresaGetSchema()), dump_only=True)
+    pagination = fields.List(fields.Nested(PaginacaoSchema()), dump_only=True)
 
 
 # argumentos de pesquisa
-class EcopontoSearchSchema(PaginacaoSearchSchema):
+class EcopontoSearchSchema(PaginacaoSearchSchema, StreamSearchSchema):
     residuo_id = fields.Str(required=False)
+    match = fields.Str(missing="any", validate=validate.OneOf(["any", "all"]))
     localizacao = fields.Str(required=False)
+    aberto_agora = fields.Bool(required=False)
+    aberto_em = fields.DateTime(required=False)
+    campos = fields.Str(required=False, data_key="fields")
+
+
+# argumentos de seleção de campos (sparse fieldsets)
+class CamposSearchSchema(Schema):
+    campos = fields.Str(required=False, data_key="fields")
+
+
+# argumentos de pesquisa de empresas
+class EmpresaSearchSchema(CamposSearchSchema, PaginacaoSearchSchema, StreamSearchSchema):
+    busca = fields.Str(required=False)
+    incluir = fields.Str(required=False, validate=validate.OneOf(["ecopontos"]))
+
+
+# argumentos de pesquisa por proximidade
+class EcopontoProximoSearchSchema(Schema):
+    lat = fields.Float(required=True, validate=validate.Range(min=-90, max=90))
+    lng = fields.Float(required=True, validate=validate.Range(min=-180, max=180))
+    raio_km = fields.Float(missing=10, validate=validate.Range(min=0, max=100, min_inclusive=False))
+    limit = fields.Int(missing=10, validate=validate.Range(min=1, max=50))
+    residuo_id = fields.Int(required=False)
     
 
 # Ecoponto + localizacao
@@ -163,6 +193,10 @@ class EcopontoLocalizacaoResiduoSchema(PlainEcopontoSchema):
     localizacao = fields.List(fields.Nested(PlainLocalizacaoSchema()))
     residuo = fields.List(fields.Nested(ItemResiduoSchema), required=True)
 
+# importação em lote: um item por ecoponto, com os dias de funcionamento
+class EcopontoLoteSchema(EcopontoLocalizacaoResiduoSchema):
+    dia_funcionamento = fields.List(fields.Nested(PainEcopontoDiaFuncionamento), required=False)
+
 class EcopontoLocalizacaoUpdateSchema(PlainEcopontoUpdateSchema):
     empresa_id = fields.Int(required=False)
     localizacao = fields.List(fields.Nested(PlainLocalizacaoUpdateSchema()))
@@ -202,6 +236,43 @@ class RetornoListaEcopontoSchema(RetornoSchema):
     pagination = fields.List(fields.Nested(PaginacaoSchema()), dump_only=True)
 
 
+# ecoponto mais próximo: ecoponto completo + distância até o ponto pesquisado
+class EcopontoProximoSchema(EcopontoGetSchema):
+    distancia_km = fields.Float(dump_only=True)
+
+
+class RetornoListaEcopontoProximoSchema(RetornoSchema):
+    Values = fields.List(fields.Nested(EcopontoProximoSchema()), dump_only=True)
+
+
+# importação em lote: resultado por linha
+class EcopontoLoteCriadoSchema(Schema):
+    linha = fields.Int()
+    id = fields.Int()
+
+class EcopontoLoteErroSchema(Schema):
+    linha = fields.Int()
+    erros = fields.Dict()
+
+class EcopontoLoteResultadoSchema(Schema):
+    criados = fields.List(fields.Nested(EcopontoLoteCriadoSchema()))
+    erros = fields.List(fields.Nested(EcopontoLoteErroSchema()))
+
+class RetornoEcopontoLoteSchema(RetornoSchema):
+    value = fields.Nested(EcopontoLoteResultadoSchema())
+
+
+# argumentos do mapa de ecopontos
+class EcopontoMapaSearchSchema(Schema):
+    formato = fields.Str(missing="json", validate=validate.OneOf(["json", "geojson", "msgpack"]))
+
+
+# mapa: cada ecoponto é uma lista na ordem de `campos` (id, nome, lat, lng, residuos)
+class RetornoEcopontoMapaSchema(RetornoSchema):
+    campos = fields.List(fields.Str(), dump_only=True)
+    values = fields.List(fields.List(fields.Raw()), dump_only=True)
+
+
 # ecoponto lista: classe com a representação padronizada de saída: ecoponto + localiação
 class RetornoListaEcopontoLocalizacaoSchema(RetornoSchema):
     Values = fields.List(fields.Nested(EcopontoLocalizacaoSchema()), dump_only=True)
@@ -211,8 +282,8 @@ class RetornoListaEcopontoLocalizacaoSchema(RetornoSchema):
 
 # Schema dos dados da situacao ecoponto
 class EcopontoSituacaoSchema(Schema):
-    situacao = fields.Str(required=False)
-    situacao_enum = fields.Str(required=False)
+    situacao = ValorEnum(SituacaoEnum, required=False)
+    situacao_enum = NomeEnum(SituacaoEnum, attribute="situacao", dump_only=True)
 
 class RetornoEcopontoSituacaoSchema(RetornoSchema):
     value = fields.Nested(EcopontoSituacaoSchema())
@@ -233,5 +304,12 @@ class EcopontoLista(EcopontoSituacaoSchema):
    
 class EcopontoListaSituacaoSchema(RetornoSchema):
     values = fields.List(fields.Nested(EcopontoLista))
+    pagination = fields.List(fields.Nested(PaginacaoSchema()), dump_only=True)
+
+
+# argumentos do controle de ecopontos
+class EcopontoControleSearchSchema(PaginacaoSearchSchema, StreamSearchSchema):
+    situacao = NomeEnum(SituacaoEnum, required=False)
+    campos = fields.Str(required=False, data_key="fields")
   
     
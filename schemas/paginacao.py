@@ -5,10 +5,17 @@ from marshmallow import Schema, fields
 class PaginacaoSearchSchema(Schema):
     page = fields.Int(required=False)
     page_size = fields.Int(required=False)
+    cursor = fields.Str(required=False)
+    include_total = fields.Bool(missing=True)
+
+# listagens que podem ser transmitidas em stream (todos os registros, sem paginação)
+class StreamSearchSchema(Schema):
+    stream = fields.Bool(missing=False)
 
 class PaginacaoSchema(PaginacaoSearchSchema):
-    total = fields.Int()
+    total = fields.Int(allow_none=True)
     previous = fields.Bool()
     next = fields.Bool()
+    next_cursor = fields.Str(allow_none=True)
 
 
@@ -1,10 +1,10 @@
 from marshmallow import Schema, fields
-from schemas.paginacao import PaginacaoSchema, PaginacaoSearchSchema
+from schemas.paginacao import PaginacaoSchema, PaginacaoSearchSchema, StreamSearchSchema
 from schemas.retorno import RetornoSchema
 
 
 # argumentos de pesquisa de publicação
-class PublicacaoSearchSchema(PaginacaoSearchSchema):
+class PublicacaoSearchSchema(PaginacaoSearchSchema, StreamSearchSchema):
     residuo_id = fields.Int(required=False)
     categoria_id = fields.Int(required=False)
     ecoponto_id = fields.Int(required=False)
@@ -50,9 +50,15 @@ class PublicacaoGetSchema (RetornoSchema):
     value = fields.Nested(PublicacaoSchema)
 
 
+# Publicacao + seções + relevância e trecho destacado (pesquisa por palavra-chave)
+class PublicacaoResultadoBuscaSchema(PublicacaoSchema):
+    relevancia = fields.Float(dump_only=True)
+    trecho = fields.Str(dump_only=True, allow_none=True)
+
+
 # Devolve uma lista publicações no padrão de retorno estabelecido
 class PublicacaoGetListSchema (RetornoSchema):
-    values = fields.List(fields.Nested(PublicacaoSchema()))
+    values = fields.List(fields.Nested(PublicacaoResultadoBuscaSchema()))
     pagination = fields.List(fields.Nested(PaginacaoSchema()), dump_only=True)
 
 
@@ -0,0 +1,25 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def _serializador(schema, only, exclude, many):
+    return schema(only=only, exclude=exclude, many=many)
+
+
+def serializador(schema, only=None, exclude=(), many=False):
+    """
+        Retorna a instância do schema para serializar, criada uma vez por processo.
+
+        **Descrição:** Criar um schema monta todos os campos (e os schemas dos campos Nested);
+            as instâncias são guardadas por combinação de argumentos e reutilizadas entre as
+            requisições. Para listas, use `many=True` e serialize a lista inteira de uma vez.
+            As instâncias são só para dump/load: não altere `context` nem os campos delas.
+
+        **Parâmetros:**
+            schema (type): classe do schema.
+            only (tuple): campos selecionados (None: todos).
+            exclude (tuple): campos excluídos.
+            many (bool): serializa listas.
+    """
+
+    return _serializador(schema, tuple(only) if only is not None else None, tuple(exclude), many)
@@ -0,0 +1,26 @@
+from marshmallow import Schema, fields
+
+from schemas.retorno import RetornoSchema
+
+
+# Estado e métricas do pool de conexões (do worker que respondeu)
+class PoolStatusSchema(Schema):
+    classe = fields.Str()
+    tamanho = fields.Int()
+    em_uso = fields.Int()
+    livres = fields.Int()
+    overflow = fields.Int()
+    max_overflow = fields.Int()
+    timeout = fields.Float()
+    pid = fields.Int()
+    checkouts = fields.Int()
+    espera_media_ms = fields.Float()
+    espera_maxima_ms = fields.Float()
+    timeouts = fields.Int()
+    conexoes_abertas = fields.Int()
+    conexoes_invalidadas = fields.Int()
+
+
+# Formato de retorno do status do pool
+class RetornoPoolStatusSchema(RetornoSchema):
+    value = fields.Nested(PoolStatusSchema())
@@ -0,0 +1,77 @@
+"""
+senhas.py
+
+This file contains the password hashing of the users. It will be imported by app,
+which configures it with `SENHAS.init_app`, and by the resources that create users,
+change passwords or log in.
+
+The hashes are pbkdf2_sha256 with SENHA_HASH_ROUNDS rounds. A hash made with fewer
+rounds (or another scheme) is still accepted and is replaced on the next successful
+login.
+
+With the sync and gthread workers, hashing and verifying run in the request thread:
+the request waits the full hash time either way, and hashlib's pbkdf2 releases the
+GIL, so the other threads of a gthread worker keep serving requests meanwhile. With
+the gevent worker they run in the hub's thread pool, otherwise the hash would block
+every greenlet of the worker.
+"""
+
+from passlib.context import CryptContext
+from passlib.hash import pbkdf2_sha256
+
+
+class HashSenhas:
+    """
+        Gera e verifica os hashes das senhas.
+    """
+
+    def __init__(self):
+        self.contexto = CryptContext(schemes=["pbkdf2_sha256"])
+
+    def init_app(self, app):
+        rounds = app.config.get("SENHA_HASH_ROUNDS", pbkdf2_sha256.default_rounds)
+
+        # min_rounds: hashes com menos rounds que o configurado são refeitos no login
+        self.contexto = CryptContext(
+            schemes=["pbkdf2_sha256"],
+            pbkdf2_sha256__default_rounds=rounds,
+            pbkdf2_sha256__min_rounds=rounds,
+        )
+
+    def _executa(self, funcao, *args):
+        try:
+            from gevent import get_hub
+            from gevent.monkey import is_module_patched
+        except ImportError:
+            pass
+        else:
+            # no worker gevent, o hash roda em uma thread real e o greenlet apenas espera
+            if is_module_patched("threading"):
+                return get_hub().threadpool.apply(funcao, args)
+
+        return funcao(*args)
+
+    def gerar(self, senha):
+        """
+            **Retorna:**
+                O hash da senha, com os rounds configurados.
+        """
+
+        return self._executa(self.contexto.hash, senha)
+
+    def verificar(self, senha, hash_senha):
+        """
+            Confere a senha com o hash guardado.
+
+            **Retorna:**
+                Tupla (valida, novo_hash): novo_hash é o hash refeito com a configuração atual
+                quando a senha é válida e o hash guardado está desatualizado; senão None.
+        """
+
+        if not hash_senha:
+            return False, None
+
+        return self._executa(self.contexto.verify_and_update, senha, hash_senha)
+
+
+SENHAS = HashSenhas()
@@ -0,0 +1,100 @@
+import datetime
+import os
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault("JWT_SECRET_KEY", "testes")
+os.environ.setdefault("CACHE_RESPOSTAS_ATIVO", "false")
+
+from app import create_app
+from extensions.database import db
+from models import (
+    DiaFuncionamentoModel, EcopontoModel, EmpresaModel, LocalizacaoModel, PerfilUsuarioModel,
+    ResiduoModel, TermoAceiteModel, TermoModel, UsuarioModel,
+)
+from models.enums.dia_semana import DiasSemanaEnum
+from models.enums.situacao_ecoponto import SituacaoEnum
+
+ECOPONTOS_POR_EMPRESA = 10
+
+
+def popula(quantidade):
+    """
+        Grava `quantidade` ecopontos aprovados, com localização, dias de funcionamento e
+        resíduos, distribuídos em empresas de ECOPONTOS_POR_EMPRESA ecopontos.
+    """
+
+    residuos = [ResiduoModel(descricao=f"Resíduo {i}") for i in range(6)]
+    termo = TermoModel(titulo="Termo", descricao="Termo de uso")
+    db.session.add_all(residuos + [termo])
+
+    empresa = None
+    for i in range(quantidade):
+        if i % ECOPONTOS_POR_EMPRESA == 0:
+            usuario = UsuarioModel(email=f"empresa{i}@ecoponto.test", senha="-")
+            empresa = EmpresaModel(
+                nome_fantasia=f"Empresa {i}", cnpj=f"{i:014d}", telefone="4832220000",
+                email=usuario.email, nome_contato_responsavel="Contato", usuario=usuario,
+            )
+            db.session.add_all([
+                usuario,
+                PerfilUsuarioModel(nome="Contato", usuario=usuario, email=usuario.email),
+                empresa,
+                TermoAceiteModel(aceite=True, termo=termo, empresa=empresa),
+            ])
+
+        ecoponto = EcopontoModel(
+            nome=f"Ecoponto {i}", situacao=SituacaoEnum.aprovado, empresa=empresa,
+            residuo=[residuos[i % 6], residuos[(i + 1) % 6]],
+        )
+        db.session.add(ecoponto)
+        db.session.add(LocalizacaoModel(
+            rua=f"Rua {i}", numero=str(i), bairro="Centro", cep="88000-000", cidade="Florianópolis",
+            estado="SC", latitude=-27.59 + i * 0.001, longitude=-48.54 - i * 0.001, ecoponto=ecoponto,
+        ))
+        for dia in (DiasSemanaEnum.seg, DiasSemanaEnum.qua):
+            db.session.add(DiaFuncionamentoModel(
+                dia_semana=dia, hora_inicial=datetime.time(8), hora_final=datetime.time(17), ecoponto=ecoponto,
+            ))
+
+    db.session.commit()
+
+
+@pytest.fixture
+def cria_app():
+    """
+        Retorna uma função que cria a aplicação com um SQLite em memória e `ecopontos`
+        ecopontos gravados.
+    """
+
+    def cria(ecopontos=0):
+        app = create_app("sqlite://")
+        with app.app_context():
+            db.create_all()
+            popula(ecopontos)
+        return app
+
+    return cria
+
+
+@contextmanager
+def conta_consultas(app):
+    """
+        Conta as instruções SQL executadas dentro do bloco (evento before_cursor_execute).
+    """
+
+    with app.app_context():
+        engine = db.engine
+
+    instrucoes = []
+
+    def registra(conn, cursor, instrucao, *args):
+        instrucoes.append(instrucao)
+
+    event.listen(engine, "before_cursor_execute", registra)
+    try:
+        yield instrucoes
+    finally:
+        event.remove(engine, "before_cursor_execute", registra)
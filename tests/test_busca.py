@@ -0,0 +1,55 @@
+"""
+Filtros de busca das listagens.
+"""
+
+import pytest
+
+from extensions.database import db
+from models import EmpresaModel, LocalizacaoModel
+
+CEPS = ["88000-000", "88010-500", "89999-999", "99999-000"]
+
+
+@pytest.fixture
+def app_ceps(cria_app):
+    app = cria_app(len(CEPS))
+    with app.app_context():
+        for localizacao, cep in zip(db.session.query(LocalizacaoModel).order_by(LocalizacaoModel.id), CEPS):
+            localizacao.cep = cep
+        db.session.commit()
+    return app
+
+
+@pytest.mark.parametrize("localizacao, ceps", [
+    ("88000-000", ["88000-000"]),
+    ("88010", ["88010-500"]),
+    ("88000", ["88000-000"]),
+    ("89999", ["89999-999"]),
+    ("99999", ["99999-000"]),
+    ("99999-0", ["99999-000"]),
+    ("9999999", []),
+])
+def test_ecopontos_por_prefixo_cep(app_ceps, localizacao, ceps):
+    resposta = app_ceps.test_client().get("/ecoponto", query_string={"localizacao": localizacao})
+
+    assert resposta.status_code == 200
+    assert sorted(ecoponto["localizacao"][0]["cep"] for ecoponto in resposta.json["values"]) == ceps
+
+
+@pytest.mark.parametrize("busca, empresas", [
+    ("empresa 1", ["Empresa 10"]),
+    ("100%", ["100% Reciclagem"]),
+    ("%", ["100% Reciclagem"]),
+    ("_", []),
+    ("00.000.000/0000-10", ["Empresa 10"]),
+])
+def test_busca_empresa_texto_literal(cria_app, busca, empresas):
+    app = cria_app(30)
+    with app.app_context():
+        db.session.get(EmpresaModel, 3).nome_fantasia = "100% Reciclagem"
+        db.session.commit()
+
+    resposta = app.test_client().get("/empresa", query_string={"busca": busca})
+
+    assert resposta.status_code == 200
+    assert sorted(empresa["nome_fantasia"] for empresa in resposta.json["values"]) == empresas
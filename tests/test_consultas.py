@@ -0,0 +1,67 @@
+"""
+Número de consultas das listagens: fixo, independente da quantidade de registros
+(perfis de carregamento de models/carregamento.py). Um N+1 que volte faz a contagem
+crescer com a quantidade de ecopontos.
+"""
+
+import pytest
+
+from conftest import conta_consultas
+
+QUANTIDADES = (1, 30)
+
+
+def consultas_da_requisicao(app, url):
+    cliente = app.test_client()
+    cliente.get(url)  # primeiro acesso fora da contagem
+
+    with conta_consultas(app) as instrucoes:
+        resposta = cliente.get(url)
+
+    assert resposta.status_code == 200
+    return resposta, len(instrucoes)
+
+
+@pytest.mark.parametrize("url, consultas", [
+    # ecopontos, total da paginação, localização, dias de funcionamento, resíduos e
+    # aceite de termos (a empresa vem no join)
+    ("/ecoponto", 6),
+    # perfil_ecoponto com `fields`: apenas as colunas e as relações pedidas
+    ("/ecoponto?fields=nome,situacao", 2),
+    ("/ecoponto?fields=nome,localizacao", 3),
+    ("/ecoponto?fields=residuo,dia_funcionamento", 4),
+    ("/ecoponto?fields=empresa.nome_fantasia", 3),
+])
+def test_listagem_ecopontos(cria_app, url, consultas):
+    for quantidade in QUANTIDADES:
+        resposta, executadas = consultas_da_requisicao(cria_app(quantidade), url)
+
+        assert len(resposta.json["values"]) == quantidade
+        assert executadas == consultas, f"{quantidade} ecopontos"
+
+
+@pytest.mark.parametrize("url, campos", [
+    ("/ecoponto?fields=nome,situacao", {"id", "nome", "situacao", "situacao_enum"}),
+    ("/ecoponto?fields=nome,localizacao", {"id", "nome", "localizacao"}),
+    ("/ecoponto?fields=empresa.nome_fantasia", {"id", "empresa"}),
+])
+def test_listagem_ecopontos_campos(cria_app, url, campos):
+    resposta, _ = consultas_da_requisicao(cria_app(3), url)
+
+    for ecoponto in resposta.json["values"]:
+        assert set(ecoponto) == campos
+
+
+def test_detalhe_ecoponto(cria_app):
+    for quantidade in QUANTIDADES:
+        _, executadas = consultas_da_requisicao(cria_app(quantidade), f"/ecoponto/{quantidade}")
+
+        assert executadas == 5
+
+
+def test_listagem_empresas_com_ecopontos(cria_app):
+    for quantidade in QUANTIDADES:
+        resposta, executadas = consultas_da_requisicao(cria_app(quantidade), "/empresa?incluir=ecopontos")
+
+        assert sum(len(empresa["ecopontos"]) for empresa in resposta.json["values"]) == quantidade
+        assert executadas == 8, f"{quantidade} ecopontos"
@@ -0,0 +1,11 @@
+"""
+Toda chave estrangeira dos models precisa de índice (ver comandos.chaves_sem_indice);
+uma FK nova sem `index=True` faz este teste falhar.
+"""
+
+from comandos import chaves_sem_indice
+from extensions.database import db
+
+
+def test_chaves_estrangeiras_com_indice():
+    assert chaves_sem_indice(db.metadata) == []
@@ -0,0 +1,89 @@
+from flask_smorest import abort
+from sqlalchemy import delete, insert, select, update
+
+from extensions.database import db
+
+
+def valida_ids(modelo, ids, descricao):
+    """
+        Confere, com uma única consulta (IN), se todos os ids existem no modelo.
+
+        **Parâmetros:**
+            modelo: modelo referenciado (ex.: ResiduoModel).
+            ids (iterable): ids informados na requisição.
+            descricao (str): nome usado na mensagem de erro (ex.: "Resíduos").
+
+        **Retorna:**
+            Lista dos ids sem repetição, na ordem recebida. Se algum não existir, retorna erro 404.
+    """
+
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return ids
+
+    existentes = set(db.session.scalars(select(modelo.id).where(modelo.id.in_(ids))))
+    faltantes = [id for id in ids if id not in existentes]
+    if faltantes:
+        abort(404, message=f"{descricao} não encontrados: {', '.join(map(str, faltantes))}.")
+
+    return ids
+
+
+def sincroniza_associacao(coluna_dono, dono_id, coluna_alvo, ids, remover=True, valores=None):
+    """
+        Sincroniza as linhas de uma tabela de associação de um registro com os ids informados.
+
+        **Descrição:** Carrega as associações atuais do registro em uma consulta e aplica a
+            diferença com um insert em massa (ids novos) e um delete (ids que não foram
+            informados, se `remover`). Se `valores` for informado, as colunas extras das
+            associações existentes também são atualizadas (um update por valor distinto).
+            Os ids devem ter sido validados antes (ver `valida_ids`). Não faz commit.
+
+        **Parâmetros:**
+            coluna_dono: coluna do registro na associação (ex.: EcopontoResiduoModel.ecoponto_id).
+            dono_id (int): id do registro (o registro novo deve ter passado por flush).
+            coluna_alvo: coluna do item associado (ex.: EcopontoResiduoModel.residuo_id).
+            ids (iterable): ids dos itens que devem ficar associados.
+            remover (bool): remove as associações com ids que não foram informados.
+            valores (dict): colunas extras por id, ex.: {termo_id: {"aceite": True}}.
+
+        **Retorna:**
+            Tupla (ids inseridos, ids removidos).
+    """
+
+    associacao = coluna_dono.class_
+    ids = list(dict.fromkeys(ids))
+    valores = valores or {}
+
+    atuais = dict(
+        db.session.execute(
+            select(coluna_alvo, associacao.id).where(coluna_dono == dono_id)
+        ).all()
+    )
+
+    novos = [id for id in ids if id not in atuais]
+    if novos:
+        db.session.execute(
+            insert(associacao),
+            [{coluna_dono.key: dono_id, coluna_alvo.key: id, **valores.get(id, {})} for id in novos],
+        )
+
+    removidos = [id for id in atuais if id not in ids] if remover else []
+    if removidos:
+        db.session.execute(
+            delete(associacao).where(associacao.id.in_([atuais[id] for id in removidos])),
+            execution_options={"synchronize_session": False},
+        )
+
+    # associações existentes: agrupa pelos valores para um update por combinação
+    alteracoes = {}
+    for id in ids:
+        if id in atuais and valores.get(id):
+            alteracoes.setdefault(tuple(sorted(valores[id].items())), []).append(atuais[id])
+    for colunas, associacoes_ids in alteracoes.items():
+        db.session.execute(
+            update(associacao).where(associacao.id.in_(associacoes_ids)).values(dict(colunas)),
+            execution_options={"synchronize_session": False},
+        )
+
+    return novos, removidos
@@ -0,0 +1,201 @@
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+from sqlalchemy import func, literal_column
+
+# configuração de texto do Postgres (stemming em português)
+CONFIGURACAO_POSTGRES = "portuguese"
+
+PALAVRA = re.compile(r"\w+")
+
+STOPWORDS = {
+    "a", "ao", "aos", "as", "com", "como", "da", "das", "de", "do", "dos", "e", "em", "entre",
+    "isso", "mais", "mas", "na", "nas", "nao", "no", "nos", "o", "os", "ou", "para",
+    "pela", "pelas", "pelo", "pelos", "por", "que", "se", "sem", "ser", "sua", "suas", "seu",
+    "seus", "um", "uma", "umas", "uns",
+}
+
+# sufixos de plural -> singular (aplicados em ordem, após remover acentos)
+PLURAIS = (
+    ("oes", "ao"),
+    ("aes", "ao"),
+    ("ais", "al"),
+    ("eis", "el"),
+    ("ois", "ol"),
+    ("uis", "ul"),
+    ("res", "r"),
+    ("zes", "z"),
+    ("ns", "m"),
+    ("s", ""),
+)
+
+
+def normaliza(texto):
+    # minúsculas e sem acentos ("Resíduos Eletrônicos" -> "residuos eletronicos")
+    texto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def radical(palavra):
+    # stemming leve: reduz apenas o plural ("garrafas" -> "garrafa", "pilhas" -> "pilha")
+    if len(palavra) <= 3:
+        return palavra
+
+    for sufixo, troca in PLURAIS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 3:
+            return palavra[:-len(sufixo)] + troca
+
+    return palavra
+
+
+def termos(texto):
+    # termos indexáveis de um texto, na ordem em que aparecem
+    return [radical(palavra) for palavra in PALAVRA.findall(normaliza(texto)) if palavra not in STOPWORDS]
+
+
+def trecho(texto, consulta, tamanho=160, marcador=("<mark>", "</mark>")):
+    """
+        Retorna um trecho do texto em volta da primeira ocorrência dos termos da consulta,
+        com as ocorrências destacadas. Retorna None se nenhum termo aparecer no texto.
+    """
+
+    procurados = set(termos(consulta))
+    ocorrencias = [
+        encontrado.span()
+        for encontrado in PALAVRA.finditer(texto or "")
+        if radical(normaliza(encontrado.group())) in procurados
+    ]
+    if not ocorrencias:
+        return None
+
+    inicio = max(ocorrencias[0][0] - tamanho // 3, 0)
+    fim = min(inicio + tamanho, len(texto))
+
+    # não corta palavras nas bordas do trecho
+    if inicio > 0:
+        espaco = texto.find(" ", inicio, ocorrencias[0][0])
+        inicio = espaco + 1 if espaco != -1 else inicio
+    if fim < len(texto):
+        espaco = texto.rfind(" ", ocorrencias[0][1], fim)
+        fim = espaco if espaco != -1 else fim
+
+    partes = []
+    posicao = inicio
+    for comeco, final in ocorrencias:
+        if comeco < inicio or final > fim:
+            continue
+        partes.append(texto[posicao:comeco])
+        partes.append(f"{marcador[0]}{texto[comeco:final]}{marcador[1]}")
+        posicao = final
+    partes.append(texto[posicao:fim])
+
+    return ("..." if inicio > 0 else "") + "".join(partes).strip() + ("..." if fim < len(texto) else "")
+
+
+def vetor_postgres(titulo, texto):
+    # tsvector ponderado: título (A) e demais textos (B).
+    # As constantes são literais para a expressão coincidir com a do índice GIN.
+    configuracao = literal_column(f"'{CONFIGURACAO_POSTGRES}'::regconfig")
+    return func.setweight(
+        func.to_tsvector(configuracao, func.coalesce(titulo, literal_column("''"))), literal_column("'A'")
+    ).op("||")(
+        func.setweight(func.to_tsvector(configuracao, func.coalesce(texto, literal_column("''"))), literal_column("'B'"))
+    )
+
+
+def consulta_postgres(consulta):
+    return func.plainto_tsquery(literal_column(f"'{CONFIGURACAO_POSTGRES}'::regconfig"), normaliza(consulta))
+
+
+class IndiceInvertido:
+    """
+        Índice invertido em memória, usado na busca textual quando o banco não é Postgres.
+
+        Cada termo aponta para os documentos em que aparece, com a frequência no título e
+        no texto. A busca retorna os documentos que contêm todos os termos da consulta,
+        ordenados pela relevância (BM25, com peso maior para o título).
+
+        Assim como o IndiceEspacial, é reconstruído sob demanda, usando a função `carregar`,
+        quando foi invalidado ou quando passou de `validade_segundos`.
+
+        **Parâmetros:**
+            carregar (callable): retorna uma lista de tuplas (id, titulo, texto).
+            validade_segundos (int): tempo máximo entre reconstruções.
+    """
+
+    PESO_TITULO = 2.0
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, carregar, validade_segundos=60):
+        self.carregar = carregar
+        self.validade_segundos = validade_segundos
+        self._indice = {}
+        self._tamanhos = {}
+        self._construido_em = None
+        self._lock = threading.Lock()
+
+    def invalidar(self):
+        self._construido_em = None
+
+    def reconstruir(self):
+        indice = defaultdict(dict)
+        tamanhos = {}
+        for id, titulo, texto in self.carregar():
+            termos_titulo = Counter(termos(titulo))
+            termos_texto = Counter(termos(texto))
+
+            for termo in termos_titulo.keys() | termos_texto.keys():
+                indice[termo][id] = termos_titulo[termo] * self.PESO_TITULO + termos_texto[termo]
+            tamanhos[id] = sum(termos_titulo.values()) + sum(termos_texto.values())
+
+        with self._lock:
+            self._indice = dict(indice)
+            self._tamanhos = tamanhos
+            self._construido_em = time.monotonic()
+
+    def _expirado(self):
+        construido_em = self._construido_em
+        return construido_em is None or time.monotonic() - construido_em > self.validade_segundos
+
+    def buscar(self, consulta):
+        """
+            Retorna uma lista de tuplas (id, relevancia) dos documentos que contêm todos os
+            termos da consulta, da maior para a menor relevância.
+        """
+
+        if self._expirado():
+            self.reconstruir()
+
+        with self._lock:
+            indice = self._indice
+            tamanhos = self._tamanhos
+
+        procurados = list(dict.fromkeys(termos(consulta)))
+        if not procurados or not tamanhos:
+            return []
+
+        postings = [indice.get(termo, {}) for termo in procurados]
+        # interseção começando pela lista mais curta
+        encontrados = set(min(postings, key=len))
+        for documentos in postings:
+            encontrados &= documentos.keys()
+
+        total = len(tamanhos)
+        tamanho_medio = sum(tamanhos.values()) / total
+        resultado = []
+        for id in encontrados:
+            normalizacao = self.K1 * (1 - self.B + self.B * tamanhos[id] / (tamanho_medio or 1))
+            relevancia = 0.0
+            for documentos in postings:
+                frequencia = documentos[id]
+                idf = math.log(1 + (total - len(documentos) + 0.5) / (len(documentos) + 0.5))
+                relevancia += idf * frequencia * (self.K1 + 1) / (frequencia + normalizacao)
+            resultado.append((id, relevancia))
+
+        resultado.sort(key=lambda item: (-item[1], item[0]))
+        return resultado
@@ -0,0 +1,100 @@
+from flask_smorest import abort
+from marshmallow import fields
+
+from schemas.registro import serializador
+
+
+def schema_aninhado(campo):
+    # schema de um campo Nested ou List(Nested); None para os demais campos
+    if isinstance(campo, fields.List):
+        campo = campo.inner
+    if isinstance(campo, fields.Nested):
+        return campo.schema
+    return None
+
+
+def mesmo_atributo(campos_schema, nome):
+    # campos do schema que serializam o mesmo atributo do campo `nome` (incluindo ele)
+    atributo = campos_schema[nome].attribute or nome
+    return [outro for outro, campo in campos_schema.items() if (campo.attribute or outro) == atributo]
+
+
+def seleciona_campos(campos, schema):
+    """
+        Interpreta o parâmetro `fields` (lista de campos separados por vírgula).
+
+        **Descrição:** Os campos devem existir no schema; o id é sempre incluído.
+            Campos de uma relação podem ser selecionados com ponto (ex.: "empresa.nome_fantasia"),
+            um nível apenas; nesse caso o id da relação também é incluído.
+            Campos do mesmo atributo (ex.: situacao e situacao_enum) são selecionados juntos.
+            Campos inválidos retornam erro 400.
+
+        **Parâmetros:**
+            campos (str): valor do parâmetro, ex.: "id,nome,localizacao".
+            schema (Schema): schema de saída do endpoint.
+
+        **Retorna:**
+            Tupla com os campos selecionados (no formato do `only` do marshmallow), ou None
+            se o parâmetro não foi informado (todos os campos).
+    """
+
+    if not campos:
+        return None
+
+    permitidos = serializador(schema).fields
+    selecionados = ["id"]
+    invalidos = []
+
+    for campo in [campo.strip() for campo in campos.split(",") if campo.strip()]:
+        relacao, _, aninhado = campo.partition(".")
+        if relacao not in permitidos:
+            invalidos.append(campo)
+            continue
+
+        if aninhado:
+            schema_relacao = schema_aninhado(permitidos[relacao])
+            if schema_relacao is None or aninhado not in schema_relacao.fields:
+                invalidos.append(campo)
+                continue
+            if "id" in schema_relacao.fields:
+                selecionados.append(f"{relacao}.id")
+            selecionados.extend(f"{relacao}.{outro}" for outro in mesmo_atributo(schema_relacao.fields, aninhado))
+        else:
+            selecionados.extend(mesmo_atributo(permitidos, campo))
+
+    if invalidos:
+        abort(
+            400,
+            message=f"Campos inválidos: {', '.join(invalidos)}. Campos permitidos: {', '.join(permitidos)}.",
+        )
+
+    return tuple(dict.fromkeys(selecionados))
+
+
+def relacoes_selecionadas(campos):
+    # nomes das relações (ou colunas) selecionadas, sem os campos aninhados
+    return tuple(dict.fromkeys(campo.split(".", 1)[0] for campo in campos))
+
+
+def campos_relacao(campos, relacao):
+    """
+        Campos selecionados de uma relação, para serializá-la separadamente.
+
+        **Retorna:**
+            None se todos os campos da relação foram selecionados (ou `campos` é None),
+            tupla vazia se a relação não foi selecionada, ou a tupla dos campos aninhados.
+    """
+
+    if campos is None or relacao in campos:
+        return None
+
+    prefixo = f"{relacao}."
+    return tuple(campo[len(prefixo):] for campo in campos if campo.startswith(prefixo))
+
+
+def sem_relacao(campos, relacao):
+    # campos selecionados, sem os da relação informada
+    if campos is None:
+        return None
+
+    return tuple(campo for campo in campos if campo.split(".", 1)[0] != relacao)
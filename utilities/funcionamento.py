@@ -0,0 +1,121 @@
+import itertools
+from collections import defaultdict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from flask import current_app
+
+from models.enums.dia_semana import DiasSemanaEnum
+
+DIAS_SEMANA = ["seg", "ter", "qua", "qui", "sex", "sab", "dom"]
+
+
+def dia_funcionamento_dict(dia_funcionamento):
+    # DiaFuncionamentoModel -> {"dia_semana": "seg", "hora_inicial": "08:00", "hora_final": "12:00"}
+    # dia_semana é o membro do enum (ValorEnum no load) ou, em registros montados à mão, o nome
+    dia_semana = dia_funcionamento.dia_semana
+    if isinstance(dia_semana, DiasSemanaEnum):
+        dia_semana = dia_semana.name
+
+    return {
+        "dia_semana": dia_semana,
+        "hora_inicial": dia_funcionamento.hora_inicial.strftime('%H:%M'),
+        "hora_final": dia_funcionamento.hora_final.strftime('%H:%M'),
+    }
+
+
+def agrupar_partes(dia_funcionamento):
+
+    # Passo 1: Organizar horários por dia da semana
+    horarios_por_dia = defaultdict(list)
+    for horario in dia_funcionamento:
+        dia = horario['dia_semana']
+        intervalo = f"{horario['hora_inicial']} às {horario['hora_final']}"
+        horarios_por_dia[dia].append(intervalo)
+
+    # Passo 2: Identificar horários iguais em dias consecutivos
+    grupos = []
+    for key, group in itertools.groupby(enumerate(DIAS_SEMANA), lambda x: horarios_por_dia.get(x[1])):
+        dias_grupo = list(group)
+        if key:  # Apenas adiciona se key não for None
+            grupos.append((key, [dias[1] for dias in dias_grupo]))
+
+    # Passo 3: Criar uma parte para cada grupo
+    partes = []
+
+    for horarios, dias in grupos:
+        dias_str = dias[0] if len(dias) == 1 else f"{dias[0]} a {dias[-1]}"
+        horarios_str = " - ".join(horarios_por_dia[dias[0]])
+        partes.append(f"{dias_str} das {horarios_str}")
+
+    return partes
+
+
+def juntar_partes(partes):
+
+    funcionamento_string = ""
+    len_partes = len(partes) - 1
+    for index, parte in enumerate(partes):
+
+        # ultimo ou só tem um
+        if index == len_partes or len_partes == 0:
+            funcionamento_string += f"{parte} "
+
+        # penúltimo
+        elif (len_partes - index) == 1:
+            funcionamento_string += f"{parte} e "
+
+        else:
+            funcionamento_string += f"{parte}, "
+
+    return funcionamento_string
+
+
+def agrupar_horarios(dia_funcionamento):
+    return juntar_partes(agrupar_partes(dia_funcionamento))
+
+
+def atualiza_funcionamento(ecoponto, dias_funcionamento):
+    """
+        Calcula e grava no ecoponto o resumo do horário de funcionamento.
+
+        **Descrição:** Deve ser chamada sempre que os dias de funcionamento do ecoponto
+            forem gravados, antes do commit. As leituras apenas devolvem os campos
+            `funcionamento` (string) e `funcionamentos` (lista, uma parte por grupo de dias).
+
+        **Parâmetros:**
+            ecoponto (EcopontoModel): ecoponto a ser atualizado.
+            dias_funcionamento (list): DiaFuncionamentoModel atuais do ecoponto.
+    """
+
+    ecoponto.funcionamento, ecoponto.funcionamentos = resumo_funcionamento(dias_funcionamento)
+
+
+def resumo_funcionamento(dias_funcionamento):
+    # (funcionamento, funcionamentos) dos dias informados, sem alterar o ecoponto
+    partes = agrupar_partes([dia_funcionamento_dict(dia) for dia in dias_funcionamento])
+    return juntar_partes(partes), partes
+
+
+def momento_local(momento=None):
+    """
+        Converte o momento para o horário local dos ecopontos (FUSO_HORARIO), sem tzinfo.
+
+        **Parâmetros:**
+            momento (datetime): se None, usa o momento atual. Datas sem fuso já são
+                consideradas no horário local.
+    """
+
+    fuso = ZoneInfo(current_app.config.get("FUSO_HORARIO", "America/Sao_Paulo"))
+    if momento is None:
+        return datetime.now(fuso).replace(tzinfo=None)
+
+    if momento.tzinfo is not None:
+        return momento.astimezone(fuso).replace(tzinfo=None)
+
+    return momento
+
+
+def dia_semana_de(momento):
+    # datetime.weekday(): 0 = segunda-feira
+    return DiasSemanaEnum[DIAS_SEMANA[momento.weekday()]]
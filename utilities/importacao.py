@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import re
+
+from flask import request
+from flask_smorest import abort
+
+# colunas do CSV de importação de ecopontos que vão para a localização
+COLUNAS_LOCALIZACAO = ("rua", "numero", "bairro", "cep", "cidade", "estado", "complemento", "latitude", "longitude")
+
+SEPARADOR_LISTA = re.compile(r"[;|]")
+HORARIO = re.compile(r"(\w{3})\s+(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})")
+
+
+def formato_importacao():
+    # formato do corpo (ou do arquivo enviado no campo "arquivo"): json, ndjson ou csv
+    arquivo = request.files.get("arquivo")
+    if arquivo is not None:
+        nome = (arquivo.filename or "").lower()
+        tipo = arquivo.mimetype
+    else:
+        nome = ""
+        tipo = request.mimetype
+
+    if nome.endswith(".csv") or tipo in ("text/csv", "application/csv"):
+        return "csv"
+    if nome.endswith((".ndjson", ".jsonl")) or tipo in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    if nome.endswith(".json") or tipo == "application/json":
+        return "json"
+
+    abort(415, message="Formato não suportado: envie JSON (lista), NDJSON ou CSV.")
+
+
+def conteudo_importacao():
+    arquivo = request.files.get("arquivo")
+    dados = arquivo.read() if arquivo is not None else request.get_data()
+    try:
+        return dados.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        abort(400, message="O arquivo deve estar em UTF-8.")
+
+
+def linha_csv_para_ecoponto(linha):
+    """
+        Converte uma linha do CSV no formato do JSON de criação de ecoponto.
+
+        **Descrição:** As colunas de endereço formam a localização; `residuos` tem os ids
+            separados por ";" ou "|" e `funcionamento` os horários no formato
+            "seg 08:00-12:00; sab 09:00-11:00". Células vazias são ignoradas.
+    """
+
+    linha = {coluna.strip(): valor.strip() for coluna, valor in linha.items() if coluna and valor and valor.strip()}
+
+    localizacao = {coluna: linha.pop(coluna) for coluna in COLUNAS_LOCALIZACAO if coluna in linha}
+    if localizacao:
+        linha["localizacao"] = [localizacao]
+
+    residuos = linha.pop("residuos", "")
+    linha["residuo"] = [{"id": id.strip()} for id in SEPARADOR_LISTA.split(residuos) if id.strip()]
+
+    funcionamento = linha.pop("funcionamento", None)
+    if funcionamento:
+        linha["dia_funcionamento"] = [
+            {"dia_semana": dia, "hora_inicial": inicio.zfill(5), "hora_final": fim.zfill(5)}
+            for dia, inicio, fim in HORARIO.findall(funcionamento)
+        ]
+
+    return linha
+
+
+def linhas_importacao():
+    """
+        Lê as linhas enviadas para importação, em JSON (lista de objetos), NDJSON (um objeto
+        por linha) ou CSV (com cabeçalho), no corpo ou como arquivo no campo "arquivo".
+
+        **Retorna:**
+            Lista de tuplas (numero_linha, dados, erro). `erro` é preenchido (e `dados` é None)
+            quando a linha não pôde ser lida. Se o conteúdo como um todo for inválido, retorna 400.
+    """
+
+    formato = formato_importacao()
+    conteudo = conteudo_importacao()
+
+    if formato == "json":
+        try:
+            itens = json.loads(conteudo)
+        except ValueError:
+            abort(400, message="JSON inválido.")
+        if not isinstance(itens, list):
+            abort(400, message="O JSON deve ser uma lista de ecopontos.")
+        return [(numero, item, None) for numero, item in enumerate(itens, start=1)]
+
+    if formato == "ndjson":
+        linhas = []
+        for numero, texto in enumerate(conteudo.splitlines(), start=1):
+            if not texto.strip():
+                continue
+            try:
+                linhas.append((numero, json.loads(texto), None))
+            except ValueError:
+                linhas.append((numero, None, {"_linha": ["JSON inválido."]}))
+        return linhas
+
+    # csv: a linha 1 é o cabeçalho
+    leitor = csv.DictReader(io.StringIO(conteudo))
+    return [(numero, linha_csv_para_ecoponto(linha), None) for numero, linha in enumerate(leitor, start=2)]
@@ -0,0 +1,119 @@
+import math
+import threading
+import time
+from collections import defaultdict
+
+RAIO_TERRA_KM = 6371.0088
+KM_POR_GRAU = 111.32
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    # Distância em km entre dois pontos (graus decimais)
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng / 2) ** 2
+    return 2 * RAIO_TERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class IndiceEspacial:
+    """
+        Índice espacial em memória (grade regular de latitude/longitude).
+
+        Os pontos são agrupados em células de `tamanho_celula` graus. Uma busca por raio
+        visita apenas as células que cobrem o retângulo envolvente do círculo e ordena
+        os candidatos pela distância haversine.
+
+        O índice é reconstruído sob demanda, usando a função `carregar`, quando foi
+        invalidado, quando a `versao` compartilhada mudou (escrita feita em outro worker)
+        ou quando passou de `validade_segundos`. Sem `versao`, uma escrita feita em outro
+        worker só aparece depois de `validade_segundos`.
+
+        **Parâmetros:**
+            carregar (callable): retorna uma lista de tuplas (id, latitude, longitude).
+            tamanho_celula (float): tamanho da célula da grade em graus.
+            validade_segundos (int): tempo máximo entre reconstruções.
+            versao (VersaoDados): versão compartilhada pelos workers, incrementada por `invalidar`.
+    """
+
+    def __init__(self, carregar, tamanho_celula=0.05, validade_segundos=60, versao=None):
+        self.carregar = carregar
+        self.tamanho_celula = tamanho_celula
+        self.validade_segundos = validade_segundos
+        self.versao = versao
+        self._grade = {}
+        self._construido_em = None
+        self._versao = None
+        self._lock = threading.Lock()
+
+    def _celula(self, lat, lng):
+        return (math.floor(lat / self.tamanho_celula), math.floor(lng / self.tamanho_celula))
+
+    def invalidar(self):
+        self._construido_em = None
+        if self.versao is not None:
+            self.versao.incrementar()
+
+    def reconstruir(self, versao=None):
+        grade = defaultdict(list)
+        for id, lat, lng in self.carregar():
+            if lat is None or lng is None:
+                continue
+            grade[self._celula(lat, lng)].append((id, lat, lng))
+
+        with self._lock:
+            self._grade = dict(grade)
+            self._construido_em = time.monotonic()
+            self._versao = versao
+
+    def _versao_atual(self):
+        return self.versao.atual() if self.versao is not None else None
+
+    def _expirado(self, versao):
+        construido_em = self._construido_em
+        return (
+            construido_em is None
+            or versao != self._versao
+            or time.monotonic() - construido_em > self.validade_segundos
+        )
+
+    def proximos(self, lat, lng, raio_km):
+        """
+            Retorna uma lista de tuplas (id, distancia_km) dos pontos dentro do raio,
+            ordenada da menor para a maior distância.
+        """
+
+        versao = self._versao_atual()
+        if self._expirado(versao):
+            self.reconstruir(versao)
+
+        with self._lock:
+            grade = self._grade
+
+        delta_lat = raio_km / KM_POR_GRAU
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        delta_lng = min(raio_km / (KM_POR_GRAU * cos_lat), 180.0)
+
+        lat_min, lng_min = self._celula(lat - delta_lat, lng - delta_lng)
+        lat_max, lng_max = self._celula(lat + delta_lat, lng + delta_lng)
+        qtd_celulas = (lat_max - lat_min + 1) * (lng_max - lng_min + 1)
+
+        # raio grande demais: mais barato percorrer todos os pontos
+        if qtd_celulas > max(len(grade), 1):
+            candidatos = (ponto for pontos in grade.values() for ponto in pontos)
+        else:
+            candidatos = (
+                ponto
+                for i in range(lat_min, lat_max + 1)
+                for j in range(lng_min, lng_max + 1)
+                for ponto in grade.get((i, j), ())
+            )
+
+        resultado = []
+        for id, ponto_lat, ponto_lng in candidatos:
+            distancia = haversine(lat, lng, ponto_lat, ponto_lng)
+            if distancia <= raio_km:
+                resultado.append((id, distancia))
+
+        resultado.sort(key=lambda item: item[1])
+        return resultado
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import threading
+import time
+
+from cache import comprime
+
+# ordem dos campos de cada ecoponto nos formatos compactos (json e msgpack)
+CAMPOS_MAPA = ["id", "nome", "lat", "lng", "residuos"]
+
+TIPOS = {
+    "json": "application/json",
+    "geojson": "application/geo+json",
+    "msgpack": "application/x-msgpack",
+}
+
+
+def serializa_json(pontos):
+    contexto = {
+        "code": 200,
+        "status": "OK",
+        "message": "",
+        "campos": CAMPOS_MAPA,
+        "values": pontos,
+    }
+    return json.dumps(contexto, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def serializa_geojson(pontos):
+    colecao = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "id": id,
+                "geometry": {"type": "Point", "coordinates": [lng, lat]},
+                "properties": {"nome": nome, "residuos": residuos},
+            }
+            for id, nome, lat, lng, residuos in pontos
+        ],
+    }
+    return json.dumps(colecao, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def serializa_msgpack(pontos):
+    import msgpack
+
+    return msgpack.packb({"campos": CAMPOS_MAPA, "values": pontos})
+
+
+SERIALIZADORES = {
+    "json": serializa_json,
+    "geojson": serializa_geojson,
+    "msgpack": serializa_msgpack,
+}
+
+
+class MapaEcopontos:
+    """
+        Snapshot em memória do mapa de ecopontos: uma linha compacta por ecoponto
+        (id, nome, lat, lng, ids dos resíduos).
+
+        Cada formato é serializado e comprimido (gzip/br) uma única vez por snapshot; as
+        requisições apenas escolhem a versão. Assim como o IndiceEspacial, o snapshot é
+        reconstruído sob demanda, usando a função `carregar`, quando foi invalidado, quando
+        a `versao` compartilhada mudou (escrita feita em outro worker) ou quando passou de
+        `validade_segundos`; o ETag acompanha o corpo reconstruído.
+
+        **Parâmetros:**
+            carregar (callable): retorna a lista de pontos [id, nome, lat, lng, [residuo_id, ...]].
+            validade_segundos (int): tempo máximo entre reconstruções.
+            versao (VersaoDados): versão compartilhada pelos workers, incrementada por `invalidar`.
+    """
+
+    def __init__(self, carregar, validade_segundos=60, versao=None):
+        self.carregar = carregar
+        self.validade_segundos = validade_segundos
+        self.versao = versao
+        self._versao = None
+        self._pontos = []
+        self._entradas = {}
+        self._construido_em = None
+        self._gravado_em = None
+        self._lock = threading.Lock()
+
+    def invalidar(self):
+        self._construido_em = None
+        if self.versao is not None:
+            self.versao.incrementar()
+
+    def reconstruir(self, versao=None):
+        pontos = self.carregar()
+
+        with self._lock:
+            self._pontos = pontos
+            self._entradas = {}
+            self._construido_em = time.monotonic()
+            self._gravado_em = int(time.time())
+            self._versao = versao
+
+    def _versao_atual(self):
+        return self.versao.atual() if self.versao is not None else None
+
+    def _expirado(self, versao):
+        construido_em = self._construido_em
+        return (
+            construido_em is None
+            or versao != self._versao
+            or time.monotonic() - construido_em > self.validade_segundos
+        )
+
+    def entrada(self, formato):
+        """
+            Retorna a entrada do formato pedido, no formato das entradas do cache de
+            respostas (ver `cache.resposta_condicional`), com as versões comprimidas.
+        """
+
+        versao = self._versao_atual()
+        if self._expirado(versao):
+            self.reconstruir(versao)
+
+        with self._lock:
+            entrada = self._entradas.get(formato)
+            if entrada is not None:
+                return entrada
+
+            corpo = SERIALIZADORES[formato](self._pontos)
+            entrada = {
+                "corpo": corpo,
+                "tipo": TIPOS[formato],
+                "etag": hashlib.sha256(corpo).hexdigest()[:32],
+                "gravado_em": self._gravado_em,
+                "comprimidos": comprime(corpo),
+            }
+            self._entradas[formato] = entrada
+            return entrada
@@ -0,0 +1,105 @@
+import base64
+import json
+
+from flask import current_app
+from flask_smorest import abort
+
+TAMANHO_MAXIMO_PAGINA = 100
+
+
+def codifica_cursor(id):
+    # cursor opaco: {"id": <último id da página>} em base64 url-safe
+    return base64.urlsafe_b64encode(json.dumps({"id": id}).encode()).decode().rstrip("=")
+
+
+def decodifica_cursor(cursor):
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(cursor + preenchimento))["id"])
+    except (ValueError, KeyError, TypeError):
+        abort(400, message="Cursor de paginação inválido.")
+
+
+def tamanho_pagina(query_args):
+    tamanho_maximo = current_app.config.get("PAGINACAO_TAMANHO_MAXIMO", TAMANHO_MAXIMO_PAGINA)
+
+    pagina = max(int(query_args.get("page") or 1), 1)
+    limite = int(query_args.get("page_size") or 0)
+    if limite < 1 or limite > tamanho_maximo:
+        limite = tamanho_maximo
+
+    return pagina, limite
+
+
+def paginar(query, coluna_id, query_args, ordem=None):
+    """
+        Aplica a paginação na consulta e retorna os registros da página e os dados de paginação.
+
+        **Descrição:** Por padrão pagina por deslocamento (page/page_size). Se `cursor` for
+            informado (vazio para a primeira página), pagina por chave (id > último id da página
+            anterior), com custo constante para qualquer página. O tamanho da página é limitado
+            por PAGINACAO_TAMANHO_MAXIMO e `include_total=false` dispensa o COUNT.
+            Se `ordem` for informada (ex.: relevância), a consulta é ordenada por ela e depois
+            pelo id, e a paginação é sempre por deslocamento.
+
+        **Parâmetros:**
+            query: consulta já filtrada.
+            coluna_id: coluna de ordenação e chave do cursor (ex.: EcopontoModel.id).
+            query_args (dict): argumentos de PaginacaoSearchSchema.
+            ordem (tuple): critérios de ordenação aplicados antes do id.
+
+        **Retorna:**
+            Tupla (registros, paginacao).
+    """
+
+    pagina, limite = tamanho_pagina(query_args)
+
+    cursor = query_args.get("cursor") if ordem is None else None
+    ultimo_id = decodifica_cursor(cursor) if cursor else None
+    incluir_total = query_args.get("include_total", True)
+
+    total_registros = query.count() if incluir_total else None
+
+    query = query.order_by(*(ordem or ()), coluna_id)
+    if cursor is not None:
+        if ultimo_id is not None:
+            query = query.filter(coluna_id > ultimo_id)
+    else:
+        query = query.offset((pagina - 1) * limite)
+
+    # busca um registro a mais para saber se existe próxima página sem precisar do COUNT
+    registros = query.limit(limite + 1).all()
+    proxima = len(registros) > limite
+    registros = registros[:limite]
+
+    paginacao = {
+        "total": total_registros,
+        "page": pagina if cursor is None else None,
+        "page_size": limite,
+        "previous": bool(cursor) if cursor is not None else pagina > 1,
+        "next": proxima,
+        "next_cursor": codifica_cursor(getattr(registros[-1], coluna_id.key)) if proxima else None,
+    }
+
+    return registros, paginacao
+
+
+def paginar_lista(itens, query_args):
+    """
+        Pagina (por deslocamento) uma lista já ordenada, como o resultado de uma busca
+        feita em memória. Retorna a tupla (itens da página, paginacao).
+    """
+
+    pagina, limite = tamanho_pagina(query_args)
+    inicio = (pagina - 1) * limite
+
+    paginacao = {
+        "total": len(itens) if query_args.get("include_total", True) else None,
+        "page": pagina,
+        "page_size": limite,
+        "previous": pagina > 1,
+        "next": len(itens) > inicio + limite,
+        "next_cursor": None,
+    }
+
+    return itens[inicio:inicio + limite], paginacao
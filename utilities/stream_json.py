@@ -0,0 +1,85 @@
+import json
+
+from flask import current_app, stream_with_context
+
+TAMANHO_LOTE_STREAM = 500
+
+# marcador da posição da lista transmitida em stream dentro do envelope
+VALORES = "__valores_em_stream__"
+
+
+def tamanho_lote():
+    return current_app.config.get("STREAM_TAMANHO_LOTE", TAMANHO_LOTE_STREAM)
+
+
+def registros_em_lotes(query, coluna_id):
+    """
+        Retorna a consulta ordenada pelo id para ser percorrida em lotes (yield_per), com
+        cursor do lado do servidor quando o banco suporta (Postgres). Os registros de cada
+        lote são descartados após serializados, e as relações com selectinload são
+        carregadas por lote.
+    """
+
+    return query.order_by(coluna_id).yield_per(tamanho_lote())
+
+
+def resposta_stream(contexto, registros, serializa=None):
+    """
+        Resposta JSON transmitida em partes, sem montar a lista inteira em memória.
+
+        **Descrição:** O envelope `contexto` é serializado normalmente, exceto no ponto onde
+            está o marcador VALORES, que é substituído pelos registros, serializados um a um
+            com `serializa` e enviados a cada lote. Se o envelope tiver "pagination", ela é
+            enviada ao final, com o total de registros transmitidos.
+
+        **Parâmetros:**
+            contexto (dict): envelope da resposta, com VALORES no lugar da lista.
+            registros (iterable): registros a transmitir (ex.: `registros_em_lotes`).
+            serializa (callable): converte um registro em dict; se None, os registros já são dicts.
+
+        **Retorna:**
+            Response com o corpo gerado sob demanda.
+    """
+
+    contexto = dict(contexto)
+    com_paginacao = "pagination" in contexto
+    if com_paginacao:
+        # vai ao final do envelope, depois da lista
+        del contexto["pagination"]
+        contexto["pagination"] = VALORES + "_paginacao"
+
+    corpo = current_app.json.dumps(contexto, sort_keys=False, separators=(",", ":"))
+    antes, depois = corpo.split(json.dumps(VALORES), 1)
+    if com_paginacao:
+        entre, depois = depois.split(json.dumps(VALORES + "_paginacao"), 1)
+
+    lote = tamanho_lote()
+    serializa = serializa or (lambda registro: registro)
+
+    def gerar():
+        yield antes + "["
+        total = 0
+        partes = []
+        for registro in registros:
+            partes.append(("," if total else "") + current_app.json.dumps(serializa(registro), separators=(",", ":")))
+            total += 1
+            if len(partes) >= lote:
+                yield "".join(partes)
+                partes = []
+
+        yield "".join(partes) + "]"
+
+        if com_paginacao:
+            paginacao = {
+                "total": total,
+                "page": None,
+                "page_size": None,
+                "previous": False,
+                "next": False,
+                "next_cursor": None,
+            }
+            yield entre + current_app.json.dumps(paginacao, separators=(",", ":"))
+
+        yield depois
+
+    return current_app.response_class(stream_with_context(gerar()), mimetype="application/json")
@@ -0,0 +1,39 @@
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions.database import db
+from models.versao_dados import VersaoDadosModel
+
+
+class VersaoDados:
+    """
+        Versão compartilhada (no banco) de um snapshot mantido em memória por cada worker.
+
+        **Descrição:** Quem altera os dados do snapshot chama `incrementar` (depois do commit);
+            cada worker compara `atual` com a versão do seu snapshot antes de usá-lo e o
+            reconstrói quando mudou. Assim uma escrita feita em um worker é vista pelos demais
+            na requisição seguinte, ao custo de uma consulta pela chave primária.
+
+        **Parâmetros:**
+            nome (str): nome do snapshot (chave em versao_dados).
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def atual(self):
+        return db.session.scalar(select(VersaoDadosModel.versao).where(VersaoDadosModel.nome == self.nome)) or 0
+
+    def incrementar(self):
+        atualizacao = update(VersaoDadosModel).where(VersaoDadosModel.nome == self.nome).values(versao=VersaoDadosModel.versao + 1)
+        if db.session.execute(atualizacao).rowcount == 0:
+            # primeira escrita: cria a linha (outro worker pode ter criado ao mesmo tempo)
+            try:
+                db.session.add(VersaoDadosModel(nome=self.nome, versao=1))
+                db.session.commit()
+                return
+            except IntegrityError:
+                db.session.rollback()
+                db.session.execute(atualizacao)
+
+        db.session.commit()